@@ -24,6 +24,7 @@ from typing import Iterable, Optional
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.signing import TimestampSigner
 from django.db.models import Q
@@ -57,6 +58,9 @@ FREQ_CHOICES = (
     (FREQ_MONTHLY, _("Monthly digest")),
 )
 
+# Number of changes processed and mails handed off at once in digests
+DIGEST_CHUNK = 1000
+
 SCOPE_ALL = 0
 SCOPE_WATCHED = 10
 SCOPE_ADMIN = 20
@@ -98,6 +102,7 @@ class Notification:
     def __init__(self, outgoing, perm_cache=None):
         self.outgoing = outgoing
         self.subscription_cache = {}
+        self.access_cache = {}
         if perm_cache is not None:
             self.perm_cache = perm_cache
         else:
@@ -179,6 +184,17 @@ class Notification:
 
         return user.pk in self.perm_cache[project.pk]
 
+    def can_access(self, user, project):
+        if project is None:
+            return True
+
+        if project.pk not in self.access_cache:
+            self.access_cache[project.pk] = set(
+                User.objects.having_access(project).values_list("pk", flat=True)
+            )
+
+        return user.pk in self.access_cache[project.pk]
+
     def get_users(
         self,
         frequency,
@@ -339,7 +355,7 @@ class Notification:
 
     def notify_immediate(self, change):
         for user in self.get_users(FREQ_INSTANT, change):
-            if change.project is None or user.can_access_project(change.project):
+            if self.can_access(user, change.project):
                 self.send_immediate(
                     user.profile.language,
                     user.email,
@@ -349,6 +365,7 @@ class Notification:
                 # Delete onetime subscription
                 if user.current_subscription.onetime:
                     user.current_subscription.delete()
+                    self.subscription_cache = {}
 
     def send_digest(self, language, email, changes, subscription=None):
         with override("en" if language is None else language):
@@ -368,16 +385,44 @@ class Notification:
                 self.get_headers(context),
             )
 
+    @staticmethod
+    def iterate_changes(changes):
+        """Iterate over changes in chunks to avoid loading all of them at once."""
+        last = 0
+        while True:
+            chunk = list(
+                changes.filter(pk__gt=last).order_by("pk").prefetch()[:DIGEST_CHUNK]
+            )
+            if not chunk:
+                return
+            yield from Change.objects.preload_list(chunk)
+            last = chunk[-1].pk
+
+    def flush_digest(self, checkpoint_key, user_id=None):
+        """Hand off rendered mails and remember progress."""
+        if self.outgoing:
+            send_mails.delay(list(self.outgoing))
+            del self.outgoing[:]
+        if user_id is not None:
+            cache.set(checkpoint_key, user_id, 86400)
+
     def notify_digest(self, frequency, changes):
+        # The checkpoint allows to resume crashed digest on the same day
+        checkpoint_key = "notify-digest-{}-{}-{}".format(
+            self.get_name(), frequency, timezone.now().date().isoformat()
+        )
+        checkpoint = cache.get(checkpoint_key, 0)
+        # Only change IDs are kept, the changes are loaded while rendering
         notifications = defaultdict(list)
         users = {}
-        for change in changes:
+        for change in self.iterate_changes(changes):
             for user in self.get_users(frequency, change):
-                if change.project is None or user.can_access_project(change.project):
-                    notifications[user.pk].append(change)
+                if user.pk > checkpoint and self.can_access(user, change.project):
+                    notifications[user.pk].append(change.pk)
                     users[user.pk] = user
-        for user in users.values():
-            changes = notifications[user.pk]
+        for user_id in sorted(users):
+            user = users.pop(user_id)
+            changes = notifications.pop(user_id)
             parts = []
             while len(changes) > 120:
                 parts.append(changes[:100])
@@ -389,9 +434,14 @@ class Notification:
                 self.send_digest(
                     user.profile.language,
                     user.email,
-                    part,
+                    Change.objects.filter(pk__in=part).prefetch().order().preload(),
                     subscription=user.current_subscription,
                 )
+            if len(self.outgoing) >= DIGEST_CHUNK:
+                self.flush_digest(checkpoint_key, user_id)
+        # Hand off remaining mails before the progress is forgotten
+        self.flush_digest(checkpoint_key)
+        cache.delete(checkpoint_key)
 
     def filter_changes(self, **kwargs):
         return Change.objects.filter(
@@ -65,19 +65,38 @@ def cleanup_auditlog():
 
 
 @app.task(trail=False)
-def notify_change(change_id):
+def notify_changes(change_ids):
+    """Send notifications for multiple changes at once.
+
+    The notification instances are shared between the changes, so the
+    subscriptions and permissions are looked up only once for each scope.
+    """
     from weblate.accounts.notifications import NOTIFICATIONS_ACTIONS
     from weblate.trans.models import Change
 
-    change = Change.objects.get(pk=change_id)
+    changes = (
+        Change.objects.filter(pk__in=change_ids, action__in=list(NOTIFICATIONS_ACTIONS))
+        .prefetch()
+        .order_by("pk")
+    )
     perm_cache = {}
-    if change.action in NOTIFICATIONS_ACTIONS:
-        outgoing = []
+    notifications = {}
+    outgoing = []
+    for change in changes.preload():
         for notification_cls in NOTIFICATIONS_ACTIONS[change.action]:
-            notification = notification_cls(outgoing, perm_cache)
-            notification.notify_immediate(change)
-        if outgoing:
-            send_mails.delay(outgoing)
+            if notification_cls not in notifications:
+                notifications[notification_cls] = notification_cls(outgoing, perm_cache)
+            try:
+                notifications[notification_cls].notify_immediate(change)
+            except Exception:
+                report_error(cause="Failed to send notification")
+    if outgoing:
+        send_mails.delay(outgoing)
+
+
+@app.task(trail=False)
+def notify_change(change_id):
+    notify_changes([change_id])
 
 
 def notify_digest(method):
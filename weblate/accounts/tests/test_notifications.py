@@ -21,11 +21,14 @@
 
 from copy import deepcopy
 from typing import List, Optional
+from unittest import mock
 
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
+from django.utils import timezone
 
 from weblate.accounts.models import AuditLog, Profile, Subscription
 from weblate.accounts.notifications import (
@@ -40,9 +43,11 @@ from weblate.accounts.notifications import (
     SCOPE_PROJECT,
     SCOPE_WATCHED,
     MergeFailureNotification,
+    ToDoStringsNotification,
 )
 from weblate.accounts.tasks import (
     notify_change,
+    notify_changes,
     notify_daily,
     notify_monthly,
     notify_weekly,
@@ -258,6 +263,21 @@ class NotificationTest(ViewTestCase, RegistrationTestMixin):
             ],
         )
 
+    def test_notify_changes(self):
+        changes = [
+            Change.objects.create(
+                translation=self.get_translation(), action=Change.ACTION_NEW_STRING
+            )
+            for _i in range(3)
+        ]
+        mail.outbox = []
+
+        # All changes are notified in a single batch
+        notify_changes([change.pk for change in changes])
+        self.validate_notifications(
+            3, "[Weblate] New string to translate in Test/Test — Czech"
+        )
+
     def test_notify_new_language(self):
         anotheruser = self.anotheruser
         change = Change.objects.create(
@@ -446,6 +466,44 @@ class NotificationTest(ViewTestCase, RegistrationTestMixin):
     def test_digest_monthly(self):
         self.test_digest(FREQ_MONTHLY, notify_monthly)
 
+    def test_digest_checkpoint(self):
+        Subscription.objects.filter(notification="MergeFailureNotification").update(
+            frequency=FREQ_DAILY
+        )
+        Change.objects.create(
+            component=self.component,
+            details={"error": "Failed merge", "status": "Error\nstatus"},
+            action=Change.ACTION_FAILED_MERGE,
+        )
+        # Digest for the user was already sent in a crashed run
+        cache_key = "notify-digest-MergeFailureNotification-{}-{}".format(
+            FREQ_DAILY, timezone.now().date().isoformat()
+        )
+        cache.set(cache_key, self.user.pk)
+        notify_daily()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIsNone(cache.get(cache_key))
+
+        # Next run sends it again
+        notify_daily()
+        self.validate_notifications(1, "[Weblate] Digest: Repository failure")
+
+    def test_digest_crash(self):
+        Subscription.objects.filter(notification="MergeFailureNotification").update(
+            frequency=FREQ_DAILY
+        )
+        Change.objects.create(
+            component=self.component,
+            details={"error": "Failed merge", "status": "Error\nstatus"},
+            action=Change.ACTION_FAILED_MERGE,
+        )
+        # Digest already processed is sent even if later notification crashes
+        with mock.patch.object(
+            ToDoStringsNotification, "notify_daily", side_effect=OSError
+        ), self.assertRaises(OSError):
+            notify_daily()
+        self.validate_notifications(1, "[Weblate] Digest: Repository failure")
+
     def test_digest_new_lang(self):
         self.test_digest(change=Change.ACTION_REQUESTED_LANGUAGE, subj="New language")
 
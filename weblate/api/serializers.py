@@ -20,6 +20,7 @@ from copy import copy
 from zipfile import BadZipfile
 
 from django.conf import settings
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 
 from weblate.accounts.models import Subscription
@@ -424,6 +425,17 @@ class RelatedTaskField(serializers.HyperlinkedRelatedField):
         return super().get_url(obj, view_name, request, format)
 
 
+class ComponentPermissionListSerializer(serializers.ListSerializer):
+    """List serializer evaluating permissions for all components at once."""
+
+    def to_representation(self, data):
+        components = list(data.all() if isinstance(data, BaseManager) else data)
+        self.child.vcs_allowed = self.context["request"].user.filter_perm(
+            "vcs.view", components
+        )
+        return super().to_representation(components)
+
+
 class ComponentSerializer(RemovableSerializer):
     web_url = AbsoluteURLField(source="get_absolute_url", read_only=True)
     project = ProjectSerializer(read_only=True)
@@ -471,6 +483,9 @@ class ComponentSerializer(RemovableSerializer):
         read_only=True,
     )
 
+    # IDs of components with VCS access, set by ComponentPermissionListSerializer
+    vcs_allowed = None
+
     class Meta:
         model = Component
         fields = (
@@ -535,6 +550,7 @@ class ComponentSerializer(RemovableSerializer):
             "glossary_color",
             "disable_autoshare",
         )
+        list_serializer_class = ComponentPermissionListSerializer
         extra_kwargs = {
             "url": {
                 "view_name": "api:component-detail",
@@ -553,8 +569,11 @@ class ComponentSerializer(RemovableSerializer):
     def to_representation(self, instance):
         """Remove VCS properties if user has no permission for that."""
         result = super().to_representation(instance)
-        user = self.context["request"].user
-        if not user.has_perm("vcs.view", instance):
+        if self.vcs_allowed is not None:
+            can_view = instance.pk in self.vcs_allowed
+        else:
+            can_view = self.context["request"].user.has_perm("vcs.view", instance)
+        if not can_view:
             result["vcs"] = None
             result["repo"] = None
             result["branch"] = None
@@ -1794,6 +1794,16 @@ class ComponentAPITest(APIBaseTest):
         self.assertEqual(response.data["results"][1]["slug"], "glossary")
         self.assertEqual(response.data["results"][1]["project"]["slug"], "test")
 
+    def test_list_components_vcs(self):
+        # VCS permissions evaluated for the whole list match the detail
+        for superuser in (False, True):
+            self.authenticate(superuser)
+            response = self.client.get(reverse("api:component-list"))
+            for item in response.data["results"]:
+                detail = self.client.get(item["url"])
+                self.assertEqual(item["repo"], detail.data["repo"])
+                self.assertEqual(item["vcs"], detail.data["vcs"])
+
     def test_list_components_acl(self):
         self.create_acl()
         response = self.client.get(reverse("api:component-list"))
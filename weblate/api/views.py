@@ -98,7 +98,13 @@ from weblate.trans.models import (
     Unit,
 )
 from weblate.trans.stats import get_project_stats
-from weblate.trans.tasks import auto_translate, component_removal, project_removal
+from weblate.trans.tasks import (
+    auto_translate,
+    component_removal,
+    get_commit_stats,
+    get_hook_stats,
+    project_removal,
+)
 from weblate.trans.views.files import download_multi
 from weblate.utils.celery import get_queue_stats, get_task_progress, is_task_ready
 from weblate.utils.docs import get_doc_url
@@ -1559,6 +1565,8 @@ class Metrics(APIView):
     def get(self, request, format=None):
         """Return a list of all users."""
         stats = GlobalStats()
+        commit_stats = get_commit_stats()
+        hook_stats = get_hook_stats()
         return Response(
             {
                 "units": stats.all,
@@ -1575,6 +1583,10 @@ class Metrics(APIView):
                 ).count(),
                 "suggestions": Suggestion.objects.count(),
                 "celery_queues": get_queue_stats(),
+                "commit_pending_queue": commit_stats["queue"],
+                "commit_pending_latency": commit_stats["latency"],
+                "hook_updates_pending": hook_stats["pending"],
+                "hook_updates_merged": hook_stats["merged"],
                 "name": settings.SITE_TITLE,
             }
         )
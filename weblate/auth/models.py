@@ -18,17 +18,21 @@
 #
 
 import re
+from array import array
 from collections import defaultdict
 from itertools import chain
-from typing import Optional, Set
+from typing import Dict, List, Optional, Set
+from uuid import uuid4
 
 import sentry_sdk
 from appconf import AppConf
 from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import Group as DjangoGroup
+from django.core.cache import cache
 from django.db import models
-from django.db.models.signals import m2m_changed, post_save
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.http import Http404
 from django.urls import reverse
@@ -48,7 +52,12 @@ from weblate.auth.data import (
     SELECTION_COMPONENT_LIST,
     SELECTION_MANUAL,
 )
-from weblate.auth.permissions import SPECIALS, check_global_permission, check_permission
+from weblate.auth.permissions import (
+    SPECIALS,
+    check_global_permission,
+    check_permission,
+    filter_permission,
+)
 from weblate.auth.utils import (
     create_anonymous,
     is_django_permission,
@@ -59,11 +68,86 @@ from weblate.auth.utils import (
 from weblate.lang.models import Language
 from weblate.trans.defines import FULLNAME_LENGTH, USERNAME_LENGTH
 from weblate.trans.fields import RegexField
-from weblate.trans.models import ComponentList, Project
+from weblate.trans.models import Component, ComponentList, Project
 from weblate.utils.decorators import disable_for_loaddata
 from weblate.utils.fields import EmailField, UsernameField
 from weblate.utils.validators import validate_fullname, validate_username
 
+PERMISSIONS_VERSION_KEY = "permissions-version"
+
+
+def get_permissions_version() -> str:
+    """Version of groups and roles configuration used in permission cache keys."""
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSIONS_VERSION_KEY, uuid4().hex, None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def invalidate_permissions():
+    """Invalidate cached permissions of all users."""
+    cache.set(PERMISSIONS_VERSION_KEY, uuid4().hex, None)
+
+
+def get_permissions_key(user_id: int) -> str:
+    return f"permissions-{user_id}-{get_permissions_version()}"
+
+
+def invalidate_user_permissions(user_ids):
+    """Invalidate cached permissions of given users."""
+    version = get_permissions_version()
+    cache.delete_many([f"permissions-{user_id}-{version}" for user_id in user_ids])
+
+
+def get_permission_languages(permissions: Dict[int, List], permission: str):
+    """Map IDs to languages where permission is granted.
+
+    None stands for all languages.
+    """
+    result = {}
+    for pk, values in permissions.items():
+        for codenames, languages in values:
+            if permission not in codenames:
+                continue
+            if languages is None:
+                result[pk] = None
+                break
+            result[pk] = result[pk] | languages if pk in result else languages
+    return result
+
+
+def pack_permissions(permissions: Dict[int, List], grants: Dict):
+    """Store permissions as arrays of IDs sharing same grants.
+
+    Users in groups covering many projects or components typically have same
+    grants on all of them, the grants are stored as indexes to the grants
+    table.
+    """
+    result = defaultdict(lambda: array("l"))
+    for pk, values in permissions.items():
+        key = tuple(
+            grants.setdefault(
+                (
+                    tuple(sorted(codenames)),
+                    None if languages is None else tuple(sorted(languages)),
+                ),
+                len(grants),
+            )
+            for codenames, languages in values
+        )
+        result[key].append(pk)
+    return list(result.items())
+
+
+def unpack_permissions(packed, grants: List):
+    result = defaultdict(list)
+    for key, pks in packed:
+        values = [grants[index] for index in key]
+        for pk in pks:
+            result[pk] = values
+    return result
+
 
 class Permission(models.Model):
     codename = models.CharField(max_length=100, unique=True)
@@ -251,6 +335,21 @@ class UserQuerySet(models.QuerySet):
         """All admins in a project."""
         return self.having_perm("project.edit", project)
 
+    def having_access(self, project):
+        """All users having access to a project.
+
+        This matches User.can_access_project, but evaluates all users at once.
+        """
+        groups = Group.objects.filter(
+            # Component list specific groups
+            Q(componentlists__components__project=project)
+            # Component specific groups
+            | Q(componentlists=None, components__project=project)
+            # Project specific groups
+            | Q(componentlists=None, components=None, projects=project)
+        )
+        return self.filter(Q(is_superuser=True) | Q(groups__in=groups)).distinct()
+
     def order(self):
         return self.order_by("username")
 
@@ -406,6 +505,7 @@ class User(AbstractBaseUser):
         self.extra_data = {}
         self.cla_cache = {}
         self._permissions = None
+        self.permission_lookup = {}
         self.current_subscription = None
         for name in self.DUMMY_FIELDS:
             if name in kwargs:
@@ -415,6 +515,7 @@ class User(AbstractBaseUser):
     def clear_cache(self):
         self.cla_cache = {}
         self._permissions = None
+        self.permission_lookup = {}
         perm_caches = (
             "project_permissions",
             "component_permissions",
@@ -502,6 +603,20 @@ class User(AbstractBaseUser):
         # Generic permission
         return check_permission(self, perm, obj)
 
+    def filter_perm(self, perm: str, objs) -> Set[int]:
+        """Return IDs of objects user has given permission on.
+
+        All objects have to be of the same type as the result contains only IDs.
+        """
+        objs = list(objs)
+        if len({obj.__class__ for obj in objs}) > 1:
+            raise ValueError("Objects of different types can not be filtered together")
+        if perm in SPECIALS:
+            return {obj.pk for obj in objs if self.has_perm(perm, obj)}
+        if perm not in PERMISSION_NAMES:
+            raise ValueError(f"Invalid permission: {perm}")
+        return filter_permission(self, perm, objs)
+
     def can_access_project(self, project):
         """Check access to given project."""
         if self.is_superuser:
@@ -566,10 +681,11 @@ class User(AbstractBaseUser):
     def administered_group_ids(self):
         return set(self.administered_group_set.values_list("id", flat=True))
 
-    def _fetch_permissions(self):
-        """Fetch all user permissions into a dictionary."""
+    def _calculate_permissions(self):
+        """Calculate all user permissions in compact form suitable for caching."""
         projects = defaultdict(list)
         components = defaultdict(list)
+        expiry = None
         with sentry_sdk.start_span(op="permissions", description=self.username):
             for group in self.groups.prefetch_related(
                 "roles__permissions",
@@ -621,12 +737,45 @@ class User(AbstractBaseUser):
                 # Delete expired blocks
                 block.delete()
             else:
+                if block.expiry is not None and (
+                    expiry is None or block.expiry < expiry
+                ):
+                    expiry = block.expiry
                 # Remove all permissions for blocked user
                 projects[block.project_id] = [
                     ((), languages)
                     for permissions, languages in projects[block.project_id]
                 ]
-        self._permissions = {"projects": projects, "components": components}
+        grants = {}
+        return {
+            "projects": pack_permissions(projects, grants),
+            "components": pack_permissions(components, grants),
+            "grants": list(grants),
+            "expiry": expiry,
+        }
+
+    def _fetch_permissions(self):
+        """Fetch all user permissions into a dictionary.
+
+        The permissions are cached and invalidated on changes in groups,
+        roles, memberships or blocking.
+        """
+        cache_key = get_permissions_key(self.pk) if self.pk else None
+        data = cache.get(cache_key) if cache_key else None
+        if data is None or (
+            data["expiry"] is not None and data["expiry"] <= timezone.now()
+        ):
+            data = self._calculate_permissions()
+            if cache_key:
+                cache.set(cache_key, data, 86400)
+        grants = [
+            (frozenset(codenames), None if languages is None else frozenset(languages))
+            for codenames, languages in data["grants"]
+        ]
+        self._permissions = {
+            "projects": unpack_permissions(data["projects"], grants),
+            "components": unpack_permissions(data["components"], grants),
+        }
 
     @cached_property
     def project_permissions(self):
@@ -642,6 +791,19 @@ class User(AbstractBaseUser):
             self._fetch_permissions()
         return self._permissions["components"]
 
+    def get_permission_lookup(self, permission: str):
+        """Projects and components where user has given permission.
+
+        Returns dictionaries mapping project and component IDs to allowed
+        language IDs, these are used to evaluate permission on many objects.
+        """
+        if permission not in self.permission_lookup:
+            self.permission_lookup[permission] = (
+                get_permission_languages(self.project_permissions, permission),
+                get_permission_languages(self.component_permissions, permission),
+            )
+        return self.permission_lookup[permission]
+
     def projects_with_perm(self, perm: str, explicit: bool = False):
         if not explicit and self.is_superuser:
             return Project.objects.all().order()
@@ -776,11 +938,54 @@ def remove_group_admin(sender, instance, action, pk_set, **kwargs):
     group.admins.remove(user)
 
 
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(m2m_changed, sender=Group.roles.through)
+@receiver(m2m_changed, sender=Group.projects.through)
+@receiver(m2m_changed, sender=Group.components.through)
+@receiver(m2m_changed, sender=Group.componentlists.through)
+@receiver(m2m_changed, sender=Group.languages.through)
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=ComponentList.components.through)
+def change_permissions(sender, action=None, **kwargs):
+    """Invalidate cached permissions on groups or roles changes."""
+    if action is None or action.startswith("post_"):
+        invalidate_permissions()
+
+
+@receiver(post_save, sender=Component)
+def change_component_project(sender, instance, **kwargs):
+    """Invalidate cached permissions on moving component to other project."""
+    if instance.old_component.project_id != instance.project_id:
+        invalidate_permissions()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def change_user_groups(sender, instance, action, reverse, **kwargs):
+    """Invalidate cached permissions on membership changes."""
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        invalidate_permissions()
+    else:
+        invalidate_user_permissions([instance.pk])
+
+
+@receiver(post_save, sender=UserBlock)
+@receiver(post_delete, sender=UserBlock)
+def change_user_block(sender, instance, **kwargs):
+    invalidate_user_permissions([instance.user_id])
+
+
 @receiver(post_save, sender=User)
 @disable_for_loaddata
 def auto_group_upon_save(sender, instance, created=False, **kwargs):
     """Apply automatic group assignment rules."""
     if created:
+        # Discard possibly stale permissions cached for reused ID
+        invalidate_user_permissions([instance.pk])
         auto_assign_group(instance)
 
 
@@ -17,6 +17,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from typing import Set
+
 from django.conf import settings
 
 from weblate.trans.models import (
@@ -48,50 +50,59 @@ def check_global_permission(user, permission, obj):
     return user.groups.filter(roles__permissions__codename=permission).exists()
 
 
-def check_permission(user, permission, obj):
-    """Generic permission check for base classes."""
-    if user.is_superuser:
-        return True
+def has_language(languages, language: int) -> bool:
+    return languages is None or language in languages
+
+
+def check_lookup(permission: str, lookup, obj) -> bool:
+    """Check generic permission using lookup from User.get_permission_lookup."""
+    projects, components = lookup
     if isinstance(obj, ProjectLanguage):
         obj = obj.project
     if isinstance(obj, Project):
-        return any(
-            permission in permissions
-            for permissions, _langs in user.project_permissions[obj.pk]
-        )
-    if isinstance(obj, ComponentList):
-        return all(
-            check_permission(user, permission, component)
-            for component in obj.components.iterator()
-        )
+        return obj.pk in projects
     if isinstance(obj, Component):
         return (
-            not obj.restricted
-            and any(
-                permission in permissions
-                for permissions, _langs in user.project_permissions[obj.project_id]
-            )
-        ) or any(
-            permission in permissions
-            for permissions, _langs in user.component_permissions[obj.pk]
-        )
+            not obj.restricted and obj.project_id in projects
+        ) or obj.pk in components
     if isinstance(obj, Translation):
         lang = obj.language_id
+        component = obj.component
         return (
-            not obj.component.restricted
-            and any(
-                permission in permissions and (langs is None or lang in langs)
-                for permissions, langs in user.project_permissions[
-                    obj.component.project_id
-                ]
-            )
-        ) or any(
-            permission in permissions and (langs is None or lang in langs)
-            for permissions, langs in user.component_permissions[obj.component_id]
+            not component.restricted
+            and component.project_id in projects
+            and has_language(projects[component.project_id], lang)
+        ) or (
+            obj.component_id in components
+            and has_language(components[obj.component_id], lang)
         )
     raise ValueError(f"Permission {permission} does not support: {obj.__class__}")
 
 
+def check_permission(user, permission, obj):
+    """Generic permission check for base classes."""
+    if user.is_superuser:
+        return True
+    if isinstance(obj, ComponentList):
+        return all(
+            check_permission(user, permission, component)
+            for component in obj.components.iterator()
+        )
+    return check_lookup(permission, user.get_permission_lookup(permission), obj)
+
+
+def filter_permission(user, permission, objs) -> Set[int]:
+    """Return IDs of objects user has generic permission on.
+
+    The objects have to be of single type, they are evaluated in single pass
+    using the permission lookup.
+    """
+    if user.is_superuser:
+        return {obj.pk for obj in objs}
+    lookup = user.get_permission_lookup(permission)
+    return {obj.pk for obj in objs if check_lookup(permission, lookup, obj)}
+
+
 @register_perm("comment.resolve", "comment.delete", "suggestion.delete")
 def check_delete_own(user, permission, obj):
     if user.is_authenticated and obj.user == user:
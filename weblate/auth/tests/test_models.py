@@ -18,9 +18,10 @@
 #
 
 from django.contrib.auth.models import Group as DjangoGroup
+from django.core.cache import cache
 
 from weblate.auth.data import SELECTION_ALL, SELECTION_MANUAL
-from weblate.auth.models import Group, Role, User
+from weblate.auth.models import Group, Role, User, get_permissions_key
 from weblate.lang.models import Language
 from weblate.trans.models import ComponentList, Project
 from weblate.trans.tests.test_views import FixtureTestCase
@@ -89,6 +90,98 @@ class ModelTest(FixtureTestCase):
         self.assertTrue(self.user.can_access_project(self.project))
         self.assertTrue(self.user.has_perm("unit.edit", self.translation))
 
+    def test_having_access(self):
+        def has_access():
+            return (
+                User.objects.having_access(self.project)
+                .filter(pk=self.user.pk)
+                .exists()
+            )
+
+        self.assertFalse(has_access())
+
+        # Project specific group
+        self.user.groups.add(self.group)
+        self.assertTrue(has_access())
+
+        # Component specific group overrides projects
+        other = Project.objects.create(
+            name="Other", slug="other", access_control=Project.ACCESS_PRIVATE
+        )
+        self.group.projects.add(other)
+        self.group.components.add(self.component)
+        self.assertTrue(has_access())
+        self.assertFalse(
+            User.objects.having_access(other).filter(pk=self.user.pk).exists()
+        )
+
+        # Component list overrides components
+        clist = ComponentList.objects.create(name="Test", slug="test")
+        self.group.componentlists.add(clist)
+        self.assertFalse(has_access())
+        clist.components.add(self.component)
+        self.assertTrue(has_access())
+
+        # Superusers can access everything
+        self.user.groups.clear()
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(has_access())
+
+    def test_permissions_cache(self):
+        self.user.groups.add(self.group)
+        self.assertTrue(self.user.can_access_project(self.project))
+        self.assertIsNotNone(cache.get(get_permissions_key(self.user.pk)))
+
+        # Other instances use the cached permissions
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertIn(self.project.pk, user.project_permissions)
+        self.assertFalse(user.has_perm("unit.edit", self.translation))
+
+        # Changing roles invalidates the cache
+        self.group.roles.add(Role.objects.get(name="Power user"))
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_perm("unit.edit", self.translation))
+
+        # Removing membership invalidates the cache
+        self.user.groups.remove(self.group)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.can_access_project(self.project))
+
+    def test_filter_perm(self):
+        translations = list(self.component.translation_set.all())
+        self.assertEqual(self.user.filter_perm("comment.add", translations), set())
+
+        self.user.groups.add(self.group)
+        self.group.roles.add(Role.objects.get(name="Power user"))
+        self.group.language_selection = SELECTION_MANUAL
+        self.group.save()
+        self.group.languages.set(Language.objects.filter(code="cs"), clear=True)
+        self.user.clear_cache()
+
+        self.assertEqual(
+            self.user.filter_perm("comment.add", translations),
+            {
+                translation.pk
+                for translation in translations
+                if translation.language.code == "cs"
+            },
+        )
+        self.assertEqual(
+            self.user.filter_perm("comment.add", [self.project]), {self.project.pk}
+        )
+        self.assertEqual(
+            self.user.filter_perm("comment.add", [self.component]), {self.component.pk}
+        )
+        with self.assertRaises(ValueError):
+            self.user.filter_perm("comment.add", [self.project, self.component])
+        for translation in translations:
+            self.assertEqual(
+                self.user.has_perm("comment.add", translation),
+                translation.pk in self.user.filter_perm("comment.add", [translation]),
+            )
+
     def test_languages(self):
         # Add user to group with german language
         self.user.groups.add(self.group)
@@ -19,12 +19,18 @@
 
 import os.path
 import subprocess
+import tempfile
+import threading
 from base64 import b64decode
 from email import message_from_string
 
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
-from django.http.response import HttpResponse, HttpResponseServerError
+from django.http.response import (
+    HttpResponse,
+    HttpResponseServerError,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.decorators.cache import never_cache
@@ -36,6 +42,9 @@ from weblate.gitexport.utils import find_git_http_backend
 from weblate.utils.errors import report_error
 from weblate.utils.views import get_component
 
+# Size of chunks passed from and to the Git HTTP backend
+CHUNK_SIZE = 65536
+
 
 def response_authenticate():
     """Return 401 response with authenticate header."""
@@ -117,8 +126,75 @@ def git_export(request, project, component, path):
     return run_git_http(request, obj, path)
 
 
+def feed_git_http(request, stdin):
+    """Pass request body to the Git HTTP backend in chunks."""
+    try:
+        while True:
+            chunk = request.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            stdin.write(chunk)
+    except OSError:
+        # The backend has terminated
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def read_git_http_headers(stdout):
+    """Read CGI headers, returns None if the output is incomplete."""
+    lines = []
+    for line in iter(stdout.readline, b""):
+        if line in (b"\r\n", b"\n"):
+            return message_from_string(b"".join(lines).decode())
+        lines.append(line)
+    return None
+
+
+def finish_git_http(process, stderr, kill: bool = False):
+    """Wait for the Git HTTP backend and report possible errors."""
+    if kill and process.poll() is None:
+        process.kill()
+    process.stdout.close()
+    retcode = process.wait()
+
+    stderr.seek(0)
+    output_err = stderr.read().decode()
+    stderr.close()
+
+    # Log error
+    if output_err:
+        try:
+            raise Exception(f"Git http backend error: {output_err.splitlines()[0]}")
+        except Exception:
+            report_error(cause="Git backend failure")
+
+    return retcode, output_err
+
+
+def stream_git_http(process, stderr):
+    """Relay the Git HTTP backend output."""
+    complete = False
+    try:
+        while True:
+            chunk = process.stdout.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        complete = True
+    finally:
+        finish_git_http(process, stderr, kill=not complete)
+
+
 def run_git_http(request, obj, path):
-    """Git HTTP backend execution wrapper."""
+    """Git HTTP backend execution wrapper.
+
+    The request body and the response are passed in chunks, so that the
+    pack is never held in memory.
+    """
     # Find Git HTTP backend
     git_http_backend = find_git_http_backend()
     if git_http_backend is None:
@@ -134,36 +210,35 @@ def run_git_http(request, obj, path):
         "QUERY_STRING": query,
         "HTTP_CONTENT_ENCODING": request.META.get("HTTP_CONTENT_ENCODING", ""),
     }
+    # Stderr is stored in a file to avoid blocking on a full pipe
+    stderr = tempfile.TemporaryFile()
     process = subprocess.Popen(
         [git_http_backend],
         env=process_env,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stderr=stderr,
     )
-    output, output_err = process.communicate(request.body)
-    retcode = process.poll()
+    # Feed the request in a thread as the backend can produce output before
+    # reading all input
+    feeder = threading.Thread(
+        target=feed_git_http, args=(request, process.stdin), daemon=True
+    )
+    feeder.start()
 
-    # Log error
-    if output_err:
-        output_err = output_err.decode()
-        try:
-            raise Exception(f"Git http backend error: {output_err.splitlines()[0]}")
-        except Exception:
-            report_error(cause="Git backend failure")
+    message = read_git_http_headers(process.stdout)
 
     # Handle failure
-    if retcode:
+    if message is None:
+        retcode, output_err = finish_git_http(process, stderr)
         return HttpResponseServerError(output_err)
 
-    headers, content = output.split(b"\r\n\r\n", 1)
-    message = message_from_string(headers.decode())
-
     # Handle status in response
     if "status" in message:
+        finish_git_http(process, stderr, kill=True)
         return HttpResponse(status=int(message["status"].split()[0]))
 
     # Send content
-    response = HttpResponse(content_type=message["content-type"])
-    response.write(content)
-    return response
+    return StreamingHttpResponse(
+        stream_git_http(process, stderr), content_type=message["content-type"]
+    )
@@ -17,21 +17,37 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import os
+import pickle
 import re
+import threading
+from collections import OrderedDict, defaultdict
+from glob import glob
 from itertools import chain
+from time import time
+from uuid import uuid4
 
 import ahocorasick
+from django.core.cache import cache
 from django.db.models import Q
 from django.db.models.functions import Lower
 
 from weblate.trans.models.unit import Unit
 from weblate.trans.util import PLURAL_SEPARATOR
+from weblate.utils.data import data_dir
 from weblate.utils.db import re_escape, using_postgresql
 from weblate.utils.state import STATE_TRANSLATED
 
 SPLIT_RE = re.compile(r"[\s,.:!?]+", re.UNICODE)
 NON_WORD_RE = re.compile(r"\W", re.UNICODE)
 
+# Number of automatons kept in the process memory
+AUTOMATON_MEMORY_SIZE = 32
+AUTOMATON_MEMORY: OrderedDict = OrderedDict()
+AUTOMATON_MEMORY_LOCK = threading.Lock()
+# Outdated automaton files are kept for this long (in seconds)
+AUTOMATON_GRACE_PERIOD = 3600
+
 
 def get_glossary_sources(component):
     # Fetch list of terms defined in a translation
@@ -59,16 +75,77 @@ def get_glossary_automaton(project):
     return automaton
 
 
-def get_glossary_terms(unit):
-    """Return list of term pairs for an unit."""
-    if unit.glossary_terms is not None:
-        return unit.glossary_terms
-    translation = unit.translation
-    language = translation.language
-    component = translation.component
-    project = component.project
-    source_language = component.source_language
+def get_glossary_automaton_path(project, version: str = "*"):
+    return data_dir("cache", "glossary", f"{project.pk}-{version}.automaton")
+
+
+def remember_glossary_automaton(project, version: str, automaton):
+    key = (project.pk, version)
+    with AUTOMATON_MEMORY_LOCK:
+        AUTOMATON_MEMORY[key] = automaton
+        AUTOMATON_MEMORY.move_to_end(key)
+        while len(AUTOMATON_MEMORY) > AUTOMATON_MEMORY_SIZE:
+            AUTOMATON_MEMORY.popitem(last=False)
+
+
+def store_glossary_automaton(project):
+    """Build glossary automaton and store it for all processes.
+
+    The automaton is saved to a versioned file and the current version is
+    kept in the cache.
+    """
+    automaton = get_glossary_automaton(project)
+    version = uuid4().hex
+    filename = get_glossary_automaton_path(project, version)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temp_name = f"{filename}.tmp"
+    automaton.save(temp_name, pickle.dumps)
+    os.replace(temp_name, filename)
+    cache.set(project.glossary_automaton_key, version, 30 * 86400)
+    remember_glossary_automaton(project, version, automaton)
 
+    # Remove outdated versions, the recent ones might be still in use by
+    # concurrent builds or processes which have just read the version
+    current = get_glossary_automaton_path(
+        project, cache.get(project.glossary_automaton_key, version)
+    )
+    cutoff = time() - AUTOMATON_GRACE_PERIOD
+    for name in glob(get_glossary_automaton_path(project)):
+        if name == current:
+            continue
+        try:
+            if os.path.getmtime(name) < cutoff:
+                os.unlink(name)
+        except FileNotFoundError:
+            continue
+    return automaton
+
+
+def load_glossary_automaton(project):
+    """Return current glossary automaton, loading it from the file if needed."""
+    version = cache.get(project.glossary_automaton_key)
+    if version is not None:
+        with AUTOMATON_MEMORY_LOCK:
+            automaton = AUTOMATON_MEMORY.get((project.pk, version))
+            if automaton is not None:
+                AUTOMATON_MEMORY.move_to_end((project.pk, version))
+                return automaton
+        try:
+            automaton = ahocorasick.load(
+                get_glossary_automaton_path(project, version),
+                pickle.loads,
+            )
+        except FileNotFoundError:
+            # Removed meanwhile by newer version
+            pass
+        else:
+            remember_glossary_automaton(project, version, automaton)
+            return automaton
+    return store_glossary_automaton(project)
+
+
+def get_glossary_units(project, source_language, language):
+    """Return base queryset for glossary units in the project."""
     units = (
         Unit.objects.prefetch()
         .select_related("source_unit")
@@ -76,6 +153,18 @@ def get_glossary_terms(unit):
     )
     if language == source_language:
         return units.none()
+    return units.filter(
+        translation__component__in=project.glossaries,
+        translation__component__source_language=source_language,
+        translation__language=language,
+    )
+
+
+def get_glossary_matches(unit):
+    """Return set of glossary terms present in the unit source."""
+    translation = unit.translation
+    component = translation.component
+    source_language = component.source_language
 
     # Build complete source for matching
     parts = []
@@ -88,7 +177,7 @@ def get_glossary_terms(unit):
     uses_ngram = source_language.uses_ngram()
 
     matches = set()
-    automaton = project.glossary_automaton
+    automaton = component.project.glossary_automaton
     if automaton.kind == ahocorasick.AHOCORASICK:
 
         # Extract terms present in the source
@@ -98,23 +187,78 @@ def get_glossary_terms(unit):
                 and (end + 1 == len(source) or NON_WORD_RE.match(source[end + 1]))
             ):
                 matches.add(term)
+    return matches
 
+
+def get_glossary_query(matches):
     if using_postgresql():
         match = r"^({})$".format("|".join(re_escape(term) for term in matches))
         # Use regex as that is utilizing pg_trgm index
-        query = Q(source__iregex=match) | Q(variant__unit__source__iregex=match)
-    else:
-        # With MySQL we utilize it does case insensitive lookup
-        query = Q(source__in=matches) | Q(variant__unit__source__in=matches)
+        return Q(source__iregex=match) | Q(variant__unit__source__iregex=match)
+    # With MySQL we utilize it does case insensitive lookup
+    return Q(source__in=matches) | Q(variant__unit__source__in=matches)
 
-    units = units.filter(
-        query,
-        translation__component__in=project.glossaries,
-        translation__component__source_language=source_language,
-        translation__language=language,
-    ).distinct()
+
+def get_glossary_terms(unit):
+    """Return list of term pairs for an unit."""
+    if unit.glossary_terms is not None:
+        return unit.glossary_terms
+    translation = unit.translation
+    component = translation.component
+
+    units = get_glossary_units(
+        component.project, component.source_language, translation.language
+    )
+    if translation.language == component.source_language:
+        return units
+
+    units = units.filter(get_glossary_query(get_glossary_matches(unit))).distinct()
 
     # Store in a unit cache
     unit.glossary_terms = units
 
     return units
+
+
+def prefetch_glossary_terms(units):
+    """Fetch glossary terms for a list of units.
+
+    Uses single query for all units sharing project and languages instead
+    of query per unit.
+    """
+    groups = defaultdict(list)
+    for unit in units:
+        if unit.glossary_terms is not None:
+            continue
+        translation = unit.translation
+        component = translation.component
+        groups[
+            (component.project, component.source_language, translation.language)
+        ].append(unit)
+
+    for (project, source_language, language), group in groups.items():
+        base = get_glossary_units(project, source_language, language)
+        matches = {unit.pk: get_glossary_matches(unit) for unit in group}
+        all_matches = set(chain.from_iterable(matches.values()))
+        if language == source_language or not all_matches:
+            for unit in group:
+                unit.glossary_terms = base.none()
+            continue
+
+        glossary = list(base.filter(get_glossary_query(all_matches)).distinct())
+
+        # Sources of the variants to match terms through variants
+        variants = defaultdict(set)
+        for variant_id, source in Unit.objects.filter(
+            variant__in={term.variant_id for term in glossary if term.variant_id}
+        ).values_list("variant_id", Lower("source")):
+            variants[variant_id].add(source)
+
+        for unit in group:
+            unit_matches = matches[unit.pk]
+            unit.glossary_terms = [
+                term
+                for term in glossary
+                if term.source.lower() in unit_matches
+                or variants[term.variant_id] & unit_matches
+            ]
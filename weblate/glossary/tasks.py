@@ -18,8 +18,10 @@
 #
 from typing import Optional
 
+from django.core.cache import cache
+
 from weblate.lang.models import Language
-from weblate.trans.models import Component
+from weblate.trans.models import Component, Project
 from weblate.utils.celery import app
 from weblate.utils.lock import WeblateLockTimeout
 
@@ -69,3 +71,22 @@ def sync_terminology(pk: int, component: Optional[Component] = None):
     component.source_translation.sync_terminology()
 
     return {"component": pk}
+
+
+def schedule_glossary_automaton(pk: int):
+    """Schedule glossary automaton rebuild unless it is already pending."""
+    if cache.add(f"project-glossary-{pk}-update", 1, 3600):
+        update_glossary_automaton.delay(pk)
+
+
+@app.task(trail=False)
+def update_glossary_automaton(pk: int):
+    from weblate.glossary.models import store_glossary_automaton
+
+    # Allow scheduling another update for changes done while building
+    cache.delete(f"project-glossary-{pk}-update")
+    try:
+        project = Project.objects.get(pk=pk)
+    except Project.DoesNotExist:
+        return
+    store_glossary_automaton(project)
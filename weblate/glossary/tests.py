@@ -20,10 +20,20 @@
 """Test for glossary manipulations."""
 
 import json
+import os
+from time import time
 
+from django.core.cache import cache
+from django.test.utils import override_settings
 from django.urls import reverse
 
-from weblate.glossary.models import get_glossary_terms
+from weblate.glossary.models import (
+    AUTOMATON_GRACE_PERIOD,
+    get_glossary_automaton_path,
+    get_glossary_terms,
+    prefetch_glossary_terms,
+    store_glossary_automaton,
+)
 from weblate.glossary.tasks import sync_terminology
 from weblate.trans.models import Unit
 from weblate.trans.tests.test_views import ViewTestCase
@@ -252,6 +262,25 @@ class GlossaryTest(ViewTestCase):
             {"thank", "thank you", "thank you for using Weblate"},
         )
 
+    def test_prefetch_terms(self):
+        self.add_term("hello", "ahoj")
+        self.add_term("thank", "děkujeme")
+        self.add_term("thank you", "děkujeme vám")
+
+        units = list(
+            self.component.translation_set.get(language_code="cs").unit_set.all()
+        )
+        prefetch_glossary_terms(units)
+        found = set()
+        for unit in units:
+            terms = {term.source for term in unit.glossary_terms}
+            found.update(terms)
+            unit.glossary_terms = None
+            self.assertEqual(
+                terms, set(get_glossary_terms(unit).values_list("source", flat=True))
+            )
+        self.assertEqual(found, {"hello", "thank", "thank you"})
+
     def test_substrings(self):
         self.add_term("reach", "dojet")
         self.add_term("breach", "prolomit")
@@ -336,6 +365,41 @@ class GlossaryTest(ViewTestCase):
         content = json.loads(response.content.decode())
         self.assertEqual(content["responseCode"], 200)
 
+    def test_automaton_background(self):
+        self.assertIsNotNone(self.project.glossary_automaton)
+        key = self.project.glossary_automaton_key
+        version = cache.get(key)
+        self.assertTrue(
+            os.path.exists(get_glossary_automaton_path(self.project, version))
+        )
+
+        with override_settings(
+            CELERY_TASK_ALWAYS_EAGER=False
+        ), self.captureOnCommitCallbacks() as callbacks:
+            self.glossary_component.invalidate_glossary_cache()
+            # Outdated automaton is used until the update is completed
+            self.assertEqual(cache.get(key), version)
+        for callback in callbacks:
+            callback()
+
+        new_version = cache.get(key)
+        self.assertNotEqual(new_version, version)
+        self.assertTrue(
+            os.path.exists(get_glossary_automaton_path(self.project, new_version))
+        )
+        # Previous version is kept for processes which might still use it
+        filename = get_glossary_automaton_path(self.project, version)
+        self.assertTrue(os.path.exists(filename))
+
+        # Outdated versions are removed once the grace period is over
+        outdated = time() - AUTOMATON_GRACE_PERIOD - 1
+        os.utime(filename, (outdated, outdated))
+        store_glossary_automaton(self.project)
+        self.assertFalse(os.path.exists(filename))
+        self.assertTrue(
+            os.path.exists(get_glossary_automaton_path(self.project, new_version))
+        )
+
     def test_add_duplicate(self):
         self.test_add()
         self.test_add()
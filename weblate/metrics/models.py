@@ -18,20 +18,17 @@
 #
 import datetime
 from collections import defaultdict
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set
 
 from django.core.cache import cache
 from django.db import models
 from django.db.models import Count, Q
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 from weblate.auth.models import User
 from weblate.lang.models import Language
 from weblate.memory.models import Memory
 from weblate.screenshots.models import Screenshot
 from weblate.trans.models import Change, Component, ComponentList, Project, Translation
-from weblate.utils.decorators import disable_for_loaddata
 from weblate.utils.stats import GlobalStats, ProjectLanguage, prefetch_stats
 
 BASIC_KEYS = {
@@ -55,6 +52,15 @@ SOURCE_KEYS = BASIC_KEYS | {
     "source_strings",
     "source_words",
 }
+# Daily activity metrics, these are zero most of the time
+ACTIVITY_KEYS = {
+    "changes",
+    "contributors",
+    "comments",
+    "suggestions",
+    "translations",
+    "screenshots",
+}
 
 METRIC_ALL = 1
 METRIC_ALL_WORDS = 2
@@ -83,6 +89,7 @@ METRIC_COMPONENTS = 24
 METRIC_TRANSLATIONS = 25
 METRIC_MACHINERY_INTERNAL = 26
 METRIC_MACHINERY_EXTERNAL = 27
+METRIC_COLLECTED = 28
 
 METRIC_IDS = {
     "all": METRIC_ALL,
@@ -112,10 +119,16 @@ METRIC_IDS = {
     "translations": METRIC_TRANSLATIONS,
     "machinery:internal": METRIC_MACHINERY_INTERNAL,
     "machinery:external": METRIC_MACHINERY_EXTERNAL,
+    "collected": METRIC_COLLECTED,
 }
 
 METRIC_NAMES = {value: name for name, value in METRIC_IDS.items()}
 
+# Number of metrics written at once
+METRIC_BATCH = 1000
+
+NO_CHANGES = {"changes": 0, "contributors": 0}
+
 
 def get_metric_names(values):
     """Convert numeric kind to human friendly names."""
@@ -169,7 +182,20 @@ class MetricQuerySet(models.QuerySet):
         # this is when name filtering is passed in the kwargs.
         if not data or (len(data.keys()) <= 1 and "kind" not in kwargs):
             data.update(Metric.objects.collect_auto(obj))
-        return data
+        # Zero activity metrics are not stored
+        return defaultdict(int, data)
+
+    def get_collected_dates(self, dates: List[datetime.date]) -> Set[datetime.date]:
+        """
+        Dates when metrics for all objects were collected.
+
+        Activity metrics missing on these dates are zero.
+        """
+        return set(
+            self.filter(
+                scope=Metric.SCOPE_COLLECTED, kind=METRIC_COLLECTED, date__in=dates
+            ).values_list("date", flat=True)
+        )
 
     def get_past(
         self, scope: int, relation: int, secondary: int = 0, delta: int = 30, **kwargs
@@ -196,45 +222,75 @@ class MetricsManager(models.Manager):
         relation: int,
         secondary: int = 0,
         date=None,
+        batch: Optional[List] = None,
+        sparse: bool = True,
     ):
+        """
+        Store metrics.
+
+        Zero activity metrics are skipped unless sparse is False, a missing
+        value on a date with collected metrics means zero.
+        """
         if stats is not None:
             for key in keys:
                 data[key] = getattr(stats, key)
         if date is None:
             date = datetime.date.today()
 
-        self.bulk_create(
-            [
-                Metric(
-                    scope=scope,
-                    relation=relation,
-                    secondary=secondary,
-                    kind=METRIC_IDS[name],
-                    value=value,
-                    date=date,
-                )
-                for name, value in data.items()
-            ],
-            ignore_conflicts=True,
-        )
+        metrics = [
+            Metric(
+                scope=scope,
+                relation=relation,
+                secondary=secondary,
+                kind=METRIC_IDS[name],
+                value=value,
+                date=date,
+            )
+            for name, value in data.items()
+            if value or not sparse or name not in ACTIVITY_KEYS
+        ]
+        if batch is None:
+            self.bulk_create(metrics, ignore_conflicts=True)
+        else:
+            batch.extend(metrics)
+            if len(batch) >= METRIC_BATCH:
+                self.flush_metrics(batch)
+
+    def flush_metrics(self, batch: List):
+        """Write metrics collected by create_metrics."""
+        self.bulk_create(batch, ignore_conflicts=True, batch_size=METRIC_BATCH)
+        batch.clear()
 
-    def initialize_metrics(self, scope: int, relation: int, secondary: int = 0):
+    @staticmethod
+    def count_changes(changes, *fields):
+        """
+        Count changes from yesterday and contributors in last 30 days.
+
+        Without fields a single dictionary is returned, otherwise the counts
+        are grouped by the fields.
+        """
         today = datetime.date.today()
-        # 2 years + one day for leap years
-        self.bulk_create(
-            [
-                Metric(
-                    scope=scope,
-                    relation=relation,
-                    secondary=secondary,
-                    kind=METRIC_CHANGES,
-                    value=0,
-                    date=today - datetime.timedelta(days=day),
-                )
-                for day in range(2 * 365 + 1)
-            ],
-            ignore_conflicts=True,
+        changes = changes.filter(
+            timestamp__date__gte=today - datetime.timedelta(days=30)
         )
+        aggregates = {
+            "changes": Count(
+                "id", filter=Q(timestamp__date=today - datetime.timedelta(days=1))
+            ),
+            "contributors": Count("user", distinct=True),
+        }
+        if not fields:
+            return changes.aggregate(**aggregates)
+        result = {}
+        for item in changes.values(*fields).annotate(**aggregates).order_by():
+            key = tuple(item.pop(field) for field in fields)
+            result[key if len(fields) > 1 else key[0]] = item
+        return result
+
+    @staticmethod
+    def count_grouped(queryset, field: str) -> Dict[int, int]:
+        """Count objects grouped by field."""
+        return dict(queryset.values_list(field).annotate(Count("id")).order_by())
 
     def calculate_changes(
         self, date, obj, scope: int, relation: int, secondary: int = 0
@@ -267,7 +323,14 @@ class MetricsManager(models.Manager):
             timestamp__date=date - datetime.timedelta(days=1)
         ).count()
         self.create_metrics(
-            {"changes": count}, None, set(), scope, relation, secondary, date=date
+            {"changes": count},
+            None,
+            set(),
+            scope,
+            relation,
+            secondary,
+            date=date,
+            sparse=False,
         )
         return count
 
@@ -296,38 +359,29 @@ class MetricsManager(models.Manager):
             "translations": Translation.objects.count(),
             "memory": Memory.objects.count(),
             "screenshots": Screenshot.objects.count(),
-            "changes": Change.objects.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-            ).count(),
-            "contributors": Change.objects.filter(
-                timestamp__date__gte=datetime.date.today() - datetime.timedelta(days=30)
-            )
-            .values("user")
-            .distinct()
-            .count(),
             "users": User.objects.count(),
         }
+        data.update(self.count_changes(Change.objects.all()))
         self.create_metrics(data, stats, SOURCE_KEYS, Metric.SCOPE_GLOBAL, 0)
         return data
 
-    def collect_project_language(self, project_language: ProjectLanguage):
-        project = project_language.project
-        changes = project.change_set.filter(
-            translation__language=project_language.language
-        )
+    def mark_collected(self):
+        """Record that metrics for all objects were collected today."""
+        self.create_metrics({"collected": 1}, None, set(), Metric.SCOPE_COLLECTED, 0)
 
-        data = {
-            "changes": changes.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1),
-            ).count(),
-            "contributors": changes.filter(
-                timestamp__date__gte=datetime.date.today()
-                - datetime.timedelta(days=30),
+    def collect_project_language(
+        self,
+        project_language: ProjectLanguage,
+        data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
+        project = project_language.project
+        if data is None:
+            data = self.count_changes(
+                project.change_set.filter(
+                    translation__language=project_language.language
+                )
             )
-            .values("user")
-            .distinct()
-            .count(),
-        }
 
         self.create_metrics(
             data,
@@ -336,34 +390,40 @@ class MetricsManager(models.Manager):
             Metric.SCOPE_PROJECT_LANGUAGE,
             project.pk,
             project_language.language.pk,
+            batch=batch,
         )
         return data
 
-    def collect_project(self, project: Project):
+    def collect_project(
+        self,
+        project: Project,
+        data: Optional[Dict] = None,
+        language_data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
         languages = prefetch_stats(
             [ProjectLanguage(project, language) for language in project.languages]
         )
         for project_language in languages:
-            self.collect_project_language(project_language)
-        data = {
-            "components": project.component_set.count(),
-            "translations": Translation.objects.filter(
-                component__project=project
-            ).count(),
-            "memory": project.memory_set.count(),
-            "screenshots": Screenshot.objects.filter(
-                translation__component__project=project
-            ).count(),
-            "changes": project.change_set.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-            ).count(),
-            "contributors": project.change_set.filter(
-                timestamp__date__gte=datetime.date.today() - datetime.timedelta(days=30)
+            self.collect_project_language(
+                project_language,
+                None
+                if language_data is None
+                else dict(language_data.get(project_language.language.pk, NO_CHANGES)),
+                batch=batch,
             )
-            .values("user")
-            .distinct()
-            .count(),
-        }
+        if data is None:
+            data = {
+                "components": project.component_set.count(),
+                "translations": Translation.objects.filter(
+                    component__project=project
+                ).count(),
+                "memory": project.memory_set.count(),
+                "screenshots": Screenshot.objects.filter(
+                    translation__component__project=project
+                ).count(),
+            }
+            data.update(self.count_changes(project.change_set.all()))
         keys = [
             f"machinery-accounting:internal:{project.id}",
             f"machinery-accounting:external:{project.id}",
@@ -376,84 +436,176 @@ class MetricsManager(models.Manager):
         cache.delete_many(keys)
 
         self.create_metrics(
-            data, project.stats, SOURCE_KEYS, Metric.SCOPE_PROJECT, project.pk
+            data,
+            project.stats,
+            SOURCE_KEYS,
+            Metric.SCOPE_PROJECT,
+            project.pk,
+            batch=batch,
         )
         return data
 
-    def collect_component(self, component: Component):
-        data = {
-            "translations": component.translation_set.count(),
-            "screenshots": Screenshot.objects.filter(
-                translation__component=component
-            ).count(),
-            "changes": component.change_set.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-            ).count(),
-            "contributors": component.change_set.filter(
-                timestamp__date__gte=datetime.date.today() - datetime.timedelta(days=30)
+    def collect_projects(self, pks: List[int]):
+        """Collect metrics for projects using grouped queries."""
+        changes = self.count_changes(
+            Change.objects.filter(project__in=pks),
+            "project",
+            "translation__language",
+        )
+        language_data = defaultdict(dict)
+        for (project, language), value in changes.items():
+            if language is not None:
+                language_data[project][language] = value
+        components = self.count_grouped(
+            Component.objects.filter(project__in=pks), "project"
+        )
+        translations = self.count_grouped(
+            Translation.objects.filter(component__project__in=pks),
+            "component__project",
+        )
+        memory = self.count_grouped(Memory.objects.filter(project__in=pks), "project")
+        screenshots = self.count_grouped(
+            Screenshot.objects.filter(translation__component__project__in=pks),
+            "translation__component__project",
+        )
+        project_changes = self.count_changes(
+            Change.objects.filter(project__in=pks), "project"
+        )
+        batch = []
+        for project in prefetch_stats(Project.objects.filter(pk__in=pks)):
+            data = {
+                "components": components.get(project.pk, 0),
+                "translations": translations.get(project.pk, 0),
+                "memory": memory.get(project.pk, 0),
+                "screenshots": screenshots.get(project.pk, 0),
+            }
+            data.update(project_changes.get(project.pk, NO_CHANGES))
+            self.collect_project(
+                project, data, language_data.get(project.pk, {}), batch=batch
             )
-            .values("user")
-            .distinct()
-            .count(),
-        }
+        self.flush_metrics(batch)
+
+    def collect_component(
+        self,
+        component: Component,
+        data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
+        if data is None:
+            data = {
+                "translations": component.translation_set.count(),
+                "screenshots": Screenshot.objects.filter(
+                    translation__component=component
+                ).count(),
+            }
+            data.update(self.count_changes(component.change_set.all()))
         self.create_metrics(
-            data, component.stats, SOURCE_KEYS, Metric.SCOPE_COMPONENT, component.pk
+            data,
+            component.stats,
+            SOURCE_KEYS,
+            Metric.SCOPE_COMPONENT,
+            component.pk,
+            batch=batch,
         )
         return data
 
-    def collect_component_list(self, clist: ComponentList):
-        changes = Change.objects.filter(component__in=clist.components.all())
-        data = {
-            "changes": changes.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-            ).count(),
-            "contributors": changes.filter(
-                timestamp__date__gte=datetime.date.today() - datetime.timedelta(days=30)
+    def collect_components(self, pks: List[int]):
+        """Collect metrics for components using grouped queries."""
+        translations = self.count_grouped(
+            Translation.objects.filter(component__in=pks), "component"
+        )
+        screenshots = self.count_grouped(
+            Screenshot.objects.filter(translation__component__in=pks),
+            "translation__component",
+        )
+        changes = self.count_changes(
+            Change.objects.filter(component__in=pks), "component"
+        )
+        batch = []
+        for component in prefetch_stats(Component.objects.filter(pk__in=pks)):
+            data = {
+                "translations": translations.get(component.pk, 0),
+                "screenshots": screenshots.get(component.pk, 0),
+            }
+            data.update(changes.get(component.pk, NO_CHANGES))
+            self.collect_component(component, data, batch=batch)
+        self.flush_metrics(batch)
+
+    def collect_component_list(
+        self,
+        clist: ComponentList,
+        data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
+        if data is None:
+            data = self.count_changes(
+                Change.objects.filter(component__in=clist.components.all())
             )
-            .values("user")
-            .distinct()
-            .count(),
-        }
         self.create_metrics(
             data,
             clist.stats,
             SOURCE_KEYS,
             Metric.SCOPE_COMPONENT_LIST,
             clist.pk,
+            batch=batch,
         )
         return data
 
-    def collect_translation(self, translation: Translation):
-        data = {
-            "screenshots": translation.screenshot_set.count(),
-            "changes": translation.change_set.filter(
-                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-            ).count(),
-            "contributors": translation.change_set.filter(
-                timestamp__date__gte=datetime.date.today() - datetime.timedelta(days=30)
+    def collect_component_lists(self, pks: List[int]):
+        """Collect metrics for component lists using grouped queries."""
+        changes = self.count_changes(
+            Change.objects.filter(component__componentlist__in=pks),
+            "component__componentlist",
+        )
+        batch = []
+        for clist in prefetch_stats(ComponentList.objects.filter(pk__in=pks)):
+            self.collect_component_list(
+                clist, dict(changes.get(clist.pk, NO_CHANGES)), batch=batch
             )
-            .values("user")
-            .distinct()
-            .count(),
-        }
+        self.flush_metrics(batch)
+
+    def collect_translation(
+        self,
+        translation: Translation,
+        data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
+        if data is None:
+            data = {"screenshots": translation.screenshot_set.count()}
+            data.update(self.count_changes(translation.change_set.all()))
         self.create_metrics(
             data,
             translation.stats,
             BASIC_KEYS,
             Metric.SCOPE_TRANSLATION,
             translation.pk,
+            batch=batch,
         )
         return data
 
-    def collect_user(self, user: User):
-        data = user.change_set.filter(
-            timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
-        ).aggregate(
-            changes=Count("id"),
-            comments=Count("id", filter=Q(action=Change.ACTION_COMMENT)),
-            suggestions=Count("id", filter=Q(action=Change.ACTION_SUGGESTION)),
-            translations=Count("id", filter=Q(action__in=Change.ACTIONS_CONTENT)),
-            screenshots=Count(
+    def collect_translations(self, pks: List[int]):
+        """Collect metrics for translations using grouped queries."""
+        screenshots = self.count_grouped(
+            Screenshot.objects.filter(translation__in=pks), "translation"
+        )
+        changes = self.count_changes(
+            Change.objects.filter(translation__in=pks), "translation"
+        )
+        batch = []
+        for translation in prefetch_stats(Translation.objects.filter(pk__in=pks)):
+            data = {"screenshots": screenshots.get(translation.pk, 0)}
+            data.update(changes.get(translation.pk, NO_CHANGES))
+            self.collect_translation(translation, data, batch=batch)
+        self.flush_metrics(batch)
+
+    @staticmethod
+    def get_user_aggregates():
+        return {
+            "changes": Count("id"),
+            "comments": Count("id", filter=Q(action=Change.ACTION_COMMENT)),
+            "suggestions": Count("id", filter=Q(action=Change.ACTION_SUGGESTION)),
+            "translations": Count("id", filter=Q(action__in=Change.ACTIONS_CONTENT)),
+            "screenshots": Count(
                 "id",
                 filter=Q(
                     action__in=(
@@ -462,33 +614,70 @@ class MetricsManager(models.Manager):
                     )
                 ),
             ),
-        )
-        self.create_metrics(data, None, None, Metric.SCOPE_USER, user.pk)
+        }
+
+    def collect_user(
+        self, user: User, data: Optional[Dict] = None, batch: Optional[List] = None
+    ):
+        if data is None:
+            data = user.change_set.filter(
+                timestamp__date=datetime.date.today() - datetime.timedelta(days=1)
+            ).aggregate(**self.get_user_aggregates())
+        self.create_metrics(data, None, None, Metric.SCOPE_USER, user.pk, batch=batch)
         return data
 
-    def collect_language(self, language: Language):
-        changes = Change.objects.filter(translation__language=language)
-        data = {
-            "changes": changes.filter(
+    def collect_users(self, pks: List[int]):
+        """Collect metrics for users using grouped queries."""
+        aggregates = self.get_user_aggregates()
+        changes = {
+            item.pop("user"): item
+            for item in Change.objects.filter(
+                user__in=pks,
                 timestamp__date=datetime.date.today() - datetime.timedelta(days=1),
-            ).count(),
-            "contributors": changes.filter(
-                timestamp__date__gte=datetime.date.today()
-                - datetime.timedelta(days=30),
             )
             .values("user")
-            .distinct()
-            .count(),
+            .annotate(**aggregates)
+            .order_by()
         }
+        empty = dict.fromkeys(aggregates, 0)
+        batch = []
+        for user in User.objects.filter(pk__in=pks):
+            self.collect_user(user, changes.get(user.pk, dict(empty)), batch=batch)
+        self.flush_metrics(batch)
+
+    def collect_language(
+        self,
+        language: Language,
+        data: Optional[Dict] = None,
+        batch: Optional[List] = None,
+    ):
+        if data is None:
+            data = self.count_changes(
+                Change.objects.filter(translation__language=language)
+            )
         self.create_metrics(
             data,
             language.stats,
             SOURCE_KEYS,
             Metric.SCOPE_LANGUAGE,
             language.pk,
+            batch=batch,
         )
         return data
 
+    def collect_languages(self, pks: List[int]):
+        """Collect metrics for languages using grouped queries."""
+        changes = self.count_changes(
+            Change.objects.filter(translation__language__in=pks),
+            "translation__language",
+        )
+        batch = []
+        for language in prefetch_stats(Language.objects.filter(pk__in=pks)):
+            self.collect_language(
+                language, dict(changes.get(language.pk, NO_CHANGES)), batch=batch
+            )
+        self.flush_metrics(batch)
+
 
 class Metric(models.Model):
     SCOPE_GLOBAL = 0
@@ -499,6 +688,8 @@ class Metric(models.Model):
     SCOPE_COMPONENT_LIST = 5
     SCOPE_PROJECT_LANGUAGE = 6
     SCOPE_LANGUAGE = 7
+    # Marker written once metrics for all objects have been collected
+    SCOPE_COLLECTED = 8
 
     date = models.DateField(default=datetime.date.today)
     scope = models.SmallIntegerField()
@@ -521,37 +712,3 @@ class Metric(models.Model):
 
     def get_name(self):
         return METRIC_NAMES[self.kind]
-
-
-@receiver(post_save, sender=Project)
-@disable_for_loaddata
-def create_metrics_project(sender, instance, created=False, **kwargs):
-    if created:
-        Metric.objects.initialize_metrics(
-            scope=Metric.SCOPE_PROJECT, relation=instance.pk
-        )
-
-
-@receiver(post_save, sender=Component)
-@disable_for_loaddata
-def create_metrics_component(sender, instance, created=False, **kwargs):
-    if created:
-        Metric.objects.initialize_metrics(
-            scope=Metric.SCOPE_COMPONENT, relation=instance.pk
-        )
-
-
-@receiver(post_save, sender=Translation)
-@disable_for_loaddata
-def create_metrics_translation(sender, instance, created=False, **kwargs):
-    if created:
-        Metric.objects.initialize_metrics(
-            scope=Metric.SCOPE_TRANSLATION, relation=instance.pk
-        )
-
-
-@receiver(post_save, sender=User)
-@disable_for_loaddata
-def create_metrics_user(sender, instance, created=False, **kwargs):
-    if created:
-        Metric.objects.initialize_metrics(scope=Metric.SCOPE_USER, relation=instance.pk)
@@ -18,66 +18,97 @@
 #
 
 from datetime import timedelta
+from typing import List
 
+from celery import chord
 from celery.schedules import crontab
 from django.utils import timezone
 
 from weblate.auth.models import User
 from weblate.lang.models import Language
-from weblate.metrics.models import Metric
+from weblate.metrics.models import ACTIVITY_KEYS, METRIC_IDS, Metric
 from weblate.trans.models import Component, ComponentList, Project, Translation
 from weblate.utils.celery import app
-from weblate.utils.stats import prefetch_stats
+
+# Number of objects processed by single task
+METRICS_CHUNK = 1000
+
+ACTIVITY_KINDS = [METRIC_IDS[name] for name in ACTIVITY_KEYS]
 
 
 @app.task(trail=False)
 def collect_metrics():
     Metric.objects.collect_global()
-    for project in prefetch_stats(Project.objects.all()):
-        Metric.objects.collect_project(project)
-    for component in prefetch_stats(Component.objects.all()):
-        Metric.objects.collect_component(component)
-    for clist in prefetch_stats(ComponentList.objects.all()):
-        Metric.objects.collect_component_list(clist)
-    for translation in prefetch_stats(Translation.objects.all()):
-        Metric.objects.collect_translation(translation)
-    for user in User.objects.filter(is_active=True):
-        Metric.objects.collect_user(user)
-    for language in prefetch_stats(Language.objects.all()):
-        Metric.objects.collect_language(language)
+    chunks = []
+    for name, queryset in (
+        ("projects", Project.objects.all()),
+        ("components", Component.objects.all()),
+        ("component_lists", ComponentList.objects.all()),
+        ("translations", Translation.objects.all()),
+        ("users", User.objects.filter(is_active=True)),
+        ("languages", Language.objects.all()),
+    ):
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+        for offset in range(0, len(pks), METRICS_CHUNK):
+            chunks.append(
+                collect_metrics_chunk.si(name, pks[offset : offset + METRICS_CHUNK])
+            )
+    # The collection is complete only once all chunks have been processed,
+    # missing activity metrics are treated as zero after that
+    if chunks:
+        chord(chunks)(finish_metrics.si())
+    else:
+        finish_metrics()
+
+
+@app.task(trail=False)
+def collect_metrics_chunk(name: str, pks: List[int]):
+    getattr(Metric.objects, f"collect_{name}")(pks)
+
+
+@app.task(trail=False)
+def finish_metrics():
+    Metric.objects.mark_collected()
 
 
 @app.task(trail=False)
 def cleanup_metrics():
     """Remove stale metrics."""
     # Remove metrics for deleted objects
-    projects = Project.objects.values_list("pk", flat=True)
-    Metric.objects.filter(scope=Metric.SCOPE_PROJECT).exclude(
-        relation__in=projects
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_PROJECT_LANGUAGE).exclude(
-        relation__in=projects
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_COMPONENT).exclude(
-        relation__in=Component.objects.values_list("pk", flat=True)
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_TRANSLATION).exclude(
-        relation__in=Translation.objects.values_list("pk", flat=True)
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_USER).exclude(
-        relation__in=User.objects.values_list("pk", flat=True)
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_COMPONENT_LIST).exclude(
-        relation__in=ComponentList.objects.values_list("pk", flat=True)
-    ).delete()
-    Metric.objects.filter(scope=Metric.SCOPE_LANGUAGE).exclude(
-        relation__in=Language.objects.values_list("pk", flat=True)
-    ).delete()
+    for scope, queryset in (
+        (Metric.SCOPE_PROJECT, Project.objects.all()),
+        (Metric.SCOPE_PROJECT_LANGUAGE, Project.objects.all()),
+        (Metric.SCOPE_COMPONENT, Component.objects.all()),
+        (Metric.SCOPE_TRANSLATION, Translation.objects.all()),
+        (Metric.SCOPE_USER, User.objects.all()),
+        (Metric.SCOPE_COMPONENT_LIST, ComponentList.objects.all()),
+        (Metric.SCOPE_LANGUAGE, Language.objects.all()),
+    ):
+        stale = sorted(
+            set(
+                Metric.objects.filter(scope=scope)
+                .values_list("relation", flat=True)
+                .distinct()
+            )
+            - set(queryset.values_list("pk", flat=True))
+        )
+        for offset in range(0, len(stale), METRICS_CHUNK):
+            Metric.objects.filter(
+                scope=scope, relation__in=stale[offset : offset + METRICS_CHUNK]
+            ).delete()
 
     # Remove past metrics, but we need data for last 24 months
     cutoff = timezone.now() - timedelta(days=800)
     Metric.objects.filter(date__lte=cutoff).delete()
 
+    # Remove zero activity metrics calculated before the collection, these
+    # are implied on collected dates
+    today = timezone.now().date()
+    for collected in Metric.objects.get_collected_dates(
+        [today - timedelta(days=1), today]
+    ):
+        Metric.objects.filter(date=collected, kind__in=ACTIVITY_KINDS, value=0).delete()
+
 
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
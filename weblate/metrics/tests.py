@@ -17,9 +17,12 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from weblate.metrics.models import Metric
+from datetime import date
+
+from weblate.metrics.models import METRIC_CHANGES, Metric, get_metric_names
 from weblate.metrics.tasks import cleanup_metrics, collect_metrics
-from weblate.trans.models import Project
+from weblate.metrics.wrapper import MetricsWrapper
+from weblate.trans.models import Change, Project
 from weblate.trans.tests.test_views import FixtureTestCase
 
 
@@ -32,6 +35,69 @@ class MetricTestCase(FixtureTestCase):
         Metric.objects.collect_global()
         self.assertNotEqual(Metric.objects.count(), 0)
 
+    def get_metrics(self, scope, relation):
+        return dict(
+            get_metric_names(
+                Metric.objects.filter(
+                    scope=scope, relation=relation, date=date.today()
+                ).values_list("kind", "value")
+            )
+        )
+
+    def test_collect_grouped(self):
+        translation = self.get_translation()
+        Change.objects.create(
+            translation=translation, user=self.user, action=Change.ACTION_CHANGE
+        )
+        Metric.objects.collect_translation(translation)
+        Metric.objects.collect_project(self.project)
+        expected_translation = self.get_metrics(
+            Metric.SCOPE_TRANSLATION, translation.pk
+        )
+        expected_project = self.get_metrics(Metric.SCOPE_PROJECT, self.project.pk)
+        self.assertEqual(expected_translation["contributors"], 1)
+        Metric.objects.filter(date=date.today()).delete()
+
+        # Grouped collection should produce same values
+        Metric.objects.collect_translations([translation.pk])
+        Metric.objects.collect_projects([self.project.pk])
+        self.assertEqual(
+            self.get_metrics(Metric.SCOPE_TRANSLATION, translation.pk),
+            expected_translation,
+        )
+        self.assertEqual(
+            self.get_metrics(Metric.SCOPE_PROJECT, self.project.pk), expected_project
+        )
+
+    def test_sparse_activity(self):
+        collect_metrics()
+        self.assertFalse(
+            Metric.objects.filter(
+                kind=METRIC_CHANGES, scope=Metric.SCOPE_PROJECT, date=date.today()
+            ).exists()
+        )
+        wrapper = MetricsWrapper(self.project, Metric.SCOPE_PROJECT, self.project.pk)
+        self.assertEqual(wrapper.daily_activity, [0] * 52)
+        # Missing value on collected date is not calculated
+        self.assertFalse(
+            Metric.objects.filter(
+                kind=METRIC_CHANGES, scope=Metric.SCOPE_PROJECT, date=date.today()
+            ).exists()
+        )
+
+    def test_incomplete_collection(self):
+        Metric.objects.collect_global()
+        Metric.objects.collect_projects([self.project.pk])
+        # Without completed collection the activity is calculated
+        wrapper = MetricsWrapper(self.project, Metric.SCOPE_PROJECT, self.project.pk)
+        self.assertEqual(wrapper.daily_activity, [0] * 52)
+        self.assertTrue(
+            Metric.objects.filter(
+                kind=METRIC_CHANGES, scope=Metric.SCOPE_PROJECT, date=date.today()
+            ).exists()
+        )
+        self.assertEqual(Metric.objects.get_collected_dates([date.today()]), set())
+
     def test_cleanup(self):
         collect_metrics()
         count = Metric.objects.count()
@@ -206,9 +206,17 @@ class MetricsWrapper:
                 **kwargs,
             ).values_list("date", "value")
         )
-        for offset in range(days):
-            current = start - timedelta(days=offset)
-            if current not in result:
+        missing = [
+            start - timedelta(days=offset)
+            for offset in range(days)
+            if start - timedelta(days=offset) not in result
+        ]
+        # Zero values are not stored for dates with collected metrics
+        collected = Metric.objects.get_collected_dates(missing) if missing else set()
+        for current in missing:
+            if current in collected:
+                result[current] = 0
+            else:
                 result[current] = Metric.objects.calculate_changes(
                     date=current,
                     obj=self.obj,
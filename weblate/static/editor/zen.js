@@ -7,9 +7,12 @@
   function ZenEditor() {
     EditorBase.call(this);
 
+    /* Next page of units is fetched in the background */
+    this.prefetched = null;
+    this.prefetchNext();
+
     $window.scroll(() => {
       var $loadingNext = $("#loading-next");
-      var loader = $("#zen-load");
 
       if ($window.scrollTop() >= $document.height() - 2 * $window.height()) {
         if (
@@ -20,19 +23,28 @@
         }
         $loadingNext.show();
 
-        loader.data("offset", 20 + parseInt(loader.data("offset"), 10));
+        if (this.prefetched === null) {
+          this.prefetchNext();
+        }
 
-        $.get(
-          loader.attr("href") + "&offset=" + loader.data("offset"),
-          (data) => {
+        this.prefetched
+          .done((data) => {
             $loadingNext.hide();
+            this.prefetched = null;
 
             $(".zen tfoot").before(data);
 
             this.init();
             initHighlight(document);
-          },
-        );
+
+            this.prefetchNext();
+          })
+          .fail(() => {
+            var loader = $("#zen-load");
+            $loadingNext.hide();
+            this.prefetched = null;
+            loader.data("offset", parseInt(loader.data("offset"), 10) - 20);
+          });
       }
     });
 
@@ -106,6 +118,20 @@
   ZenEditor.prototype = Object.create(EditorBase.prototype);
   ZenEditor.prototype.constructor = ZenEditor;
 
+  ZenEditor.prototype.prefetchNext = function () {
+    var loader = $("#zen-load");
+
+    if ($("#last-section").length > 0 || loader.length === 0) {
+      return;
+    }
+
+    loader.data("offset", 20 + parseInt(loader.data("offset"), 10));
+
+    this.prefetched = $.get(
+      loader.attr("href") + "&offset=" + loader.data("offset"),
+    );
+  };
+
   ZenEditor.prototype.init = function () {
     EditorBase.prototype.init.call(this);
 
@@ -21,7 +21,6 @@
 import json
 import os
 from datetime import datetime
-from itertools import chain
 from shutil import copyfileobj
 from typing import Callable, Dict, List, Optional
 from zipfile import ZipFile
@@ -36,6 +35,7 @@ from weblate_schemas import load_schema, validate_schema
 from weblate.auth.models import User, get_anonymous
 from weblate.checks.models import Check
 from weblate.lang.models import Language, Plural
+from weblate.logger import LOGGER
 from weblate.memory.models import Memory
 from weblate.screenshots.models import Screenshot
 from weblate.trans.models import (
@@ -50,10 +50,16 @@ from weblate.trans.models import (
 )
 from weblate.trans.tasks import update_checks
 from weblate.utils.data import data_dir
+from weblate.utils.errors import report_error
+from weblate.utils.files import remove_tree
 from weblate.utils.hash import checksum_to_hash, hash_to_checksum
+from weblate.utils.jsonstream import JSONStreamParser
 from weblate.utils.validators import validate_filename
 from weblate.utils.version import VERSION
 
+# Number of units processed at once
+BACKUP_CHUNK = 1000
+
 
 class ProjectBackup:
     COMPONENTS_PREFIX = "components/"
@@ -138,22 +144,106 @@ class ProjectBackup:
                     path, os.path.join(target, os.path.relpath(path, directory))
                 )
 
+    @staticmethod
+    def dump_json(handle, data):
+        handle.write(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
     def backup_json(self, backupzip, data, target: str):
         with backupzip.open(target, "w") as handle:
-            handle.write(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+            self.dump_json(handle, data)
+
+    def backup_memory(self, handle, project):
+        # Translation memory, avoid using memory_db
+        self.dump_json(
+            handle,
+            [item.as_dict() for item in project.memory_set.using("default").iterator()],
+        )
 
     def generate_filename(self, project):
         backup_dir = data_dir("projectbackups", f"{project.pk}")
         timestamp = int(self.timestamp.timestamp())
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
-        while os.path.exists(
-            os.path.join(backup_dir, f"{timestamp}.zip")
-        ) or os.path.exists(os.path.join(backup_dir, f"{timestamp}.zip.part")):
+        while any(
+            os.path.exists(os.path.join(backup_dir, f"{timestamp}{suffix}"))
+            for suffix in (".zip", ".zip.part", ".zip.parts")
+        ):
             timestamp += 1
         self.filename = os.path.join(backup_dir, f"{timestamp}.zip")
 
-    def backup_component(self, backupzip, component):
+    @property
+    def parts_dir(self):
+        return f"{self.filename}.parts"
+
+    @property
+    def failed_dir(self):
+        return os.path.join(self.parts_dir, "failed")
+
+    def iterate_units(self, component):
+        """Iterate over component units in chunks with related objects."""
+        units = (
+            Unit.objects.filter(translation__component=component)
+            .prefetch_related(
+                "comment_set__user",
+                "suggestion_set__user",
+                "suggestion_set__vote_set__user",
+                "check_set",
+                "labels",
+            )
+            .order_by("pk")
+        )
+        last = 0
+        while True:
+            chunk = list(units.filter(pk__gt=last)[:BACKUP_CHUNK])
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1].pk
+
+    def backup_unit(self, unit):
+        schema = self.component_schema["properties"]["units"]["items"]
+        properties = schema["properties"]
+        vote_schema = properties["suggestions"]["items"]["properties"]["votes"]
+        return self.backup_object(
+            unit,
+            schema["required"],
+            extras={
+                "id_hash": lambda obj: obj.checksum,
+                "comments": lambda obj: [
+                    self.backup_object(
+                        comment, properties["comments"]["items"]["required"]
+                    )
+                    for comment in obj.comment_set.all()
+                ],
+                "suggestions": lambda obj: [
+                    self.backup_object(
+                        suggestion,
+                        properties["suggestions"]["items"]["required"],
+                        extras={
+                            "votes": lambda obj: [
+                                self.backup_object(
+                                    vote, vote_schema["items"]["required"]
+                                )
+                                for vote in obj.vote_set.all()
+                            ],
+                        },
+                    )
+                    for suggestion in obj.suggestion_set.all()
+                ],
+                "checks": lambda obj: [
+                    self.backup_object(check, properties["checks"]["items"]["required"])
+                    for check in obj.check_set.all()
+                ],
+                "labels": lambda obj: [label.name for label in obj.labels.all()],
+            },
+        )
+
+    def backup_component_data(self, handle, component):
+        """Write component JSON to the handle.
+
+        The units are processed in chunks, each of them is validated and
+        written before loading the next one.
+        """
         data = {
             "component": self.backup_object(
                 component, self.component_schema["properties"]["component"]["required"]
@@ -167,80 +257,7 @@ class ProjectBackup:
                 )
                 for translation in component.translation_set.iterator()
             ],
-            "units": [
-                self.backup_object(
-                    unit,
-                    self.component_schema["properties"]["units"]["items"]["required"],
-                    extras={
-                        "id_hash": lambda obj: obj.checksum,
-                        "comments": lambda obj: [
-                            self.backup_object(
-                                comment,
-                                self.component_schema["properties"]["units"]["items"][
-                                    "properties"
-                                ]["comments"]["items"]["required"],
-                            )
-                            for comment in obj.comment_set.prefetch_related("user")
-                        ],
-                        "suggestions": lambda obj: [
-                            self.backup_object(
-                                suggestion,
-                                self.component_schema["properties"]["units"]["items"][
-                                    "properties"
-                                ]["suggestions"]["items"]["required"],
-                                extras={
-                                    "votes": lambda obj: [
-                                        self.backup_object(
-                                            vote,
-                                            self.component_schema["properties"][
-                                                "units"
-                                            ]["items"]["properties"]["suggestions"][
-                                                "items"
-                                            ][
-                                                "properties"
-                                            ][
-                                                "votes"
-                                            ][
-                                                "items"
-                                            ][
-                                                "required"
-                                            ],
-                                        )
-                                        for vote in obj.votes.through.objects.filter(
-                                            suggestion=obj
-                                        ).select_related("user")
-                                    ],
-                                },
-                            )
-                            for suggestion in obj.suggestion_set.prefetch_related(
-                                "user"
-                            )
-                        ],
-                        "checks": lambda obj: [
-                            self.backup_object(
-                                check,
-                                self.component_schema["properties"]["units"]["items"][
-                                    "properties"
-                                ]["checks"]["items"]["required"],
-                            )
-                            for check in obj.check_set.all()
-                        ],
-                        "labels": lambda obj: list(
-                            obj.labels.values_list("name", flat=True)
-                        ),
-                    },
-                )
-                for unit in Unit.objects.filter(
-                    translation__component=component
-                ).iterator()
-            ],
-        }
-
-        data["screenshots"] = screenshots = []
-        for screenshot in Screenshot.objects.filter(
-            translation__component=component
-        ).prefetch_related("units"):
-            screenshots.append(
+            "screenshots": [
                 self.backup_object(
                     screenshot,
                     self.component_schema["properties"]["screenshots"]["items"][
@@ -248,22 +265,40 @@ class ProjectBackup:
                     ],
                     extras={
                         "units": lambda obj: [
-                            hash_to_checksum(id_hash)
-                            for id_hash in obj.units.values_list("id_hash", flat=True)
+                            hash_to_checksum(unit.id_hash) for unit in obj.units.all()
                         ],
                     },
                 )
-            )
+                for screenshot in Screenshot.objects.filter(
+                    translation__component=component
+                ).prefetch_related("units")
+            ],
+            "units": [],
+        }
+        validate_schema(data, "weblate-component.schema.json")
+
+        # Write everything except closing of the units list and the object
+        header = json.dumps(data, ensure_ascii=False, indent=2)
+        handle.write(header[: header.rindex("]")].encode("utf-8"))
+
+        separator = b"\n"
+        for chunk in self.iterate_units(component):
+            data["units"] = [self.backup_unit(unit) for unit in chunk]
+            validate_schema(data, "weblate-component.schema.json")
+            for unit in data["units"]:
+                handle.write(separator)
+                self.dump_json(handle, unit)
+                separator = b",\n"
+        handle.write(b"\n]\n}")
+
+    def backup_component_files(self, backupzip, component):
+        """Backup screenshots and VCS repository of a component."""
+        for screenshot in Screenshot.objects.filter(translation__component=component):
             backupzip.write(
                 os.path.join(settings.MEDIA_ROOT, screenshot.image.path),
                 os.path.join("screenshots", os.path.basename(screenshot.image.name)),
             )
 
-        validate_schema(data, "weblate-component.schema.json")
-        self.backup_json(
-            backupzip, data, f"{self.COMPONENTS_PREFIX}{component.slug}.json"
-        )
-
         # Store VCS repo in case it is present
         if component.is_repo_link:
             return
@@ -273,6 +308,13 @@ class ProjectBackup:
             f"{self.VCS_PREFIX}{component.slug}",
         )
 
+    def backup_component(self, backupzip, component):
+        with backupzip.open(
+            f"{self.COMPONENTS_PREFIX}{component.slug}.json", "w", force_zip64=True
+        ) as handle:
+            self.backup_component_data(handle, component)
+        self.backup_component_files(backupzip, component)
+
     def backup_project(self, project):
         """Backup whole project."""
         # Generate data
@@ -290,22 +332,92 @@ class ProjectBackup:
                 "weblate-backup.json",
             )
 
-            # Translation memory, avoid using memory_db
-            self.backup_json(
-                backupzip,
-                [
-                    item.as_dict()
-                    for item in project.memory_set.using("default").iterator()
-                ],
-                "weblate-memory.json",
-            )
+            with backupzip.open("weblate-memory.json", "w", force_zip64=True) as handle:
+                self.backup_memory(handle, project)
 
             # Components
-            for component in project.component_set.iterator():
+            components = list(project.component_set.order_by("pk"))
+            for done, component in enumerate(components, start=1):
                 self.backup_component(backupzip, component)
+                self.log_progress(component, done, len(components))
 
         os.rename(part_name, self.filename)
 
+    def log_progress(self, component, done: int, total: int):
+        LOGGER.info(
+            "%s: backed up %s (%d/%d components)",
+            self.filename,
+            component,
+            done,
+            total,
+        )
+
+    def prepare_backup(self, project) -> List[int]:
+        """Prepare backup where components are processed in parallel.
+
+        Project data are stored in a directory next to the backup and the
+        components are processed using backup_component_part. Returns list
+        of components to process.
+        """
+        self.backup_data(project)
+        self.generate_filename(project)
+        os.makedirs(os.path.join(self.parts_dir, self.COMPONENTS_PREFIX))
+        with open(os.path.join(self.parts_dir, "weblate-backup.json"), "wb") as handle:
+            self.dump_json(handle, self.data)
+        with open(os.path.join(self.parts_dir, "weblate-memory.json"), "wb") as handle:
+            self.backup_memory(handle, project)
+        return list(project.component_set.order_by("pk").values_list("pk", flat=True))
+
+    def backup_component_part(self, project, pk: int):
+        """Backup single component of a backup started by prepare_backup.
+
+        Failures are reported and recorded, so that finish_backup does not
+        create an incomplete backup.
+        """
+        try:
+            component = project.component_set.get(pk=pk)
+        except Component.DoesNotExist:
+            return
+        components_dir = os.path.join(self.parts_dir, self.COMPONENTS_PREFIX)
+        filename = os.path.join(components_dir, f"{component.slug}.json")
+        try:
+            with open(filename, "wb") as handle:
+                self.backup_component_data(handle, component)
+        except Exception:
+            report_error(cause="Component backup failed")
+            if os.path.exists(filename):
+                os.unlink(filename)
+            os.makedirs(self.failed_dir, exist_ok=True)
+            with open(os.path.join(self.failed_dir, component.slug), "w"):
+                pass
+            return
+        self.log_progress(
+            component, len(os.listdir(components_dir)), project.component_set.count()
+        )
+
+    def finish_backup(self, project):
+        """Create backup from the parts prepared by parallel processing."""
+        if os.path.exists(self.failed_dir):
+            failed = sorted(os.listdir(self.failed_dir))
+            remove_tree(self.parts_dir)
+            raise ValueError(
+                f"{self.filename}: backup of components failed: {', '.join(failed)}"
+            )
+        part_name = f"{self.filename}.part"
+        slugs = [
+            name[:-5]
+            for name in os.listdir(os.path.join(self.parts_dir, self.COMPONENTS_PREFIX))
+        ]
+        with ZipFile(part_name, "x") as backupzip:
+            self.backup_dir(backupzip, self.parts_dir, "")
+            for component in project.component_set.filter(slug__in=slugs).order_by(
+                "pk"
+            ):
+                self.backup_component_files(backupzip, component)
+
+        os.rename(part_name, self.filename)
+        remove_tree(self.parts_dir)
+
     def list_components(self, zipfile):
         return [
             name
@@ -320,25 +432,55 @@ class ProjectBackup:
         self.timestamp = datetime.fromisoformat(self.data["metadata"]["timestamp"])
 
     def load_memory(self, zipfile):
+        """Iterate over validated chunks of translation memory."""
         with zipfile.open("weblate-memory.json") as handle:
-            data = json.load(handle)
-        validate_schema(data, "weblate-memory.schema.json")
-        return data
-
-    def load_components(self, zipfile, callback: Optional[Callable] = None):
-        for component in self.list_components(zipfile):
-            with zipfile.open(component) as handle:
-                data = json.load(handle)
-                validate_schema(data, "weblate-component.schema.json")
-                if callback is not None:
-                    callback(zipfile, data)
+            parser = JSONStreamParser(handle)
+            chunk = []
+            for item in parser.iterate_array():
+                chunk.append(item)
+                if len(chunk) >= BACKUP_CHUNK:
+                    validate_schema(chunk, "weblate-memory.schema.json")
+                    yield chunk
+                    chunk = []
+            validate_schema(chunk, "weblate-memory.schema.json")
+            yield chunk
+
+    def load_component(self, zipfile, name: str):
+        """Iterate over validated chunks of component data.
+
+        Each chunk contains data preceding the units and a chunk of units,
+        the last one contains complete data except units.
+        """
+        with zipfile.open(name) as handle:
+            parser = JSONStreamParser(handle)
+            data = {}
+            units = []
+            for key, value in parser.iterate_object(("units",)):
+                if key != "units":
+                    data[key] = value
+                    continue
+                units.append(value)
+                if len(units) >= BACKUP_CHUNK:
+                    chunk = {"screenshots": [], **data, "units": units}
+                    validate_schema(chunk, "weblate-component.schema.json")
+                    yield chunk
+                    units = []
+            chunk = {**data, "units": units}
+            validate_schema(chunk, "weblate-component.schema.json")
+            yield chunk
+
+    def load_components(self, zipfile):
+        for name in self.list_components(zipfile):
+            for _chunk in self.load_component(zipfile, name):
+                continue
 
     def validate(self):
         if not self.supports_restore:
             raise ValueError("Restore is not supported on this database.")
         with ZipFile(self.filename, "r") as zipfile:
             self.load_data(zipfile)
-            self.load_memory(zipfile)
+            for _chunk in self.load_memory(zipfile):
+                continue
             self.load_components(zipfile)
             for name in zipfile.namelist():
                 validate_filename(name)
@@ -350,9 +492,11 @@ class ProjectBackup:
         kwargs["id_hash"] = checksum_to_hash(kwargs["id_hash"])
         kwargs["translation_id"] = translation_lookup[kwargs["translation_id"]].id
         unit = Unit(**kwargs)
+        # Bulk create skips save()
+        unit.update_lookup_hash()
         unit.import_data = item
         if source_unit_lookup is not None:
-            unit.source_unit = source_unit_lookup[item["id_hash"]]
+            unit.source_unit_id = source_unit_lookup[item["id_hash"]]
         return unit
 
     def restore_user(self, username):
@@ -378,7 +522,7 @@ class ProjectBackup:
         data[field] = self.restore_user(data[field])
         return data
 
-    def restore_component(self, zipfile, data):  # noqa: C901
+    def restore_translations(self, data):
         kwargs = data["component"].copy()
         source_language = kwargs["source_language"] = self.import_language(
             kwargs["source_language"]
@@ -422,64 +566,96 @@ class ProjectBackup:
         translation_lookup = {
             translation.original_id: translation for translation in translations
         }
-
-        # Create source units
-        source_units = [
-            self.restore_unit(item, translation_lookup)
-            for item in data["units"]
-            if item["translation_id"] == source_translation_id
+        return component, translation_lookup, source_translation_id
+
+    def restore_units(self, items, translation_lookup, source_unit_lookup=None):
+        """Create units including related objects in bulk."""
+        units = Unit.objects.bulk_create(
+            [
+                self.restore_unit(item, translation_lookup, source_unit_lookup)
+                for item in items
+            ]
+        )
+        if source_unit_lookup is None:
+            # Fix source unit links
+            for unit in units:
+                unit.source_unit = unit
+            Unit.objects.bulk_update(units, ["source_unit"])
+
+        Unit.labels.through.objects.bulk_create(
+            [
+                Unit.labels.through(unit=unit, label=self.labels_map[label])
+                for unit in units
+                for label in unit.import_data["labels"]
+            ]
+        )
+        Comment.objects.bulk_create(
+            [
+                Comment(unit=unit, **self.restore_with_user(comment))
+                for unit in units
+                for comment in unit.import_data["comments"]
+            ]
+        )
+        Check.objects.bulk_create(
+            [
+                Check(unit=unit, **check)
+                for unit in units
+                for check in unit.import_data["checks"]
+            ]
+        )
+        suggestion_data = [
+            (unit, suggestion)
+            for unit in units
+            for suggestion in unit.import_data["suggestions"]
         ]
-        source_units = Unit.objects.bulk_create(source_units)
-        # Fix source unit links
-        for unit in source_units:
-            unit.source_unit = unit
-        Unit.objects.bulk_update(source_units, ["source_unit"])
-        source_unit_lookup = {unit.checksum: unit for unit in source_units}
+        suggestions = Suggestion.objects.bulk_create(
+            [
+                Suggestion(unit=unit, **self.restore_with_user(item, remove="votes"))
+                for unit, item in suggestion_data
+            ]
+        )
+        Vote.objects.bulk_create(
+            [
+                Vote(suggestion=suggestion, **self.restore_with_user(vote))
+                for suggestion, (_unit, item) in zip(suggestions, suggestion_data)
+                for vote in item["votes"]
+            ]
+        )
+        return units
+
+    def restore_component(self, zipfile, name: str):
+        component = None
+        source_unit_lookup = {}
+
+        # Create source units first, translation units are linked to them
+        for data in self.load_component(zipfile, name):
+            if component is None:
+                (
+                    component,
+                    translation_lookup,
+                    source_translation_id,
+                ) = self.restore_translations(data)
+            units = self.restore_units(
+                [
+                    item
+                    for item in data["units"]
+                    if item["translation_id"] == source_translation_id
+                ],
+                translation_lookup,
+            )
+            source_unit_lookup.update((unit.checksum, unit.pk) for unit in units)
 
         # Create translation units
-        units = [
-            self.restore_unit(item, translation_lookup, source_unit_lookup)
-            for item in data["units"]
-            if item["translation_id"] != source_translation_id
-        ]
-        units = Unit.objects.bulk_create(units)
-
-        # Apply metadata
-        for unit in chain(source_units, units):
-            # Labels
-            for label in unit.import_data["labels"]:
-                unit.labels.add(self.labels_map[label])
-
-            # Comments
-            if unit.import_data["comments"]:
-                Comment.objects.bulk_create(
-                    Comment(unit=unit, **self.restore_with_user(comment))
-                    for comment in unit.import_data["comments"]
-                )
-
-            # Checks
-            if unit.import_data["checks"]:
-                Check.objects.bulk_create(
-                    Check(unit=unit, **check) for check in unit.import_data["checks"]
-                )
-
-            # Suggestions
-            if unit.import_data["suggestions"]:
-                suggestions = Suggestion.objects.bulk_create(
-                    Suggestion(
-                        unit=unit, **self.restore_with_user(suggestion, remove="votes")
-                    )
-                    for suggestion in unit.import_data["suggestions"]
-                )
-                suggestion_data = {
-                    item["target"]: item for item in unit.import_data["suggestions"]
-                }
-                for suggestion in suggestions:
-                    if suggestion_data[suggestion.target]["votes"]:
-                        Vote.objects.bulk_create(
-                            Vote(suggestion=suggestion, **self.restore_with_user(vote))
-                            for vote in suggestion_data[suggestion.target]["votes"]
-                        )
+        for data in self.load_component(zipfile, name):
+            self.restore_units(
+                [
+                    item
+                    for item in data["units"]
+                    if item["translation_id"] != source_translation_id
+                ],
+                translation_lookup,
+                source_unit_lookup,
+            )
 
         # Create screenshots
         screenshots = []
@@ -511,6 +687,7 @@ class ProjectBackup:
 
         # Trigger checks update, the implementation might have changed
         transaction.on_commit(lambda: update_checks.delay(component.id))
+        return component
 
     def import_language(self, code: str):
         if self.languages_cache is None:
@@ -543,20 +720,24 @@ class ProjectBackup:
             self.labels_map = {label.name: label for label in labels}
 
             # Import translation memory
-            memory = self.load_memory(zipfile)
-            Memory.objects.bulk_create(
-                [
-                    Memory(
-                        project=project,
-                        origin=entry["origin"],
-                        source=entry["source"],
-                        target=entry["target"],
-                        source_language=self.import_language(entry["source_language"]),
-                        target_language=self.import_language(entry["target_language"]),
-                    )
-                    for entry in memory
-                ]
-            )
+            for memory in self.load_memory(zipfile):
+                Memory.objects.bulk_create(
+                    [
+                        Memory(
+                            project=project,
+                            origin=entry["origin"],
+                            source=entry["source"],
+                            target=entry["target"],
+                            source_language=self.import_language(
+                                entry["source_language"]
+                            ),
+                            target_language=self.import_language(
+                                entry["target_language"]
+                            ),
+                        )
+                        for entry in memory
+                    ]
+                )
 
             # Extract VCS
             for name in zipfile.namelist():
@@ -571,7 +752,16 @@ class ProjectBackup:
                         copyfileobj(source, target)
 
             # Create components
-            self.load_components(zipfile, self.restore_component)
+            names = self.list_components(zipfile)
+            for done, name in enumerate(names, start=1):
+                component = self.restore_component(zipfile, name)
+                LOGGER.info(
+                    "%s: restored %s (%d/%d components)",
+                    self.filename,
+                    component,
+                    done,
+                    len(names),
+                )
 
         # Fixup linked components
         old_slug = f"/{self.data['project']['slug']}/"
@@ -0,0 +1,45 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from weblate.utils.db import PG_TSVECTOR, PG_TSVECTOR_DROP, using_postgresql
+from weblate.utils.management.base import BaseCommand
+from weblate.utils.search import FulltextBackend
+
+
+class Command(BaseCommand):
+    help = "creates or removes full-text search index"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Remove the index instead of creating it",
+        )
+
+    def handle(self, *args, **options):
+        if not using_postgresql():
+            raise CommandError("The full-text index is supported only on PostgreSQL.")
+        template = PG_TSVECTOR_DROP if options["drop"] else PG_TSVECTOR
+        with connection.cursor() as cursor:
+            for field in sorted(FulltextBackend.indexed_fields):
+                cursor.execute(template.format("unit", field))
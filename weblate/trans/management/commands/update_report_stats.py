@@ -0,0 +1,40 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from weblate.trans.models import Change
+from weblate.utils.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "calculates report values for older changes"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=1000,
+            help="Number of changes processed in single transaction",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for count in Change.objects.update_report_stats(options["batch"]):
+            total += count
+            self.stdout.write(f"Updated {total} changes")
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.5 on 2023-01-16 09:12
+
+from django.db import migrations
+
+from weblate.utils.db import PG_TSVECTOR, PG_TSVECTOR_DROP
+from weblate.utils.search import FulltextBackend, get_search_backend
+
+FIELDS = ("source", "target", "context")
+
+
+def create_index(apps, schema_editor):
+    # The index is needed only by the full-text backend, it can be created
+    # later using the fulltext_index management command
+    if schema_editor.connection.vendor != "postgresql" or not isinstance(
+        get_search_backend(), FulltextBackend
+    ):
+        return
+    for field in FIELDS:
+        schema_editor.execute(PG_TSVECTOR.format("unit", field))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in FIELDS:
+        schema_editor.execute(PG_TSVECTOR_DROP.format("unit", field))
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are created concurrently, what can not be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ("trans", "0163_update_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index, elidable=False, atomic=False)
+    ]
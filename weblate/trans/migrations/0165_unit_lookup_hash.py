@@ -0,0 +1,51 @@
+# Generated by Django 4.1.5 on 2023-01-18 14:03
+
+from django.db import migrations, models, transaction
+
+from weblate.utils.hash import calculate_hash
+
+
+def update_lookup_hash(apps, schema_editor):
+    Unit = apps.get_model("trans", "Unit")
+    db_alias = schema_editor.connection.alias
+    units = Unit.objects.using(db_alias).order_by("pk")
+
+    # Process in batches with separate transactions to avoid locking whole table
+    last_pk = 0
+    while True:
+        with transaction.atomic(using=db_alias):
+            batch = list(units.filter(pk__gt=last_pk).only("source", "context")[:1000])
+            if not batch:
+                break
+            for unit in batch:
+                unit.source_hash = calculate_hash(unit.source.lower())
+                unit.context_hash = calculate_hash(unit.context.lower())
+            Unit.objects.using(db_alias).bulk_update(
+                batch, ["source_hash", "context_hash"]
+            )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("trans", "0164_tsvector_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="unit",
+            name="context_hash",
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name="unit",
+            name="source_hash",
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(
+            update_lookup_hash, migrations.RunPython.noop, elidable=True
+        ),
+    ]
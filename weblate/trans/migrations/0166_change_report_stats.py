@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2023-01-20 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trans", "0165_unit_lookup_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="change",
+            name="edit_distance",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="change",
+            name="target_words",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
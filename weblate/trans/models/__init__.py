@@ -90,14 +90,18 @@ def component_post_delete(sender, instance, **kwargs):
 @disable_for_loaddata
 def change_labels(sender, instance, action, pk_set, **kwargs):
     """Update unit labels."""
-    if (
-        action not in ("post_add", "post_remove", "post_clear")
-        or (action != "post_clear" and not pk_set)
-        or not instance.is_source
+    if action not in ("post_add", "post_remove", "post_clear") or (
+        action != "post_clear" and not pk_set
     ):
         return
-    if not instance.is_batch_update:
+    if instance.is_batch_update:
+        # Caches are invalidated once the batch is completed
+        return
+    if instance.is_source:
         instance.translation.component.invalidate_cache()
+    else:
+        # Labels are searchable on translation units as well
+        instance.translation.invalidate_cache()
 
 
 @receiver(user_pre_delete)
@@ -39,6 +39,9 @@ class WeblateConf(AppConf):
     # Enable remote hooks
     ENABLE_HOOKS = True
 
+    # Delay in seconds for merging updates triggered by hooks
+    HOOK_UPDATE_DELAY = 30
+
     # Enable sharing
     ENABLE_SHARING = True
 
@@ -51,9 +54,18 @@ class WeblateConf(AppConf):
     # Minimal number of similar messages to show
     SIMILAR_MESSAGES = 5
 
+    # Backend used for searching strings
+    SEARCH_BACKEND = "weblate.utils.search.DatabaseBackend"
+
     # Enable lazy commits
     COMMIT_PENDING_HOURS = 24
 
+    # Number of parallel batches when committing pending changes
+    COMMIT_PENDING_PARALLEL = 4
+
+    # Number of parallel repository updates per host
+    UPDATE_REMOTES_HOST_PARALLEL = 2
+
     # Automatically update vcs repositories daily
     AUTO_UPDATE = False
 
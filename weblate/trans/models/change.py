@@ -17,11 +17,14 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import threading
 from datetime import datetime
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
 from django.db import models, transaction
-from django.db.models import Count, Q
+from django.db.models import Case, Count, IntegerField, Q, Value, When
 from django.db.models.base import post_save
 from django.utils import timezone
 from django.utils.html import escape, format_html
@@ -40,8 +43,12 @@ from weblate.trans.mixins import UserDisplayMixin
 from weblate.trans.models.alert import ALERTS
 from weblate.trans.models.project import Project
 from weblate.utils.fields import JSONField
+from weblate.utils.hash import calculate_checksum
 from weblate.utils.state import STATE_LOOKUP
 
+# Changes waiting for the transaction commit in the current thread
+PENDING_NOTIFICATIONS = threading.local()
+
 
 class ChangeQuerySet(models.QuerySet):
     # pylint: disable=no-init
@@ -55,24 +62,32 @@ class ChangeQuerySet(models.QuerySet):
 
     def count_stats(self, days: int, step: int, dtstart: datetime):
         """Count the number of changes in a given period grouped by step days."""
-        # Count number of changes
-        result = []
-        for _unused in range(0, days, step):
-            # Calculate interval
-            int_start = dtstart
-            int_end = int_start + timezone.timedelta(days=step)
-
-            # Count changes
-            int_base = self.filter(timestamp__range=(int_start, int_end))
-            count = int_base.aggregate(Count("id"))
-
-            # Append to result
-            result.append((int_start, count["id__count"]))
-
-            # Advance to next interval
-            dtstart = int_end
+        intervals = [
+            dtstart + timezone.timedelta(days=offset) for offset in range(0, days, step)
+        ]
+        dtend = dtstart + timezone.timedelta(days=step * len(intervals))
+        # Count changes in all intervals in a single query
+        counts = dict(
+            self.filter(timestamp__gte=dtstart, timestamp__lt=dtend)
+            .annotate(
+                interval=Case(
+                    *(
+                        When(
+                            timestamp__gte=start,
+                            timestamp__lt=start + timezone.timedelta(days=step),
+                            then=Value(pos),
+                        )
+                        for pos, start in enumerate(intervals)
+                    ),
+                    output_field=IntegerField(),
+                )
+            )
+            .values_list("interval")
+            .annotate(Count("id"))
+            .order_by()
+        )
 
-        return result
+        return [(start, counts.get(pos, 0)) for pos, start in enumerate(intervals)]
 
     def base_stats(
         self,
@@ -107,7 +122,19 @@ class ChangeQuerySet(models.QuerySet):
         if user is not None:
             base = base.filter(user=user)
 
-        return base.count_stats(days, step, dtstart)
+        # The query includes all filters, including those applied on the
+        # queryset before calling this
+        try:
+            cache_key = "change-stats-{}".format(
+                calculate_checksum(f"{days}-{step}-", str(base.query))
+            )
+        except EmptyResultSet:
+            return base.count_stats(days, step, dtstart)
+        result = cache.get(cache_key)
+        if result is None:
+            result = base.count_stats(days, step, dtstart)
+            cache.set(cache_key, result, 3600)
+        return result
 
     def prefetch(self):
         """
@@ -193,14 +220,70 @@ class ChangeQuerySet(models.QuerySet):
     def order(self):
         return self.order_by("-timestamp")
 
-    def bulk_create(self, *args, **kwargs):
+    def update_report_stats(self, batch: int = 1000):
+        """Calculate missing report values in batches.
+
+        The newest changes are processed first as those are most likely to be
+        included in reports. Yields number of updated changes per batch.
+        """
+        changes = (
+            self.filter(action__in=Change.ACTIONS_CONTENT, edit_distance__isnull=True)
+            .only("action", "old", "target", "target_words", "edit_distance")
+            .order_by("-pk")
+        )
+        last = None
+        while True:
+            current = changes if last is None else changes.filter(pk__lt=last)
+            with transaction.atomic():
+                chunk = list(current[:batch])
+                if not chunk:
+                    return
+                for change in chunk:
+                    change.update_report_stats()
+                self.model.objects.bulk_update(chunk, ["target_words", "edit_distance"])
+            last = chunk[-1].pk
+            yield len(chunk)
+
+    def bulk_create(self, objs, *args, **kwargs):
         """Executes post save to ensure messages are sent to fedora messaging."""
-        changes = super().bulk_create(*args, **kwargs)
+        objs = list(objs)
+        for change in objs:
+            change.update_report_stats()
+        changes = super().bulk_create(objs, *args, **kwargs)
         for change in changes:
             post_save.send(change.__class__, instance=change, created=True)
         return changes
 
 
+class ChangeNotifications(list):
+    """Changes to notify about once the transaction is committed.
+
+    Changes saved in the same thread are collected in a batch which is
+    processed by a single task. The batch is registered as a commit callback
+    with each change because callbacks of rolled back savepoints are
+    discarded. The first executed callback processes the whole batch.
+    """
+
+    @classmethod
+    def schedule(cls, change_id: int):
+        batch = getattr(PENDING_NOTIFICATIONS, "batch", None)
+        if batch is None:
+            batch = PENDING_NOTIFICATIONS.batch = cls()
+        batch.append(change_id)
+        transaction.on_commit(batch)
+
+    def __call__(self):
+        from weblate.accounts.tasks import notify_changes
+
+        if getattr(PENDING_NOTIFICATIONS, "batch", None) is self:
+            PENDING_NOTIFICATIONS.batch = None
+        # Changes from rolled back transactions are skipped by the task
+        change_ids = self[:]
+        self.clear()
+        for offset in range(0, len(change_ids), 1000):
+            notify_changes.delay(change_ids[offset : offset + 1000])
+
+
 class ChangeManager(models.Manager):
     def create(self, *, user=None, **kwargs):
         """Wrapper to avoid using anonymous user as change owner."""
@@ -529,6 +612,9 @@ class Change(models.Model, UserDisplayMixin):
     target = models.TextField(default="", blank=True)
     old = models.TextField(default="", blank=True)
     details = JSONField()
+    # Precalculated values for reports, these are not set for older changes
+    target_words = models.IntegerField(null=True, blank=True)
+    edit_distance = models.IntegerField(null=True, blank=True)
 
     objects = ChangeManager.from_queryset(ChangeQuerySet)()
 
@@ -550,12 +636,11 @@ class Change(models.Model, UserDisplayMixin):
         }
 
     def save(self, *args, **kwargs):
-        from weblate.accounts.tasks import notify_change
-
         self.fixup_refereces()
+        self.update_report_stats()
 
         super().save(*args, **kwargs)
-        transaction.on_commit(lambda: notify_change.delay(self.pk))
+        ChangeNotifications.schedule(self.pk)
 
     def get_absolute_url(self):
         """Return link either to unit or translation."""
@@ -742,6 +827,12 @@ class Change(models.Model, UserDisplayMixin):
     def get_distance(self):
         return DamerauLevenshtein.distance(self.old, self.target)
 
+    def update_report_stats(self):
+        """Calculate values used in reports once the change is stored."""
+        if self.action in self.ACTIONS_CONTENT and self.edit_distance is None:
+            self.target_words = len(self.target.split())
+            self.edit_distance = self.get_distance()
+
     def get_source(self):
         return self.details.get("source", self.unit.source)
 
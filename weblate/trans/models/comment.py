@@ -109,4 +109,5 @@ class Comment(models.Model, UserDisplayMixin):
             author=self.user,
             details={"comment": self.comment},
         )
+        self.unit.invalidate_related_cache()
         super().delete(using=using, keep_parents=keep_parents)
@@ -61,6 +61,7 @@ from weblate.trans.models.alert import ALERTS, ALERTS_IMPORT
 from weblate.trans.models.change import Change
 from weblate.trans.models.translation import Translation
 from weblate.trans.models.variant import Variant
+from weblate.trans.searchcache import invalidate_search_cache
 from weblate.trans.signals import (
     component_post_update,
     store_post_load,
@@ -205,6 +206,19 @@ def prefetch_tasks(components):
     return components
 
 
+def prefetch_repo_status(components):
+    """Prefetch cached repository status."""
+    lookup = {}
+    for component in components:
+        cache_key = component.get_repo_status_key()
+        if cache_key is not None:
+            lookup[cache_key] = component
+    if lookup:
+        for item, value in cache.get_many(lookup.keys()).items():
+            lookup[item].repo_status[item] = value
+    return components
+
+
 class ComponentQuerySet(models.QuerySet):
     # pylint: disable=no-init
 
@@ -805,6 +819,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
         self._sources_prefetched = False
         self.logs = []
         self.translations_count = None
+        self.repo_status = {}
         self.translations_progress = 0
         self.acting_user = None
         self.batch_checks = False
@@ -1412,6 +1427,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
                         )
                     except RepositoryException:
                         pass
+                    self.update_repo_status()
             return True
         except RepositoryException as error:
             report_error(cause="Could not update the repository")
@@ -1582,6 +1598,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
                 self.repository.push(self.push_branch)
                 self.delete_alert("RepositoryChanges")
                 self.delete_alert("PushFailure")
+                self.update_repo_status()
                 return True
             except RepositoryException as error:
                 error_text = self.error_text(error)
@@ -1765,6 +1782,9 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
             component.store_local_revision()
             component.update_import_alerts(delete=False)
 
+        if components:
+            self.update_repo_status()
+
         # Push if enabled
         if not skip_push:
             self.push_if_needed()
@@ -1928,6 +1948,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
 
             if self.id:
                 self.store_local_revision()
+                self.update_repo_status()
 
                 # Record change
                 Change.objects.create(
@@ -2319,6 +2340,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
         self.stats.invalidate(childs=True)
         update_component_stats.delay(self.pk)
         self.invalidate_glossary_cache()
+        invalidate_search_cache(self.project)
 
     def invalidate_cache(self):
         if self._invalidate_scheduled:
@@ -3050,14 +3072,13 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
 
         return Unit.objects.filter(translation__component=self, pending=True).count()
 
-    @property
-    def count_repo_missing(self):
+    def _get_count_repo_missing(self):
         try:
             return self.repository.count_missing()
         except RepositoryException as error:
             report_error(cause="Could check merge needed")
             self.add_alert("MergeFailure", error=self.error_text(error))
-            return 0
+            return None
 
     def _get_count_repo_outgoing(self, retry: bool = True):
         try:
@@ -3069,11 +3090,52 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
                 return self._get_count_repo_outgoing(retry=False)
             report_error(cause="Could check push needed")
             self.add_alert("PushFailure", error=error_text)
-            return 0
+            return None
+
+    def get_repo_status_key(self) -> Optional[str]:
+        revisions = self.repository.get_status_revisions()
+        if revisions is None:
+            return None
+        return "repo-status-{}-{}".format(*revisions)
+
+    def get_repo_status(self) -> Dict[str, int]:
+        """
+        Return count of missing and outgoing commits.
+
+        The result is cached based on local and remote revisions, so it
+        reflects any repository change without invoking VCS.
+        """
+        cache_key = self.get_repo_status_key()
+        if cache_key is not None:
+            if cache_key in self.repo_status:
+                return self.repo_status[cache_key]
+            result = cache.get(cache_key)
+            if result is not None:
+                self.repo_status[cache_key] = result
+                return result
+
+        missing = self._get_count_repo_missing()
+        outgoing = self._get_count_repo_outgoing()
+        result = {"missing": missing or 0, "outgoing": outgoing or 0}
+
+        # Do not cache failures
+        if cache_key is not None and missing is not None and outgoing is not None:
+            cache.set(cache_key, result, 7 * 86400)
+            self.repo_status[cache_key] = result
+        return result
+
+    def update_repo_status(self):
+        """Refresh cached repository status after a repository change."""
+        self.repo_status = {}
+        self.get_repo_status()
+
+    @property
+    def count_repo_missing(self):
+        return self.get_repo_status()["missing"]
 
     @property
     def count_repo_outgoing(self):
-        return self._get_count_repo_outgoing()
+        return self.get_repo_status()["outgoing"]
 
     def needs_commit(self):
         """Check whether there are some not committed changes."""
@@ -516,19 +516,23 @@ class Project(models.Model, URLMixin, PathMixin, CacheKeyMixin):
         return f"project-glossary-{self.pk}"
 
     def invalidate_glossary_cache(self):
-        cache.delete(self.glossary_automaton_key)
+        from weblate.glossary.tasks import schedule_glossary_automaton
+
         if "glossary_automaton" in self.__dict__:
             del self.__dict__["glossary_automaton"]
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            # Rebuild on next use
+            cache.delete(self.glossary_automaton_key)
+        else:
+            # Rebuild in the background, outdated automaton is used meanwhile
+            pk = self.pk
+            transaction.on_commit(lambda: schedule_glossary_automaton(pk))
 
     @cached_property
     def glossary_automaton(self):
-        from weblate.glossary.models import get_glossary_automaton
+        from weblate.glossary.models import load_glossary_automaton
 
-        result = cache.get(self.glossary_automaton_key)
-        if result is None:
-            result = get_glossary_automaton(self)
-            cache.set(self.glossary_automaton_key, result, 24 * 3600)
-        return result
+        return load_glossary_automaton(self)
 
     def get_machinery_settings(self):
         settings = Setting.objects.get_settings_dict(Setting.CATEGORY_MT)
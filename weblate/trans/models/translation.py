@@ -57,6 +57,7 @@ from weblate.trans.models.unit import (
     Unit,
 )
 from weblate.trans.models.variant import Variant
+from weblate.trans.searchcache import invalidate_search_cache
 from weblate.trans.signals import component_post_update, store_post_load, vcs_pre_commit
 from weblate.trans.util import join_plural, split_plural
 from weblate.trans.validators import validate_check_flags
@@ -620,21 +621,28 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
             .select_for_update()
         )
 
+        # Group pending units by author in a single pass
+        groups = {}
         for unit in units:
-            # We reuse the queryset, so pending units might reappear here
-            if not unit.pending:
-                continue
-
-            # Get last change metadata
             author, timestamp = unit.get_last_content_change()
-
+            if author.id not in groups:
+                groups[author.id] = (author, [], [])
+            groups[author.id][1].append(unit)
+            groups[author.id][2].append(timestamp)
+
+        # Commit changes per author in order of their first change
+        for author, author_units, timestamps in sorted(
+            groups.values(), key=lambda group: min(group[2])
+        ):
             author_name = author.get_author_name()
 
             # Flush pending units for this author
-            self.update_units(units, store, author_name, author.id)
+            self.update_units(author_units, store, author_name)
 
             # Commit changes
-            self.git_commit(user, author_name, timestamp, skip_push=True, signals=False)
+            self.git_commit(
+                user, author_name, max(timestamps), skip_push=True, signals=False
+            )
 
         # Update stats (the translated flag might have changed)
         self.invalidate_cache()
@@ -710,18 +718,10 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
 
         return True
 
-    def update_units(self, units, store, author_name, author_id):
-        """Update backend file and unit."""
+    def update_units(self, units, store, author_name):
+        """Update backend file and units of a single author."""
         updated = False
         for unit in units:
-            # We reuse the queryset, so pending units might reappear here
-            if not unit.pending:
-                continue
-            # Skip changes by other authors
-            change_author = unit.get_last_content_change()[0]
-            if change_author.id != author_id:
-                continue
-
             details = unit.details
 
             # Remove pending flag
@@ -1258,6 +1258,7 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         self._invalidate_scheduled = False
         self.stats.invalidate()
         self.component.invalidate_glossary_cache()
+        invalidate_search_cache(self.component.project)
 
     def invalidate_cache(self):
         """Invalidate any cached stats."""
@@ -18,6 +18,7 @@
 #
 
 import re
+from collections import defaultdict
 from typing import Generator, List, Optional, Tuple
 
 from django.conf import settings
@@ -52,7 +53,7 @@ from weblate.utils import messages
 from weblate.utils.db import using_postgresql
 from weblate.utils.errors import report_error
 from weblate.utils.hash import calculate_hash, hash_to_checksum
-from weblate.utils.search import parse_query
+from weblate.utils.search import plan_query
 from weblate.utils.state import (
     STATE_APPROVED,
     STATE_CHOICES,
@@ -145,8 +146,9 @@ class UnitQuerySet(models.QuerySet):
 
     def search(self, query, distinct: bool = True, **context):
         """High level wrapper for searching."""
-        result = self.filter(parse_query(query, **context))
-        if distinct:
+        query, needs_distinct = plan_query(query, self.model, **context)
+        result = self.filter(query)
+        if distinct and needs_distinct:
             result = result.distinct()
         return result
 
@@ -279,6 +281,43 @@ class UnitQuerySet(models.QuerySet):
         return super().select_for_update(no_key=using_postgresql())
 
 
+def prefetch_secondary_units(units, user):
+    """Fetch secondary units for a list of units using a single query."""
+    secondary_langs = set(user.profile.secondary_languages.values_list("id", flat=True))
+    lookup = defaultdict(list)
+    if secondary_langs:
+        for unit in (
+            Unit.objects.filter(
+                Q(source_unit__in={unit.source_unit_id for unit in units})
+                & Q(translation__language__in=secondary_langs)
+                & Q(state__gte=STATE_TRANSLATED)
+                & Q(state__lt=STATE_READONLY)
+                & ~Q(target="")
+            )
+            .select_related(
+                "source_unit",
+                "translation__language",
+                "translation__plural",
+            )
+            .order_by("pk")
+        ):
+            lookup[unit.source_unit_id].append(unit)
+
+    for unit in units:
+        excluded = {
+            unit.translation.language_id,
+            unit.translation.component.source_language_id,
+        }
+        unit.secondary_units = get_distinct_translations(
+            secondary
+            for secondary in lookup[unit.source_unit_id]
+            if secondary.pk != unit.pk
+            and secondary.translation.language_id not in excluded
+        )
+        for secondary in unit.secondary_units:
+            secondary.translation.component = unit.translation.component
+
+
 class LabelsField(models.ManyToManyField):
     def save_form_data(self, instance, data):
         from weblate.trans.models.label import TRANSLATION_LABELS
@@ -303,6 +342,9 @@ class Unit(models.Model, LoggerMixin):
     flags = models.TextField(default="", blank=True)
     source = models.TextField()
     previous_source = models.TextField(default="", blank=True)
+    # Hashes of lowercased source and context to lookup related strings
+    source_hash = models.BigIntegerField(default=0, db_index=True)
+    context_hash = models.BigIntegerField(default=0, db_index=True)
     target = models.TextField(default="", blank=True)
     state = models.IntegerField(default=STATE_EMPTY, choices=STATE_CHOICES)
     original_state = models.IntegerField(default=STATE_EMPTY, choices=STATE_CHOICES)
@@ -362,6 +404,19 @@ class Unit(models.Model, LoggerMixin):
             return f"[{self.context}] {self.source}"
         return self.source
 
+    def update_lookup_hash(self) -> bool:
+        """Update hashes used to lookup related strings.
+
+        Returns whether the hashes have changed.
+        """
+        source_hash = calculate_hash(self.source.lower())
+        context_hash = calculate_hash(self.context.lower())
+        if self.source_hash == source_hash and self.context_hash == context_hash:
+            return False
+        self.source_hash = source_hash
+        self.context_hash = context_hash
+        return True
+
     def save(
         self,
         same_content: bool = False,
@@ -385,6 +440,11 @@ class Unit(models.Model, LoggerMixin):
             if update_fields and "num_words" not in update_fields:
                 update_fields.append("num_words")
 
+        # Store hashes used to lookup related strings
+        if self.update_lookup_hash():
+            if update_fields and "source_hash" not in update_fields:
+                update_fields.extend(("source_hash", "context_hash"))
+
         # Actually save the unit
         super().save(
             force_insert=force_insert,
@@ -440,6 +500,8 @@ class Unit(models.Model, LoggerMixin):
         self.machinery = {"best": -1}
         # Data for glossary integration
         self.glossary_terms = None
+        # Secondary units cache
+        self.secondary_units = None
         # Store original attributes for change tracking
         self.old_unit = None
         if "state" in self.__dict__:
@@ -1436,28 +1498,9 @@ class Unit(models.Model, LoggerMixin):
 
     def get_secondary_units(self, user):
         """Return list of secondary units."""
-        secondary_langs = user.profile.secondary_languages.exclude(
-            id__in=[
-                self.translation.language_id,
-                self.translation.component.source_language_id,
-            ]
-        )
-        result = get_distinct_translations(
-            self.source_unit.unit_set.filter(
-                Q(translation__language__in=secondary_langs)
-                & Q(state__gte=STATE_TRANSLATED)
-                & Q(state__lt=STATE_READONLY)
-                & ~Q(target="")
-                & ~Q(pk=self.pk)
-            ).select_related(
-                "source_unit",
-                "translation__language",
-                "translation__plural",
-            )
-        )
-        for unit in result:
-            unit.translation.component = self.translation.component
-        return result
+        if self.secondary_units is None:
+            prefetch_secondary_units([self], user)
+        return self.secondary_units
 
     @property
     def checksum(self):
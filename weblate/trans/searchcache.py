@@ -0,0 +1,99 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Server side storage for unit search results.
+
+The search results are stored in the cache in a compact form and only the
+cache key is kept in the session. The results are shared between all users
+performing the same search on the same object, the visibility is already
+enforced while resolving the object.
+"""
+
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from weblate.utils.hash import calculate_checksum
+
+# How long the search results are kept
+SEARCH_CACHE_TIMEOUT = 86400
+
+
+def encode_ids(ids: List[int]) -> bytes:
+    """Compact encoding of unit IDs list.
+
+    The list is delta encoded and compressed. The search results are typically
+    ordered by position, so the deltas are small and compress very well.
+    """
+    deltas = array(
+        "q", (current - previous for previous, current in zip([0] + ids, ids))
+    )
+    return zlib.compress(deltas.tobytes())
+
+
+def decode_ids(data: bytes) -> List[int]:
+    """Decode unit IDs list encoded by encode_ids."""
+    deltas = array("q")
+    deltas.frombytes(zlib.decompress(data))
+    return list(accumulate(deltas))
+
+
+def get_revision_key(project) -> str:
+    return f"search-revision-{project.pk}"
+
+
+def get_revision(project) -> str:
+    return cache.get(get_revision_key(project), "")
+
+
+def invalidate_search_cache(project):
+    """Invalidate shared search results for a project.
+
+    Results already referenced from user sessions are kept, so that
+    navigation in the ongoing searches is stable.
+    """
+    cache.set(get_revision_key(project), uuid4().hex, SEARCH_CACHE_TIMEOUT)
+
+
+def get_cache_key(base, project, search_url: str) -> str:
+    """Cache key for search results.
+
+    Search URL includes both query and sorting.
+    """
+    return "search-result-{}-{}".format(
+        base.cache_key,
+        calculate_checksum(get_revision(project), search_url),
+    )
+
+
+def store_search_result(cache_key: str, result: Dict, ids: List[int]):
+    data = dict(result)
+    data["ids"] = encode_ids(ids)
+    cache.set(cache_key, data, SEARCH_CACHE_TIMEOUT)
+
+
+def load_search_result(cache_key: str) -> Optional[Dict]:
+    data = cache.get(cache_key)
+    if data is None:
+        return None
+    data["ids"] = decode_ids(data["ids"])
+    return data
@@ -16,15 +16,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
+import heapq
 import os
 import time
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 from glob import glob
 from typing import List, Optional
+from urllib.parse import urlparse
+from uuid import uuid4
 
-from celery import current_task
+from celery import chord, current_task
 from celery.schedules import crontab
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Count, F
 from django.utils import timezone
@@ -34,6 +39,7 @@ from django.utils.translation import ngettext, override
 from weblate.addons.models import Addon
 from weblate.auth.models import User, get_anonymous
 from weblate.lang.models import Language
+from weblate.logger import LOGGER
 from weblate.trans.autotranslate import AutoTranslate
 from weblate.trans.exceptions import FileParseError
 from weblate.trans.models import (
@@ -43,14 +49,22 @@ from weblate.trans.models import (
     Project,
     Suggestion,
     Translation,
+    Unit,
 )
 from weblate.utils.celery import app
 from weblate.utils.data import data_dir
 from weblate.utils.errors import report_error
 from weblate.utils.files import remove_tree
+from weblate.utils.hash import calculate_checksum
 from weblate.utils.lock import WeblateLockTimeout
 from weblate.utils.stats import prefetch_stats
 from weblate.vcs.base import RepositoryException
+from weblate.vcs.mirror import cleanup_mirrors, fetch_since
+
+COMMIT_QUEUE_CACHE_KEY = "commit-pending-queue"
+COMMIT_LATENCY_CACHE_KEY = "commit-pending-latency"
+HOOK_PENDING_CACHE_KEY = "hook-updates-pending"
+HOOK_MERGED_CACHE_KEY = "hook-updates-merged"
 
 
 @app.task(
@@ -75,6 +89,50 @@ def perform_update(cls, pk, auto=False, obj=None):
         return
 
 
+def increment_counter(cache_key: str, delta: int = 1):
+    cache.add(cache_key, 0, 86400)
+    try:
+        cache.incr(cache_key, delta)
+    except ValueError:
+        pass
+
+
+def schedule_hook_update(cls: str, pk: int) -> bool:
+    """
+    Schedule update triggered by a notification hook.
+
+    Hooks received before the update starts are merged into the already
+    scheduled update, returns False in that case.
+    """
+    delay = settings.HOOK_UPDATE_DELAY
+    if not delay:
+        perform_update.delay(cls, pk)
+        return True
+    if not cache.add(f"hook-update-{cls}-{pk}", True, 2 * delay + 300):
+        LOGGER.info("merged hook into pending update of %s %d", cls, pk)
+        increment_counter(HOOK_MERGED_CACHE_KEY)
+        return False
+    increment_counter(HOOK_PENDING_CACHE_KEY)
+    perform_hook_update.apply_async(args=(cls, pk), countdown=delay)
+    return True
+
+
+@app.task(trail=False)
+def perform_hook_update(cls: str, pk: int):
+    # Hooks received from now on need a new update
+    cache.delete(f"hook-update-{cls}-{pk}")
+    increment_counter(HOOK_PENDING_CACHE_KEY, -1)
+    perform_update.delay(cls, pk)
+
+
+def get_hook_stats():
+    """Return counts of pending and merged hook updates."""
+    return {
+        "pending": max(0, cache.get(HOOK_PENDING_CACHE_KEY, 0)),
+        "merged": cache.get(HOOK_MERGED_CACHE_KEY, 0),
+    }
+
+
 @app.task(
     trail=False,
     autoretry_for=(WeblateLockTimeout,),
@@ -141,7 +199,17 @@ def commit_pending(hours=None, pks=None, logger=None):
     else:
         components = Component.objects.filter(translation__pk__in=pks).distinct()
 
-    for component in prefetch_stats(components.prefetch()):
+    # Count pending units in all components at once
+    pending = dict(
+        Unit.objects.filter(pending=True, translation__component__in=components)
+        .values_list("translation__component")
+        .annotate(Count("id"))
+        .order_by()
+    )
+
+    # Group components sharing a repository
+    groups = defaultdict(lambda: {"pks": [], "pending": 0, "oldest": None})
+    for component in prefetch_stats(components.filter(pk__in=pending).prefetch()):
         if hours is None:
             age = timezone.now() - timedelta(hours=component.commit_pending_age)
         else:
@@ -153,13 +221,69 @@ def commit_pending(hours=None, pks=None, logger=None):
         if last_change > age:
             continue
 
-        if not component.needs_commit():
-            continue
-
         if logger:
             logger(f"Committing {component}")
 
-        perform_commit.delay(component.pk, "commit_pending", None)
+        group = groups[component.linked_component_id or component.pk]
+        group["pks"].append(component.pk)
+        group["pending"] += pending[component.pk]
+        if group["oldest"] is None or last_change < group["oldest"]:
+            group["oldest"] = last_change
+
+    schedule_commits(groups.values())
+
+
+def schedule_commits(groups):
+    """
+    Distribute commits of component groups to parallel batches.
+
+    Each group contains components sharing a repository and is committed
+    sequentially within a single batch, so the batches do not compete for
+    repository locks. Groups with most pending changes and the oldest changes
+    are committed first and the batches are balanced by the pending changes.
+    """
+    groups = sorted(groups, key=lambda group: (-group["pending"], group["oldest"]))
+    batches = [(0, i, []) for i in range(max(1, settings.COMMIT_PENDING_PARALLEL))]
+    for group in groups:
+        load, i, pks = heapq.heappop(batches)
+        pks.extend(group["pks"])
+        heapq.heappush(batches, (load + group["pending"], i, pks))
+
+    cache.set(COMMIT_QUEUE_CACHE_KEY, sum(len(group["pks"]) for group in groups), 86400)
+    for _load, _i, pks in sorted(batches, key=lambda batch: batch[1]):
+        if pks:
+            perform_commit_batch.delay(pks)
+
+
+@app.task(trail=False)
+def perform_commit_batch(pks):
+    """Commit pending changes in components sequentially."""
+    for pk in pks:
+        start = time.monotonic()
+        try:
+            component = Component.objects.get(pk=pk)
+            component.commit_pending("commit_pending", None)
+        except Component.DoesNotExist:
+            pass
+        except WeblateLockTimeout:
+            # Retry separately without blocking rest of the batch
+            perform_commit.delay(pk, "commit_pending", None)
+        except Exception:
+            report_error(cause="Failed to commit pending changes")
+        else:
+            cache.set(COMMIT_LATENCY_CACHE_KEY, time.monotonic() - start, 86400)
+        try:
+            cache.decr(COMMIT_QUEUE_CACHE_KEY)
+        except ValueError:
+            pass
+
+
+def get_commit_stats():
+    """Return metrics of the pending changes commit queue."""
+    return {
+        "queue": max(0, cache.get(COMMIT_QUEUE_CACHE_KEY, 0)),
+        "latency": cache.get(COMMIT_LATENCY_CACHE_KEY),
+    }
 
 
 @app.task(trail=False)
@@ -231,8 +355,163 @@ def update_remotes():
     if settings.AUTO_UPDATE not in ("full", "remote", True, False):
         return
 
-    for component in Component.objects.with_repo().iterator():
-        perform_update("Component", -1, auto=True, obj=component)
+    # Group components by host and upstream repository
+    hosts = defaultdict(lambda: defaultdict(list))
+    for repo, pk in Component.objects.with_repo().values_list("repo", "pk"):
+        hosts[get_repo_host(repo)][repo].append(pk)
+
+    # Split repositories on each host to limited number of batches
+    batches = []
+    for repos in hosts.values():
+        host_batches = [
+            []
+            for _i in range(
+                max(1, min(settings.UPDATE_REMOTES_HOST_PARALLEL, len(repos)))
+            )
+        ]
+        for i, pks in enumerate(repos.values()):
+            host_batches[i % len(host_batches)].append(pks)
+        batches.extend(host_batches)
+
+    run = uuid4().hex
+    cache.set(f"update-remotes-{run}", len(batches), 86400)
+    for batch in batches:
+        update_remotes_batch.delay(batch, time.time(), run)
+
+
+def get_repo_host(repo: str) -> str:
+    parsed = urlparse(repo)
+    if not parsed.hostname:
+        parsed = urlparse(f"ssh://{repo}")
+    return parsed.hostname or ""
+
+
+def get_backoff_key(repo: str) -> str:
+    return f"update-remotes-backoff-{calculate_checksum(repo)}"
+
+
+def record_remote_failure(repo: str):
+    """Back off exponentially from remotes failing repeatedly."""
+    cache_key = get_backoff_key(repo)
+    backoff = cache.get(cache_key, {"failures": 0})
+    backoff["failures"] += 1
+    # Skip up to week of daily updates, keep margin for the scheduling
+    days = min(2 ** (backoff["failures"] - 1) - 1, 7)
+    backoff["retry"] = time.time() + days * 86400 - 3600
+    cache.set(cache_key, backoff, 30 * 86400)
+
+
+def update_remote_component(component, full: bool, since: float) -> Optional[bool]:
+    """Update single component, returns None if the update was postponed."""
+    try:
+        # Fetch each shared mirror only once
+        with fetch_since(since):
+            if full:
+                return bool(component.do_update())
+            return bool(component.update_remote_branch())
+    except FileParseError:
+        # This is stored as alert, so we can silently ignore here
+        return True
+    except WeblateLockTimeout:
+        # The repository is busy, update it separately later
+        perform_update.delay("Component", component.pk, auto=True)
+        return None
+    except Exception:
+        report_error(cause="Could not update remote")
+        return False
+
+
+@app.task(trail=False)
+def update_remotes_batch(batch: List[List[int]], since: float, run: str):
+    """
+    Update remote branches for a batch of repositories.
+
+    Each item in the batch lists components sharing upstream repository, the
+    upstream is checked only once for them and unchanged branches are skipped.
+    """
+    full = settings.AUTO_UPDATE in ("full", True)
+    summary = {"fetched": 0, "skipped": 0, "failed": 0, "time": 0.0}
+    for pks in batch:
+        components = list(Component.objects.filter(pk__in=pks).prefetch())
+        if not components:
+            continue
+        repo = components[0].repo
+
+        backoff = cache.get(get_backoff_key(repo))
+        if backoff and backoff["retry"] > time.time():
+            summary["skipped"] += len(components)
+            continue
+
+        try:
+            heads = components[0].repository_class.get_remote_heads(repo) or {}
+        except RepositoryException:
+            # Let the update report the error
+            heads = {}
+
+        update_failed = False
+        for component in components:
+            if (
+                component.remote_revision
+                and heads.get(component.branch) == component.remote_revision
+                and not (full and component.repo_needs_merge())
+            ):
+                summary["skipped"] += 1
+                continue
+
+            start = time.monotonic()
+            result = update_remote_component(component, full, since)
+            summary["time"] += time.monotonic() - start
+
+            if result is None:
+                # Update was postponed
+                summary["skipped"] += 1
+            elif result:
+                summary["fetched"] += 1
+            else:
+                summary["failed"] += 1
+                if component.alert_set.filter(name="UpdateFailure").exists():
+                    update_failed = True
+
+        if update_failed:
+            record_remote_failure(repo)
+        elif backoff:
+            cache.delete(get_backoff_key(repo))
+
+    log_update_remotes_summary(summary, run)
+    return summary
+
+
+def log_update_remotes_summary(summary, run: str):
+    LOGGER.info(
+        "updated remotes batch: %d fetched, %d skipped, %d failed, took %.2f seconds",
+        summary["fetched"],
+        summary["skipped"],
+        summary["failed"],
+        summary["time"],
+    )
+    # Accumulate summary of the whole run
+    for key, value in summary.items():
+        cache_key = f"update-remotes-{run}-{key}"
+        if key == "time":
+            # The incr does not work with floats
+            value = int(value * 1000)
+        cache.add(cache_key, 0, 86400)
+        cache.incr(cache_key, value)
+    try:
+        remaining = cache.decr(f"update-remotes-{run}")
+    except ValueError:
+        return
+    if remaining == 0:
+        totals = cache.get_many(
+            [f"update-remotes-{run}-{key}" for key in summary.keys()]
+        )
+        LOGGER.info(
+            "updated remotes: %d fetched, %d skipped, %d failed, took %.2f seconds",
+            totals.get(f"update-remotes-{run}-fetched", 0),
+            totals.get(f"update-remotes-{run}-skipped", 0),
+            totals.get(f"update-remotes-{run}-failed", 0),
+            totals.get(f"update-remotes-{run}-time", 0) / 1000,
+        )
 
 
 @app.task(trail=False)
@@ -262,6 +541,9 @@ def cleanup_stale_repos():
         if not objects.exists():
             remove_tree(path)
 
+    # Remove mirrors no longer used by any repository
+    cleanup_mirrors(glob(vcs_mask), time.time() - 86400)
+
 
 @app.task(trail=False)
 def cleanup_old_suggestions():
@@ -518,6 +800,14 @@ def daily_update_checks():
         update_checks.delay(component_id)
 
 
+def remove_backup(path: str):
+    if os.path.isdir(path):
+        # Parts of backup being processed in parallel
+        remove_tree(path)
+    else:
+        os.unlink(path)
+
+
 @app.task(trail=False)
 def cleanup_project_backups():
     # This intentionally does not use Project objects to remove stale backups
@@ -541,18 +831,18 @@ def cleanup_project_backups():
                     datetime.fromtimestamp(int(path.split(".")[0])),
                 )
                 for path in os.listdir(projectdir)
-                if path.endswith(".zip") or path.endswith(".zip.part")
+                if path.endswith((".zip", ".zip.part", ".zip.parts"))
             ),
             key=lambda item: item[1],
             reverse=True,
         )
         while len(backups) > max_count:
             remove = backups.pop()
-            os.unlink(os.path.join(projectdir, remove[0]))
+            remove_backup(os.path.join(projectdir, remove[0]))
 
         for backup in backups:
             if backup[1] < cutoff:
-                os.unlink(os.path.join(projectdir, backup[0]))
+                remove_backup(os.path.join(projectdir, backup[0]))
 
 
 @app.task(trail=False)
@@ -560,7 +850,52 @@ def create_project_backup(pk):
     from weblate.trans.backups import ProjectBackup
 
     project = Project.objects.get(pk=pk)
-    ProjectBackup().backup_project(project)
+    backup = ProjectBackup()
+    components = backup.prepare_backup(project)
+    if not components:
+        backup.finish_backup(project)
+        return
+    # The backup is completed once all components have been processed
+    chord(
+        backup_project_component.si(pk, backup.filename, component)
+        for component in components
+    )(finish_project_backup.si(pk, backup.filename))
+
+
+@app.task(trail=False)
+def backup_project_component(project_pk, filename, pk):
+    from weblate.trans.backups import ProjectBackup
+
+    project = Project.objects.get(pk=project_pk)
+    ProjectBackup(filename).backup_component_part(project, pk)
+
+
+@app.task(trail=False)
+def finish_project_backup(project_pk, filename):
+    from weblate.trans.backups import ProjectBackup
+
+    project = Project.objects.get(pk=project_pk)
+    ProjectBackup(filename).finish_backup(project)
+
+
+@app.task(trail=False)
+def update_widget_cache(widget, color, kind, pk, obj_code, lang_code, language):
+    from weblate.trans.widgets import WidgetCache
+
+    try:
+        WidgetCache.from_params(
+            widget, color, kind, pk, obj_code, lang_code, language
+        ).update()
+    except (Project.DoesNotExist, Component.DoesNotExist, Language.DoesNotExist):
+        return
+
+
+@app.task(trail=False)
+def cleanup_widget_cache():
+    from weblate.trans.widgets import WIDGET_CACHE_TIMEOUT, WidgetCache
+
+    # The metadata in the cache expires at the same time, so these are unused
+    WidgetCache.cleanup(time.time() - WIDGET_CACHE_TIMEOUT)
 
 
 @app.on_after_finalize.connect
@@ -591,3 +926,6 @@ def setup_periodic_tasks(sender, **kwargs):
         cleanup_project_backups.s(),
         name="cleanup-project-backups",
     )
+    sender.add_periodic_task(
+        3600 * 24, cleanup_widget_cache.s(), name="cleanup-widget-cache"
+    )
@@ -20,7 +20,8 @@
 """Tests for data exports."""
 
 import os
-from unittest import SkipTest
+from glob import glob
+from unittest import SkipTest, mock
 from zipfile import ZipFile
 
 from django.core.files import File
@@ -31,9 +32,10 @@ from weblate.checks.models import Check
 from weblate.screenshots.models import Screenshot
 from weblate.trans.backups import ProjectBackup
 from weblate.trans.models import Comment, Project, Suggestion, Unit, Vote
-from weblate.trans.tasks import cleanup_project_backups
+from weblate.trans.tasks import cleanup_project_backups, create_project_backup
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.tests.utils import get_test_file
+from weblate.utils.data import data_dir
 
 TEST_SCREENSHOT = get_test_file("screenshot.png")
 TEST_BACKUP = get_test_file("projectbackup-4.14.zip")
@@ -138,6 +140,9 @@ class BackupsTest(ViewTestCase):
             16,
             Unit.objects.filter(translation__component__project=restored).count(),
         )
+        # Lookup hashes are calculated for bulk created units
+        for unit in Unit.objects.filter(translation__component__project=restored):
+            self.assertFalse(unit.update_lookup_hash())
         self.assertEqual(
             1,
             Vote.objects.filter(
@@ -167,6 +172,11 @@ class BackupsTest(ViewTestCase):
             set(restored.label_set.values_list("name", "color")),
         )
 
+    def test_restore_chunks(self):
+        # Process units and memory in several chunks
+        with mock.patch("weblate.trans.backups.BACKUP_CHUNK", 3):
+            self.test_restore_4_14()
+
     def test_cleanup(self):
         cleanup_project_backups()
         self.assertLessEqual(len(self.project.list_backups()), 3)
@@ -184,6 +194,51 @@ class BackupsTest(ViewTestCase):
         cleanup_project_backups()
         self.assertEqual(len(self.project.list_backups()), 3)
 
+    def test_create_backup_parallel(self):
+        start = len(self.project.list_backups())
+        create_project_backup(self.project.pk)
+        backups = self.project.list_backups()
+        self.assertEqual(len(backups), start + 1)
+        filename = backups[0]["path"]
+        self.assertFalse(os.path.exists(f"{filename}.parts"))
+
+        with ZipFile(filename, "r") as zipfile:
+            files = set(zipfile.namelist())
+            self.assertIn("weblate-backup.json", files)
+            self.assertIn("weblate-memory.json", files)
+            self.assertIn("components/test.json", files)
+            self.assertIn("components/glossary.json", files)
+            self.assertIn("vcs/test/.git/index", files)
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            ProjectBackup(filename).validate()
+
+    def test_create_backup_parallel_error(self):
+        original = ProjectBackup.backup_component_data
+
+        def backup_component_data(backup, handle, component):
+            if component.slug == "glossary":
+                raise OSError("Failed")
+            original(backup, handle, component)
+
+        start = len(self.project.list_backups())
+        with mock.patch(
+            "weblate.trans.backups.ProjectBackup.backup_component_data",
+            backup_component_data,
+        ), mock.patch(
+            "weblate.trans.backups.report_error"
+        ) as report_error, self.assertRaisesRegex(
+            ValueError, "backup of components failed: glossary"
+        ):
+            create_project_backup(self.project.pk)
+        report_error.assert_called_once()
+
+        # Incomplete backup is not created
+        self.assertEqual(len(self.project.list_backups()), start)
+        self.assertEqual(
+            glob(data_dir("projectbackups", str(self.project.pk), "*.zip.parts")), []
+        )
+
     def test_views(self):
         start = len(self.project.list_backups())
         url = reverse("backups", kwargs=self.kw_project)
@@ -19,9 +19,13 @@
 
 """Tests for changes browsing."""
 
+from datetime import timedelta
+from unittest.mock import patch
+
 from django.urls import reverse
+from django.utils import timezone
 
-from weblate.trans.models import Unit
+from weblate.trans.models import Change, Unit
 from weblate.trans.tests.test_views import ViewTestCase
 
 
@@ -80,3 +84,58 @@ class ChangesTest(ViewTestCase):
         response = self.client.get(reverse("changes"), {"user": self.user.username})
         self.assertContains(response, "New translation")
         self.assertNotContains(response, "Invalid search string!")
+
+    def test_count_stats(self):
+        changes = Change.objects.filter(project=self.project)
+        dtstart = timezone.now() - timedelta(days=6)
+        stats = changes.count_stats(7, 2, dtstart)
+        self.assertEqual(
+            [start for start, _count in stats],
+            [dtstart + timedelta(days=offset) for offset in (0, 2, 4, 6)],
+        )
+        # All changes were done in the last interval
+        self.assertEqual([count for _start, count in stats][:3], [0, 0, 0])
+        self.assertEqual(stats[3][1], changes.count())
+
+    def test_count_stats_boundaries(self):
+        changes = Change.objects.filter(project=self.project)
+        change = changes[0]
+        dtstart = change.timestamp - timedelta(days=2)
+        stats = changes.filter(pk=change.pk).count_stats(4, 2, dtstart)
+        # Change exactly on the boundary belongs to the later interval
+        self.assertEqual([count for _start, count in stats], [0, 1])
+
+    def test_base_stats_cache(self):
+        self.edit_unit("Hello, world!\n", "Nazdar svete!\n")
+        Change.objects.create(project=self.project, action=Change.ACTION_LOCK)
+        # Move changes into the range covered by the stats
+        Change.objects.update(timestamp=timezone.now() - timedelta(days=5))
+        all_stats = Change.objects.base_stats(30, 1, project=self.project)
+        content_stats = Change.objects.content().base_stats(30, 1, project=self.project)
+        self.assertEqual(
+            sum(count for _start, count in all_stats),
+            Change.objects.filter(project=self.project).count(),
+        )
+        self.assertEqual(
+            sum(count for _start, count in content_stats),
+            Change.objects.content().filter(project=self.project).count(),
+        )
+        self.assertNotEqual(all_stats, content_stats)
+
+    def test_notifications_batch(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            changes = [
+                Change.objects.create(
+                    translation=self.get_translation(),
+                    action=Change.ACTION_NEW_STRING,
+                )
+                for _i in range(3)
+            ]
+        with patch("weblate.accounts.tasks.notify_changes.delay") as delay:
+            for callback in callbacks:
+                callback()
+        # All changes are notified by a single task
+        delay.assert_called_once()
+        self.assertLessEqual(
+            {change.pk for change in changes}, set(delay.call_args[0][0])
+        )
@@ -22,12 +22,15 @@
 
 import time
 from unittest import SkipTest
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.urls import reverse
 
 from weblate.addons.resx import ResxUpdateAddon
 from weblate.checks.models import Check
 from weblate.trans.models import Change, Component, Unit
+from weblate.trans.models.component import prefetch_repo_status
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.util import join_plural
 from weblate.utils.hash import hash_to_checksum
@@ -992,3 +995,20 @@ class EditComplexTest(ViewTestCase):
         # The source unit should be now removed as well
         self.assertFalse(Unit.objects.filter(pk=source_unit.pk).exists())
         self.assertEqual(unit_count - 4, Unit.objects.count())
+
+
+class RepoStatusTest(ViewTestCase):
+    def test_repo_status_cache(self):
+        self.edit_unit("Hello, world!\n", "Nazdar svete!\n")
+        self.component.commit_pending("test", self.user, skip_push=True)
+        cache_key = self.component.get_repo_status_key()
+        self.assertIsNotNone(cache_key)
+        self.assertEqual(cache.get(cache_key), {"missing": 0, "outgoing": 1})
+
+        # Status is loaded from the cache
+        component = Component.objects.get(pk=self.component.pk)
+        prefetch_repo_status([component])
+        self.assertEqual(component.repo_status, {cache_key: cache.get(cache_key)})
+        with patch.object(component.repository, "count_outgoing") as mocked:
+            self.assertEqual(component.count_repo_outgoing, 1)
+            mocked.assert_not_called()
@@ -22,10 +22,18 @@
 import json
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 
+from weblate.trans.tasks import (
+    HOOK_MERGED_CACHE_KEY,
+    HOOK_PENDING_CACHE_KEY,
+    get_hook_stats,
+    perform_hook_update,
+    schedule_hook_update,
+)
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.views.hooks import HOOK_HANDLERS
 
@@ -1181,6 +1189,25 @@ class HooksViewTest(ViewTestCase):
         response = self.client.get(reverse("hook-component", kwargs=self.kw_component))
         self.assertContains(response, "Update triggered")
 
+    @override_settings(ENABLE_HOOKS=True, HOOK_UPDATE_DELAY=30)
+    def test_hook_merged(self):
+        cache.delete_many([HOOK_PENDING_CACHE_KEY, HOOK_MERGED_CACHE_KEY])
+        with patch("weblate.trans.tasks.perform_hook_update.apply_async") as mocked:
+            for _i in range(3):
+                response = self.client.get(
+                    reverse("hook-component", kwargs=self.kw_component)
+                )
+                self.assertContains(response, "Update triggered")
+            mocked.assert_called_once()
+        self.assertEqual(get_hook_stats(), {"pending": 1, "merged": 2})
+
+        # Performing the update allows scheduling new one
+        perform_hook_update("Component", self.component.pk)
+        self.assertEqual(get_hook_stats(), {"pending": 0, "merged": 2})
+        with patch("weblate.trans.tasks.perform_hook_update.apply_async") as mocked:
+            self.assertTrue(schedule_hook_update("Component", self.component.pk))
+            mocked.assert_called_once()
+
     @override_settings(ENABLE_HOOKS=True)
     def test_hook_github_exists(self):
         # Adjust matching repo
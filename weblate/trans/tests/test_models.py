@@ -30,6 +30,7 @@ from weblate.lang.models import Language, Plural
 from weblate.trans.models import (
     Announcement,
     AutoComponentList,
+    Change,
     Comment,
     Component,
     ComponentList,
@@ -38,9 +39,14 @@ from weblate.trans.models import (
     Unit,
     Vote,
 )
-from weblate.trans.tests.utils import RepoTestMixin, create_test_user
+from weblate.trans.tests.utils import (
+    RepoTestMixin,
+    create_another_user,
+    create_test_user,
+)
 from weblate.utils.django_hacks import immediate_on_commit, immediate_on_commit_leave
 from weblate.utils.files import remove_tree
+from weblate.utils.hash import calculate_hash
 from weblate.utils.state import STATE_TRANSLATED
 
 
@@ -259,6 +265,38 @@ class TranslationTest(RepoTestCase):
         translation.commit_pending("test", None)
         self.assertNotEqual(start_rev, component.repository.last_revision)
 
+    def test_commit_pending_authors(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        user = create_test_user()
+        another = create_another_user()
+        units = list(translation.unit_set.order_by("pk")[:2])
+        for unit in units:
+            unit.translate(user, "test", STATE_TRANSLATED)
+        # Record later change by other author without committing the pending
+        # changes on author change
+        Change.objects.create(
+            unit=units[1],
+            action=Change.ACTION_CHANGE,
+            user=another,
+            author=another,
+            target="test",
+        )
+        start_rev = component.repository.last_revision
+
+        translation.commit_pending("test", None)
+
+        # Single commit for each author in order of their changes
+        revisions = component.repository.log_revisions(f"{start_rev}..HEAD")
+        self.assertEqual(
+            [
+                component.repository.get_revision_info(revision)["author_name"]
+                for revision in reversed(revisions)
+            ],
+            [user.full_name, another.full_name],
+        )
+        self.assertFalse(translation.unit_set.filter(pending=True).exists())
+
 
 class ComponentListTest(RepoTestCase):
     """Test(s) for ComponentList model."""
@@ -348,6 +386,21 @@ class UnitTest(ModelTestCase):
         unit.translate(user, "other\r\nstring", STATE_TRANSLATED)
         self.assertEqual(unit.target, "other\r\nstring\r\n")
 
+    def test_lookup_hash(self):
+        units = Unit.objects.filter(source="Hello, world!\n")
+        self.assertEqual(
+            {unit.source_hash for unit in units},
+            {calculate_hash("hello, world!\n")},
+        )
+        self.assertEqual(
+            set(
+                Unit.objects.filter(
+                    source_hash=calculate_hash("HELLO, WORLD!\n".lower())
+                ).values_list("pk", flat=True)
+            ),
+            {unit.pk for unit in units},
+        )
+
     def test_flags(self):
         unit = Unit.objects.filter(translation__language_code="cs")[0]
         unit.flags = "no-wrap, ignore-same"
@@ -19,10 +19,13 @@
 
 
 from datetime import timedelta
+from io import StringIO
 
+from django.core.management import call_command
 from django.urls import reverse
 from django.utils import timezone
 
+from weblate.trans.models import Change
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.views.reports import generate_counts, generate_credits
 
@@ -113,6 +116,33 @@ class ReportsTest(BaseReportsTest):
         )
         self.assertEqual(data, COUNTS_DATA)
 
+    def test_counts_legacy(self):
+        self.add_change()
+        # Changes without precalculated values
+        Change.objects.update(edit_distance=None, target_words=None)
+        data = generate_counts(
+            None,
+            timezone.now() - timedelta(days=1),
+            timezone.now() + timedelta(days=1),
+            component=self.component,
+        )
+        self.assertEqual(data, COUNTS_DATA)
+
+    def test_update_report_stats(self):
+        self.add_change()
+        Change.objects.update(edit_distance=None, target_words=None)
+        call_command("update_report_stats", stdout=StringIO())
+        self.assertFalse(
+            Change.objects.content().filter(edit_distance__isnull=True).exists()
+        )
+        data = generate_counts(
+            None,
+            timezone.now() - timedelta(days=1),
+            timezone.now() + timedelta(days=1),
+            component=self.component,
+        )
+        self.assertEqual(data, COUNTS_DATA)
+
 
 class ReportsComponentTest(BaseReportsTest):
     def get_kwargs(self):
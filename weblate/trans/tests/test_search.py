@@ -21,10 +21,12 @@
 import re
 
 from django.http import QueryDict
+from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 
-from weblate.trans.models import Component
+from weblate.trans.models import Comment, Component
+from weblate.trans.searchcache import decode_ids, encode_ids, get_revision
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.utils.db import using_postgresql
 from weblate.utils.ratelimit import reset_rate_limit
@@ -191,6 +193,38 @@ class SearchViewTest(ViewTestCase):
     def test_checksum(self):
         self.do_search({"checksum": "invalid"}, None)
 
+    def test_search_session(self):
+        self.do_search({}, "1 / 4")
+        # Only reference to the results is stored in the session
+        for key, value in self.client.session.items():
+            if key.startswith("search_"):
+                self.assertNotIn("ids", value)
+                self.assertIn("cache", value)
+        self.do_search({"offset": 2}, "2 / 4")
+
+    def test_search_cache_invalidation(self):
+        unit = self.get_unit()
+        label = self.project.label_set.create(name="Test label", color="navy")
+        revision = get_revision(self.project)
+        with self.captureOnCommitCallbacks(execute=True):
+            unit.labels.add(label)
+        self.assertNotEqual(get_revision(self.project), revision)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(
+                unit=unit, comment="Test comment", userdetails={}
+            )
+        revision = get_revision(self.project)
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.delete()
+        self.assertNotEqual(get_revision(self.project), revision)
+
+
+class SearchCacheTest(SimpleTestCase):
+    def test_encode(self):
+        for ids in ([], [1], [10, 11, 12, 13], [1000, 5, 2**40, 7]):
+            self.assertEqual(decode_ids(encode_ids(ids)), ids)
+
 
 class ReplaceTest(ViewTestCase):
     """Test for search and replace functionality."""
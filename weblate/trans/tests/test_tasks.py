@@ -18,19 +18,27 @@
 #
 
 
+import time
 from datetime import timedelta
+from unittest import mock
 
 from django.test.utils import override_settings
 from django.utils import timezone
 
-from weblate.trans.models import Comment, Suggestion
+from weblate.trans.models import Comment, Component, Suggestion
 from weblate.trans.tasks import (
     cleanup_old_comments,
     cleanup_old_suggestions,
     cleanup_suggestions,
+    commit_pending,
     daily_update_checks,
+    get_commit_stats,
+    get_repo_host,
+    update_remotes,
+    update_remotes_batch,
 )
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.utils.lock import WeblateLockTimeout
 from weblate.utils.state import STATE_TRANSLATED
 
 
@@ -107,3 +115,56 @@ class CleanupTest(ViewTestCase):
 class TasksTest(ViewTestCase):
     def test_daily_update_checks(self):
         daily_update_checks()
+
+    def test_commit_pending(self):
+        self.edit_unit("Hello, world!\n", "Nazdar svete!\n")
+        self.assertTrue(self.component.needs_commit())
+        start_rev = self.component.repository.last_revision
+        commit_pending(hours=0)
+        self.assertFalse(self.component.needs_commit())
+        self.assertNotEqual(start_rev, self.component.repository.last_revision)
+        stats = get_commit_stats()
+        self.assertEqual(stats["queue"], 0)
+        self.assertIsNotNone(stats["latency"])
+
+    def test_update_remotes(self):
+        update_remotes()
+        # Unknown state is fetched
+        Component.objects.filter(pk=self.component.pk).update(remote_revision="")
+        summary = update_remotes_batch([[self.component.pk]], time.time(), "test")
+        self.assertEqual(summary["skipped"], 0)
+        self.assertEqual(summary["fetched"], 1)
+        # Unchanged upstream is skipped
+        summary = update_remotes_batch([[self.component.pk]], time.time(), "test")
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(summary["fetched"], 0)
+
+    @override_settings(AUTO_UPDATE="remote")
+    def test_update_remotes_errors(self):
+        Component.objects.filter(pk=self.component.pk).update(remote_revision="")
+        batch = [[self.component.pk]]
+        with mock.patch.object(
+            Component, "update_remote_branch", side_effect=OSError
+        ), mock.patch("weblate.trans.tasks.report_error") as report_error:
+            summary = update_remotes_batch(batch, time.time(), "test")
+        report_error.assert_called_once()
+        self.assertEqual(summary["failed"], 1)
+
+        # Locked repositories are updated separately
+        with mock.patch.object(
+            Component, "update_remote_branch", side_effect=WeblateLockTimeout
+        ), mock.patch("weblate.trans.tasks.perform_update") as perform_update:
+            summary = update_remotes_batch(batch, time.time(), "test")
+        perform_update.delay.assert_called_once_with(
+            "Component", self.component.pk, auto=True
+        )
+        self.assertEqual(summary["skipped"], 1)
+
+    def test_repo_host(self):
+        self.assertEqual(
+            get_repo_host("https://github.com/WeblateOrg/weblate.git"), "github.com"
+        )
+        self.assertEqual(
+            get_repo_host("git@github.com:WeblateOrg/weblate.git"), "github.com"
+        )
+        self.assertEqual(get_repo_host("/home/weblate/repo"), "")
@@ -19,11 +19,16 @@
 
 """Test for widgets."""
 
+import os
+from time import time
+
 from django.urls import reverse
 
 from weblate.trans.models import Translation
+from weblate.trans.tasks import cleanup_widget_cache
 from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.trans.views.widgets import WIDGETS
+from weblate.trans.widgets import WIDGET_MEMORY, WidgetCache
 
 
 class WidgetsTest(FixtureTestCase):
@@ -47,6 +52,48 @@ class WidgetsTest(FixtureTestCase):
         response = self.client.get(reverse("engage", kwargs=self.kw_lang_project))
         self.assertContains(response, "Test")
 
+    def test_cache(self):
+        url = reverse(
+            "widget-image",
+            kwargs={
+                "project": self.project.slug,
+                "widget": "svg",
+                "color": "badge",
+                "extension": "svg",
+            },
+        )
+        response = self.client.get(url)
+        self.assert_svg(response)
+        etag = response["ETag"]
+
+        # Conditional request
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Outdated widget is served while it is regenerated
+        self.project.stats.invalidate()
+        response = self.client.get(url)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(url)
+        self.assert_svg(response)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_cache_cleanup(self):
+        widget = WidgetCache(WIDGETS["svg"], self.project, "badge", None)
+        widget.update()
+        self.assertTrue(os.path.exists(widget.filename))
+
+        # Recently updated widgets are kept
+        cleanup_widget_cache()
+        self.assertTrue(os.path.exists(widget.filename))
+
+        # Outdated widgets are removed and rendered again when needed
+        WidgetCache.cleanup(time() + 1)
+        self.assertFalse(os.path.exists(widget.filename))
+        WIDGET_MEMORY.clear()
+        widget.get()
+        self.assertTrue(os.path.exists(widget.filename))
+
     def test_site_og(self):
         response = self.client.get(reverse("og-image"))
         self.assert_png(response)
@@ -41,7 +41,7 @@ from django.views.decorators.http import require_POST
 
 from weblate.checks.models import CHECKS, get_display_checks
 from weblate.glossary.forms import TermForm
-from weblate.glossary.models import get_glossary_terms
+from weblate.glossary.models import get_glossary_terms, prefetch_glossary_terms
 from weblate.lang.models import Language
 from weblate.screenshots.forms import ScreenshotForm
 from weblate.trans.exceptions import FileParseError
@@ -58,6 +58,13 @@ from weblate.trans.forms import (
     get_new_unit_form,
 )
 from weblate.trans.models import Change, Comment, Suggestion, Unit, Vote
+from weblate.trans.models.unit import prefetch_secondary_units
+from weblate.trans.searchcache import (
+    SEARCH_CACHE_TIMEOUT,
+    get_cache_key,
+    load_search_result,
+    store_search_result,
+)
 from weblate.trans.tasks import auto_translate
 from weblate.trans.templatetags.translations import (
     try_linkify_filename,
@@ -117,18 +124,23 @@ def get_other_units(unit):
     propagation = component.allow_translation_propagation
     same = None
 
+    # Case insensitive lookup using precomputed hashes, the text is compared
+    # as well to rule out hash collisions
+    unit.update_lookup_hash()
+    same_source = Q(source_hash=unit.source_hash) & Q(source__iexact=unit.source)
+    same_context = Q(context_hash=unit.context_hash) & Q(context__iexact=unit.context)
     if unit.source and unit.context:
         match = Q(source=unit.source) & Q(context=unit.context)
         if component.has_template():
-            query = Q(source__ilike=unit.source) | Q(context__ilike=unit.context)
+            query = same_source | same_context
         else:
-            query = Q(source__ilike=unit.source)
+            query = same_source
     elif unit.source:
         match = Q(source=unit.source) & Q(context="")
-        query = Q(source__ilike=unit.source)
+        query = same_source
     elif unit.context:
         match = Q(context=unit.context)
-        query = Q(context__ilike=unit.context)
+        query = same_context
     else:
         return result
 
@@ -220,7 +232,7 @@ def cleanup_session(session, delete_all: bool = False):
             delete_all
             or not isinstance(value, dict)
             or value["ttl"] < now
-            or "items" not in value
+            or "cache" not in value
         ):
             del session[key]
 
@@ -254,21 +266,32 @@ def search(
     }
     session_key = f"search_{base.cache_key}_{search_url}"
 
+    # Continue in existing search, the session only references the results
     if (
         use_cache
         and session_key in request.session
         and "offset" in request.GET
-        and "items" in request.session[session_key]
+        and "cache" in request.session[session_key]
     ):
-        search_result.update(request.session[session_key])
-        return search_result
-
-    allunits = unit_set.search(cleaned_data.get("q", ""), project=project)
+        stored_result = load_search_result(request.session[session_key]["cache"])
+        if stored_result is not None:
+            search_result.update(stored_result)
+            search_result["key"] = session_key
+            return search_result
+
+    # Search results shared with other users doing the same search
+    cache_key = get_cache_key(base, project, search_url)
+    stored_result = load_search_result(cache_key) if use_cache else None
+
+    if stored_result is not None:
+        unit_ids = stored_result["ids"]
+    else:
+        allunits = unit_set.search(cleaned_data.get("q", ""), project=project)
 
-    # Grab unit IDs
-    unit_ids = list(
-        allunits.order_by_request(cleaned_data, base).values_list("id", flat=True)
-    )
+        # Grab unit IDs
+        unit_ids = list(
+            allunits.order_by_request(cleaned_data, base).values_list("id", flat=True)
+        )
 
     # Check empty search results
     if not unit_ids and not blank:
@@ -282,15 +305,19 @@ def search(
         "query": search_query,
         "url": search_url,
         "items": search_items,
-        "key": session_key,
         "name": str(name),
-        "ids": unit_ids,
-        "ttl": int(time.monotonic()) + 86400,
     }
     if use_cache:
-        request.session[session_key] = store_result
+        if stored_result is None:
+            store_search_result(cache_key, store_result, unit_ids)
+        request.session[session_key] = {
+            "cache": cache_key,
+            "ttl": int(time.monotonic()) + SEARCH_CACHE_TIMEOUT,
+        }
 
     search_result.update(store_result)
+    search_result["key"] = session_key
+    search_result["ids"] = unit_ids
     return search_result
 
 
@@ -845,18 +872,25 @@ def get_zen_unitdata(obj, project, unit_set, request):
     offset = search_result["offset"] - 1
     search_result["last_section"] = offset + 20 >= len(search_result["ids"])
 
-    units = unit_set.prefetch_full().get_ordered(
-        search_result["ids"][offset : offset + 20]
+    units = (
+        unit_set.prefetch()
+        .prefetch_full()
+        .get_ordered(search_result["ids"][offset : offset + 20])
+    )
+
+    # Fetch related data for all units at once
+    show_secondary = (
+        request.user.is_authenticated and request.user.profile.secondary_in_zen
     )
+    if show_secondary:
+        prefetch_secondary_units(units, request.user)
+    prefetch_glossary_terms(units)
 
     unitdata = [
         {
             "unit": unit,
             "secondary": (
-                unit.get_secondary_units(request.user)
-                if request.user.is_authenticated
-                and request.user.profile.secondary_in_zen
-                else None
+                unit.get_secondary_units(request.user) if show_secondary else None
             ),
             "form": ZenTranslationForm(
                 request.user, unit, tabindex=100 + (unit.position * 10)
@@ -35,7 +35,7 @@ from django.views.decorators.http import require_POST
 
 from weblate.logger import LOGGER
 from weblate.trans.models import Change, Component
-from weblate.trans.tasks import perform_update
+from weblate.trans.tasks import schedule_hook_update
 from weblate.utils.errors import report_error
 from weblate.utils.views import get_component, get_project
 
@@ -109,7 +109,7 @@ def update_component(request, project, component):
     obj = get_component(request, project, component, True)
     if not obj.project.enable_hooks:
         return HttpResponseNotAllowed([])
-    perform_update.delay("Component", obj.pk)
+    schedule_hook_update("Component", obj.pk)
     return hook_response()
 
 
@@ -121,7 +121,7 @@ def update_project(request, project):
     obj = get_project(request, project, True)
     if not obj.enable_hooks:
         return HttpResponseNotAllowed([])
-    perform_update.delay("Project", obj.pk)
+    schedule_hook_update("Project", obj.pk)
     return hook_response()
 
 
@@ -229,7 +229,7 @@ def vcs_service_hook(request, service):
         Change.objects.create(
             component=obj, action=Change.ACTION_HOOK, details=service_data
         )
-        perform_update.delay("Component", obj.pk)
+        schedule_hook_update("Component", obj.pk)
 
     match_status = {
         "repository_matches": repo_components_count,
@@ -27,6 +27,7 @@ from django.views.decorators.http import require_POST
 from weblate.checks.flags import Flags
 from weblate.checks.models import Check
 from weblate.trans.models import Change, Unit
+from weblate.trans.models.component import prefetch_repo_status
 from weblate.trans.util import sort_unicode
 from weblate.utils.views import get_component, get_project, get_translation
 
@@ -103,6 +104,7 @@ def git_status_shared(request, obj, repositories):
         raise PermissionDenied()
 
     changes = obj.change_set.filter(action__in=Change.ACTIONS_REPOSITORY).order()[:10]
+    prefetch_repo_status(repositories)
 
     return render(
         request,
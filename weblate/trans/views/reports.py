@@ -18,7 +18,11 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from collections import defaultdict
+
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
 from django.http import HttpResponse, JsonResponse
 from django.utils.html import conditional_escape, format_html, format_html_join
 from django.views.decorators.http import require_POST
@@ -53,13 +57,23 @@ def generate_credits(user, start_date, end_date, **kwargs):
     if user:
         base = base.filter(author=user)
 
-    for language in Language.objects.filter(**kwargs).distinct().iterator():
-        authors = base.filter(language=language, **kwargs).authors_list(
-            (start_date, end_date)
+    # Count changes for all languages in a single query
+    authors = defaultdict(list)
+    for language, *author in (
+        base.filter(**kwargs)
+        .exclude(author__isnull=True)
+        .filter(timestamp__range=(start_date, end_date))
+        .values("language", "author")
+        .annotate(change_count=Count("id"))
+        .values_list("language", "author__email", "author__full_name", "change_count")
+        .order_by()
+    ):
+        authors[language].append(tuple(author))
+
+    for language in Language.objects.filter(pk__in=authors.keys()).iterator():
+        result.append(
+            {language.name: sorted(authors[language.pk], key=lambda item: item[2])}
         )
-        if not authors:
-            continue
-        result.append({language.name: sorted(authors, key=lambda item: item[2])})
 
     return result
 
@@ -171,6 +185,13 @@ COUNT_DEFAULTS = {
 }
 
 
+def update_counts(current, suffix, values):
+    """Add values to the totals and to the action specific counts."""
+    for key, value in values.items():
+        current[key] += value
+        current[f"{key}_{suffix}"] += value
+
+
 def generate_counts(user, start_date, end_date, **kwargs):
     """Generate credits data for given component."""
     result = {}
@@ -182,39 +203,69 @@ def generate_counts(user, start_date, end_date, **kwargs):
     else:
         base = base.filter(author__isnull=False)
 
-    changes = base.filter(
-        timestamp__range=(start_date, end_date), **kwargs
-    ).prefetch_related("author", "unit")
-    for change in changes:
-        email = change.author.email
+    base = base.filter(timestamp__range=(start_date, end_date), **kwargs)
 
+    def get_current(email, name):
         if email not in result:
-            result[email] = current = {"name": change.author.full_name, "email": email}
+            result[email] = current = {"name": name, "email": email}
             current.update(COUNT_DEFAULTS)
-        else:
-            current = result[email]
-
-        src_chars = len(change.unit.source)
-        src_words = change.unit.num_words
-        tgt_chars = len(change.target)
-        tgt_words = len(change.target.split())
-        edits = change.get_distance()
-
-        current["chars"] += src_chars
-        current["words"] += src_words
-        current["t_chars"] += tgt_chars
-        current["t_words"] += tgt_words
-        current["edits"] += edits
-        current["count"] += 1
-
-        suffix = action_map.get(change.action, "edit")
-
-        current["t_chars_" + suffix] += tgt_chars
-        current["t_words_" + suffix] += tgt_words
-        current["chars_" + suffix] += src_chars
-        current["words_" + suffix] += src_words
-        current["edits_" + suffix] += edits
-        current["count_" + suffix] += 1
+            return current
+        return result[email]
+
+    # Aggregate changes with precalculated values in the database
+    aggregated = (
+        base.filter(edit_distance__isnull=False)
+        .values("author", "action")
+        .annotate(
+            count=Count("id"),
+            edits=Sum("edit_distance"),
+            chars=Sum(Length("unit__source")),
+            words=Sum("unit__num_words"),
+            t_chars=Sum(Length("target")),
+            t_words=Sum("target_words"),
+        )
+        .values_list(
+            "author__email",
+            "author__full_name",
+            "action",
+            "count",
+            "edits",
+            "chars",
+            "words",
+            "t_chars",
+            "t_words",
+        )
+        .order_by()
+    )
+    for email, name, action, count, edits, chars, words, t_chars, t_words in aggregated:
+        update_counts(
+            get_current(email, name),
+            action_map.get(action, "edit"),
+            {
+                "count": count,
+                "edits": edits,
+                "chars": chars,
+                "words": words,
+                "t_chars": t_chars,
+                "t_words": t_words,
+            },
+        )
+
+    # Older changes need to be processed one by one
+    changes = base.filter(edit_distance__isnull=True).prefetch_related("author", "unit")
+    for change in changes:
+        update_counts(
+            get_current(change.author.email, change.author.full_name),
+            action_map.get(change.action, "edit"),
+            {
+                "count": 1,
+                "edits": change.get_distance(),
+                "chars": len(change.unit.source),
+                "words": change.unit.num_words,
+                "t_chars": len(change.target),
+                "t_words": len(change.target.split()),
+            },
+        )
 
     return list(result.values())
 
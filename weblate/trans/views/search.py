@@ -214,7 +214,9 @@ def search(request, project=None, component=None, lang=None):
             units = units.filter(translation__language=context["language"])
 
         units = get_paginator(
-            request, units.order_by_request(search_form.cleaned_data, obj)
+            request,
+            units.order_by_request(search_form.cleaned_data, obj),
+            estimate=True,
         )
         # Rebuild context from scratch here to get new form
         context.update(
@@ -28,7 +28,7 @@ from weblate.lang.models import Language
 from weblate.trans.forms import EngageForm
 from weblate.trans.models import Component
 from weblate.trans.util import render
-from weblate.trans.widgets import WIDGETS, SiteOpenGraphWidget
+from weblate.trans.widgets import WIDGETS, SiteOpenGraphWidget, WidgetCache
 from weblate.utils.site import get_site_url
 from weblate.utils.stats import ProjectLanguage
 from weblate.utils.views import get_component, get_project, try_set_language
@@ -136,20 +136,18 @@ def render_widget(
     except KeyError:
         raise Http404()
 
-    # Construct object
-    widget_obj = widget_class(obj, color, lang)
-
     # Redirect widget
-    if hasattr(widget_obj, "redirect"):
-        return redirect(widget_obj.redirect(), permanent=True)
+    if hasattr(widget_class, "redirect"):
+        return redirect(widget_class(obj, color, lang).redirect(), permanent=True)
 
     # Invalid extension
-    if extension != widget_obj.extension or color != widget_obj.color:
+    widget_color = widget_class.get_color_name(color)
+    if extension != widget_class.extension or color != widget_color:
         kwargs = {
             "project": project,
             "widget": widget,
-            "color": widget_obj.color,
-            "extension": widget_obj.extension,
+            "color": widget_color,
+            "extension": widget_class.extension,
         }
         if lang:
             kwargs["lang"] = lang.code
@@ -157,9 +155,7 @@ def render_widget(
         return redirect("widget-image", permanent=True, **kwargs)
 
     # Render widget
-    response = HttpResponse(content_type=widget_obj.content_type)
-    widget_obj.render(response)
-    return response
+    return WidgetCache(widget_class, obj, color, lang).get_response(request)
 
 
 @vary_on_cookie
@@ -17,25 +17,41 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import os.path
-from typing import Tuple
+import os
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Optional, Tuple
 
 import cairo
 import gi
 from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
 from django.utils.html import format_html
+from django.utils.http import http_date, quote_etag
 from django.utils.translation import get_language
 from django.utils.translation import gettext as _
-from django.utils.translation import gettext_lazy, npgettext, pgettext, pgettext_lazy
+from django.utils.translation import (
+    gettext_lazy,
+    npgettext,
+    override,
+    pgettext,
+    pgettext_lazy,
+)
 
 from weblate.fonts.utils import configure_fontconfig, render_size
-from weblate.trans.models import Project
+from weblate.lang.models import Language
+from weblate.trans.models import Component, Project
 from weblate.trans.templatetags.translations import number_format
 from weblate.trans.util import sort_unicode
+from weblate.utils.data import data_dir
+from weblate.utils.hash import calculate_checksum
 from weblate.utils.site import get_site_url
-from weblate.utils.stats import GlobalStats
+from weblate.utils.stats import GlobalStats, ProjectLanguage
 from weblate.utils.views import get_percent_color
 
 gi.require_version("PangoCairo", "1.0")
@@ -53,6 +69,13 @@ COLOR_DATA = {
 WIDGETS = {}
 WIDGET_FONT = "Source Sans 3"
 
+# Number of rendered widgets kept in the process memory
+WIDGET_MEMORY_SIZE = 256
+WIDGET_MEMORY: OrderedDict = OrderedDict()
+WIDGET_MEMORY_LOCK = threading.Lock()
+# Lifetime of rendered widgets on the disk and of their metadata in the cache
+WIDGET_CACHE_TIMEOUT = 30 * 86400
+
 
 def register_widget(widget):
     """Register widget in dictionary."""
@@ -78,10 +101,11 @@ class Widget:
         self.color = self.get_color_name(color)
         self.lang = lang
 
-    def get_color_name(self, color):
+    @classmethod
+    def get_color_name(cls, color):
         """Return color name based on allowed ones."""
-        if color not in self.colors:
-            return self.colors[0]
+        if color not in cls.colors:
+            return cls.colors[0]
         return color
 
 
@@ -518,3 +542,170 @@ class HorizontalMultiLanguageWidget(MultiLanguageWidget):
     order = 82
     template_name = "svg/multi-language-badge-horizontal.svg"
     verbose = pgettext_lazy("Status widget name", "Horizontal language bar chart")
+
+
+class WidgetCache:
+    """Cache of rendered widgets.
+
+    The rendered widgets are stored on the disk with metadata in the cache
+    and the most used ones are kept in the process memory. The cache is keyed
+    by the stats revision and outdated widgets are served while being
+    regenerated in the background, so that serving a widget does not need
+    to calculate stats or render it.
+    """
+
+    def __init__(
+        self,
+        widget_class,
+        obj,
+        color: str,
+        lang: Optional[Language],
+        language: Optional[str] = None,
+    ):
+        self.widget_class = widget_class
+        self.obj = obj
+        self.color = color
+        self.lang = lang
+        self.language = language or get_language()
+        self.key = calculate_checksum(
+            widget_class.name,
+            color,
+            obj.cache_key,
+            lang.code if lang else "",
+            self.language,
+        )
+        self.cache_key = f"widget-{self.key}"
+        self.filename = data_dir(
+            "cache", "widgets", f"{self.key}.{widget_class.extension}"
+        )
+
+    @classmethod
+    def from_params(
+        cls,
+        widget: str,
+        color: str,
+        kind: str,
+        pk: int,
+        obj_code: Optional[str],
+        lang_code: Optional[str],
+        language: str,
+    ):
+        """Recreate cache from parameters used in the background task."""
+        if kind == "component":
+            obj = Component.objects.get(pk=pk)
+        elif kind == "project-language":
+            obj = ProjectLanguage(
+                Project.objects.get(pk=pk), Language.objects.get(code=obj_code)
+            )
+        else:
+            obj = Project.objects.get(pk=pk)
+        lang = Language.objects.get(code=lang_code) if lang_code else None
+        return cls(WIDGETS[widget], obj, color, lang, language)
+
+    def get_params(self):
+        if isinstance(self.obj, ProjectLanguage):
+            kind, pk, obj_code = (
+                "project-language",
+                self.obj.project.pk,
+                self.obj.language.code,
+            )
+        elif isinstance(self.obj, Component):
+            kind, pk, obj_code = "component", self.obj.pk, None
+        else:
+            kind, pk, obj_code = "project", self.obj.pk, None
+        return (
+            self.widget_class.name,
+            self.color,
+            kind,
+            pk,
+            obj_code,
+            self.lang.code if self.lang else None,
+            self.language,
+        )
+
+    @staticmethod
+    def cleanup(cutoff: float):
+        """Remove rendered widgets which were not updated since cutoff."""
+        dirname = data_dir("cache", "widgets")
+        if not os.path.isdir(dirname):
+            return
+        with os.scandir(dirname) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    # Replaced or removed concurrently
+                    continue
+
+    def get_revision(self):
+        """Return revision of the stats without calculating them."""
+        return self.obj.stats.load().get("revision")
+
+    def remember(self, data, content: bytes):
+        with WIDGET_MEMORY_LOCK:
+            WIDGET_MEMORY[self.key] = (data, content)
+            WIDGET_MEMORY.move_to_end(self.key)
+            while len(WIDGET_MEMORY) > WIDGET_MEMORY_SIZE:
+                WIDGET_MEMORY.popitem(last=False)
+        return data, content
+
+    def load(self):
+        """Load rendered widget from the disk."""
+        data = cache.get(self.cache_key)
+        if data is None:
+            return None
+        try:
+            with open(self.filename, "rb") as handle:
+                content = handle.read()
+        except FileNotFoundError:
+            return None
+        return self.remember(data, content)
+
+    def update(self):
+        """Render widget and store it."""
+        with override(self.language):
+            response = HttpResponse()
+            self.widget_class(self.obj, self.color, self.lang).render(response)
+        # Make sure stats revision exists for language specific widgets
+        self.obj.stats.ensure_basic()
+        data = {"revision": self.get_revision(), "modified": int(time())}
+
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        temp_name = f"{self.filename}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_name, "wb") as handle:
+            handle.write(response.content)
+        os.replace(temp_name, self.filename)
+        cache.set(self.cache_key, data, WIDGET_CACHE_TIMEOUT)
+        cache.delete(f"{self.cache_key}-update")
+        return self.remember(data, response.content)
+
+    def get(self):
+        """Return metadata and content of the rendered widget."""
+        from weblate.trans.tasks import update_widget_cache
+
+        revision = self.get_revision()
+        with WIDGET_MEMORY_LOCK:
+            cached = WIDGET_MEMORY.get(self.key)
+        if cached is None or cached[0]["revision"] != revision:
+            # Might have been updated by other process
+            cached = self.load() or cached
+        if cached is None:
+            return self.update()
+        if cached[0]["revision"] != revision and cache.add(
+            f"{self.cache_key}-update", 1, 300
+        ):
+            update_widget_cache.delay(*self.get_params())
+        return cached
+
+    def get_response(self, request):
+        data, content = self.get()
+        response = HttpResponse(content, content_type=self.widget_class.content_type)
+        response["ETag"] = quote_etag(f"{self.key}-{data['revision']}")
+        response["Last-Modified"] = http_date(data["modified"])
+        return get_conditional_response(
+            request,
+            etag=response["ETag"],
+            last_modified=data["modified"],
+            response=response,
+        )
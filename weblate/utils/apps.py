@@ -41,6 +41,7 @@ from weblate.utils.errors import init_error_collection
 
 from .db import (
     MySQLSearchLookup,
+    PostgreSQLFulltextLookup,
     PostgreSQLILikeLookup,
     PostgreSQLSearchLookup,
     PostgreSQLSubstringLookup,
@@ -71,6 +72,7 @@ class UtilsConfig(AppConfig):
 
         if using_postgresql():
             lookups = (
+                (PostgreSQLFulltextLookup,),
                 (PostgreSQLILikeLookup,),
                 (PostgreSQLSearchLookup,),
                 (PostgreSQLSubstringLookup,),
@@ -69,6 +69,10 @@ def tag_cache_dirs():
     dirs = [
         # Fontconfig cache
         data_dir("cache", "fonts"),
+        # Rendered widgets
+        data_dir("cache", "widgets"),
+        # Glossary automatons
+        data_dir("cache", "glossary"),
         # Static files (default is inside data)
         settings.STATIC_ROOT,
         # Project backups
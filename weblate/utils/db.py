@@ -18,7 +18,9 @@
 #
 """Database specific code to extend Django."""
 
-from django.db import connection, models
+import json
+
+from django.db import connection, connections, models
 from django.db.models import Case, IntegerField, Sum, When
 from django.db.models.lookups import PatternLookup
 
@@ -27,6 +29,12 @@ ESCAPED = frozenset(".\\+*?[^]$(){}=!<>|:-")
 PG_TRGM = "CREATE INDEX {0}_{1}_fulltext ON trans_{0} USING GIN ({1} gin_trgm_ops {2})"
 PG_DROP = "DROP INDEX {0}_{1}_fulltext"
 
+PG_TSVECTOR = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {0}_{1}_tsvector ON trans_{0} "
+    "USING GIN (to_tsvector('simple'::regconfig, {1}))"
+)
+PG_TSVECTOR_DROP = "DROP INDEX CONCURRENTLY IF EXISTS {0}_{1}_tsvector"
+
 MY_FTX = "CREATE FULLTEXT INDEX {0}_{1}_fulltext ON trans_{0}({1})"
 MY_DROP = "ALTER TABLE trans_{0} DROP INDEX {0}_{1}_fulltext"
 
@@ -61,6 +69,26 @@ def adjust_similarity_threshold(value: float):
             connection.weblate_similarity = value
 
 
+def estimate_count(queryset, threshold: int = 1000) -> int:
+    """
+    Estimates number of rows in a queryset.
+
+    The PostgreSQL planner estimate is used for big results to avoid expensive
+    COUNT(*), the exact count is used for small results and on other databases.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+        if estimate >= threshold:
+            return estimate
+    return queryset.count()
+
+
 class PostgreSQLSearchLookup(PatternLookup):
     lookup_name = "search"
     param_pattern = "%s"
@@ -82,6 +110,27 @@ class MySQLSearchLookup(models.Lookup):
         return f"MATCH ({lhs}) AGAINST ({rhs} IN NATURAL LANGUAGE MODE)", params
 
 
+class PostgreSQLFulltextLookup(models.Lookup):
+    """
+    Full-text word lookup.
+
+    The expression matches the GIN index created using PG_TSVECTOR, the
+    right hand side is expected to be a tsquery string.
+    """
+
+    lookup_name = "fulltext"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        params = lhs_params + rhs_params
+        return (
+            f"to_tsvector('simple'::regconfig, {lhs}) @@ "
+            f"to_tsquery('simple'::regconfig, {rhs})",
+            params,
+        )
+
+
 class PostgreSQLSubstringLookup(PatternLookup):
     """
     Case insensitive substring lookup.
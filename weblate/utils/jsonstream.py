@@ -0,0 +1,118 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Incremental parsing of large JSON documents.
+
+Only the listed arrays are streamed item by item, all other values are
+parsed as whole. This allows processing huge documents with memory usage
+bounded by the largest item.
+"""
+
+import json
+from codecs import getincrementaldecoder
+from typing import Any, Iterator, Tuple
+
+# Size of data read at once
+CHUNK_SIZE = 65536
+
+
+class JSONStreamParser:
+    def __init__(self, handle):
+        self.handle = handle
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.offset = 0
+        self.eof = False
+
+    def read(self) -> bool:
+        """Read more data into the buffer, returns False on end of file."""
+        if self.eof:
+            return False
+        data = self.handle.read(CHUNK_SIZE)
+        self.eof = not data
+        self.buffer = self.buffer[self.offset :] + self.text_decoder.decode(
+            data, final=self.eof
+        )
+        self.offset = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """Return next non whitespace character without consuming it."""
+        while True:
+            while self.offset < len(self.buffer) and self.buffer[self.offset].isspace():
+                self.offset += 1
+            if self.offset < len(self.buffer):
+                return self.buffer[self.offset]
+            if not self.read():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} at offset {self.offset}, got {char!r}"
+            )
+        self.offset += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.offset)
+            except json.JSONDecodeError:
+                if not self.read():
+                    raise
+                continue
+            # Numbers might continue in data not yet read
+            if end == len(self.buffer) and self.read():
+                continue
+            self.offset = end
+            return value
+
+    def iterate_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.offset += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+    def iterate_object(self, streamed: Tuple[str, ...] = ()) -> Iterator[Tuple]:
+        """Iterate over key, value pairs of an object.
+
+        Items of arrays listed in streamed are yielded as individual pairs.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.offset += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key in streamed:
+                for item in self.iterate_array():
+                    yield key, item
+            else:
+                yield key, self.value()
+            if self.expect(",}") == "}":
+                return
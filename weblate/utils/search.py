@@ -18,13 +18,17 @@
 #
 
 import re
+from collections import Counter
 from datetime import datetime
 from functools import lru_cache, reduce
 from itertools import chain
-from typing import Dict
+from typing import Dict, List
 
 from dateutil.parser import ParserError, parse
-from django.db.models import Q
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.constants import LOOKUP_SEP
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from pyparsing import (
@@ -40,6 +44,7 @@ from rapidfuzz.distance import DamerauLevenshtein
 
 from weblate.checks.parser import RawQuotedString
 from weblate.trans.util import PLURAL_SEPARATOR
+from weblate.utils.classloader import load_class
 from weblate.utils.db import re_escape, using_postgresql
 from weblate.utils.state import (
     STATE_APPROVED,
@@ -61,6 +66,43 @@ class Comparer:
         return int(100 * DamerauLevenshtein.normalized_similarity(first, second))
 
 
+class DatabaseBackend:
+    """Search backend matching plain text terms in the database."""
+
+    def plain_query(self, field: str, match: str):
+        """Returns query for plain text term in given field."""
+        return Q(**{f"{field}__substring": match})
+
+
+class FulltextBackend(DatabaseBackend):
+    """Search backend using full-text index for plain text terms.
+
+    On PostgreSQL the terms are matched as word prefixes using the tsvector
+    GIN index, other fields and terms not containing any word are matched
+    in the database.
+    """
+
+    indexed_fields = {"source", "target", "context"}
+    word_re = re.compile(r"\w+")
+
+    def plain_query(self, field: str, match: str):
+        if (
+            field not in self.indexed_fields
+            or not isinstance(match, str)
+            or not using_postgresql()
+        ):
+            return super().plain_query(field, match)
+        words = self.word_re.findall(match)
+        if not words:
+            return super().plain_query(field, match)
+        return Q(**{f"{field}__fulltext": " & ".join(f"{word}:*" for word in words)})
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    return load_class(settings.SEARCH_BACKEND, "SEARCH_BACKEND")()
+
+
 # Field type definitions
 PLAIN_FIELDS = ("source", "target", "context", "note", "location")
 NONTEXT_FIELDS = {
@@ -408,12 +450,21 @@ class TermExpr:
         match = self.match
         # Simple term based search
         if not field:
+            backend = get_search_backend()
             return (
-                Q(source__substring=self.match)
-                | Q(target__substring=self.match)
-                | Q(context__substring=self.match)
+                backend.plain_query("source", match)
+                | backend.plain_query("target", match)
+                | backend.plain_query("context", match)
             )
 
+        # Plain text fields can be handled by the search backend
+        if (
+            field in PLAIN_FIELDS
+            and self.operator == ":"
+            and not isinstance(match, RegexExpr)
+        ):
+            return get_search_backend().plain_query(field, match)
+
         # Field specific code
         field_method = getattr(self, f"{field}_field", None)
         if field_method is not None:
@@ -481,6 +532,147 @@ def parser_to_query(obj, context: Dict):
     return reduce(lambda x, y: x | y, expressions)
 
 
+class QueryPlanner:
+    """Rewrites parsed query for efficient execution.
+
+    Filters on multi-valued relations are turned into EXISTS subqueries, so
+    that the joins do not multiply the rows and no DISTINCT is needed. Cheap
+    predicates are placed first in the AND expressions.
+    """
+
+    # Lookups which can not use a plain index
+    text_lookups = {
+        "substring",
+        "fulltext",
+        "search",
+        "regex",
+        "iregex",
+        "contains",
+        "icontains",
+        "iexact",
+        "ilike",
+    }
+
+    def __init__(self, model, context: Dict):
+        self.model = model
+        self.context = context
+        self.needs_distinct = False
+        self.shared = set()
+
+    def get_relation(self, lookup: str):
+        """Splits lookup on the first multi-valued relation.
+
+        Returns tuple of path to the relation, the relation field and the
+        remaining lookup or None if no multi-valued relation is used.
+        """
+        opts = self.model._meta
+        parts = lookup.split(LOOKUP_SEP)
+        for pos, part in enumerate(parts):
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.many_to_many or field.one_to_many:
+                return (
+                    LOOKUP_SEP.join(parts[:pos]),
+                    field,
+                    LOOKUP_SEP.join(parts[pos + 1 :]),
+                )
+            if not field.is_relation:
+                return None
+            opts = field.related_model._meta
+        return None
+
+    def get_exists(self, path: str, field, lookups: List):
+        """Creates EXISTS subquery for lookups on the relation."""
+        if field.auto_created and not field.concrete:
+            # Reverse foreign key or many to many
+            link = field.field.name
+        else:
+            link = field.related_query_name()
+        negate = False
+        filters = [Q(**{link: OuterRef(path or "pk")})]
+        for lookup, value in lookups:
+            if lookup == "isnull":
+                if len(lookups) > 1 and value:
+                    return None
+                negate = value
+            else:
+                filters.append(Q(**{lookup or "pk": value}))
+        result = Exists(field.related_model._default_manager.filter(*filters))
+        if negate:
+            return ~result
+        return result
+
+    def rewrite(self, query: Q) -> Q:
+        """Rewrites filters on multi-valued relations in the query."""
+        result = Q(_connector=query.connector, _negated=query.negated)
+        groups = {}
+        for child in query.children:
+            if isinstance(child, Q):
+                result.children.append(self.rewrite(child))
+                continue
+            relation = self.get_relation(child[0]) if isinstance(child, tuple) else None
+            if relation is None:
+                result.children.append(child)
+                continue
+            path, field, lookup = relation
+            if (path, field) in self.shared:
+                # Conditions in other parts of the query have to match the
+                # same row, keep the join
+                self.needs_distinct = True
+                result.children.append(child)
+                continue
+            if query.connector == Q.AND:
+                # Conditions joined by AND have to match the same row
+                groups.setdefault((path, field), []).append((lookup, child[1]))
+                continue
+            result.children.append(self.get_exists(path, field, [(lookup, child[1])]))
+        for (path, field), lookups in groups.items():
+            exists = self.get_exists(path, field, lookups)
+            if exists is None:
+                self.needs_distinct = True
+                result.children.extend(
+                    (LOOKUP_SEP.join(filter(None, (path, field.name, lookup))), value)
+                    for lookup, value in lookups
+                )
+            else:
+                result.children.append(exists)
+        result.children.sort(key=self.get_cost)
+        return result
+
+    def collect_relations(self, query: Q, counts: Counter):
+        """Counts query nodes with lookups on each multi-valued relation."""
+        relations = set()
+        for child in query.children:
+            if isinstance(child, Q):
+                self.collect_relations(child, counts)
+                continue
+            relation = self.get_relation(child[0]) if isinstance(child, tuple) else None
+            if relation is not None:
+                relations.add(relation[:2])
+        counts.update(relations)
+
+    def get_cost(self, node) -> int:
+        """Estimates cost of evaluating query node."""
+        if isinstance(node, Q):
+            return max((self.get_cost(child) for child in node.children), default=0)
+        if isinstance(node, tuple):
+            if node[0].rsplit(LOOKUP_SEP, 1)[-1] in self.text_lookups:
+                return 1
+            return 0
+        return 2
+
+    def plan(self, obj) -> Q:
+        query = parser_to_query(obj, self.context)
+        # Relations used in several nodes are kept as joins, the conditions
+        # on them have to match the same row as in the non planned query
+        counts = Counter()
+        self.collect_relations(query, counts)
+        self.shared = {relation for relation, count in counts.items() if count > 1}
+        return self.rewrite(query)
+
+
 @lru_cache(maxsize=512)
 def parse_string(text):
     if "\x00" in text:
@@ -491,3 +683,13 @@ def parse_string(text):
 def parse_query(text, **context):
     parsed = parse_string(text)
     return parser_to_query(parsed, context)
+
+
+def plan_query(text, model, **context):
+    """Parses query and plans it for execution on a model.
+
+    Returns tuple of query and flag whether DISTINCT is needed.
+    """
+    planner = QueryPlanner(model, context)
+    query = planner.plan(parse_string(text))
+    return query, planner.needs_distinct
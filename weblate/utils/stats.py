@@ -263,6 +263,8 @@ class BaseStats:
             op="stats", description=f"PREFETCH {self.cache_key}"
         ):
             self._prefetch_basic()
+        # Identifies calculated stats, used to detect outdated rendered widgets
+        self.store("revision", uuid4().hex)
 
     def _prefetch_basic(self):
         raise NotImplementedError()
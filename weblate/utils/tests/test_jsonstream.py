@@ -0,0 +1,71 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import json
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from weblate.utils.jsonstream import JSONStreamParser
+
+DATA = {
+    "component": {"name": "Test ]", "value": 12345},
+    "units": [{"source": "Hello"}, {"source": "Čeština"}, []],
+    "screenshots": [],
+    "count": 1234567890,
+}
+
+
+class JSONStreamTest(SimpleTestCase):
+    def parse(self, data, **kwargs):
+        parser = JSONStreamParser(BytesIO(json.dumps(data, **kwargs).encode()))
+        return list(parser.iterate_object(("units",)))
+
+    def test_object(self):
+        expected = [
+            ("component", DATA["component"]),
+            ("units", {"source": "Hello"}),
+            ("units", {"source": "Čeština"}),
+            ("units", []),
+            ("screenshots", []),
+            ("count", 1234567890),
+        ]
+        self.assertEqual(self.parse(DATA), expected)
+        self.assertEqual(self.parse(DATA, indent=2, ensure_ascii=False), expected)
+
+    def test_chunks(self):
+        # Force reading data in small chunks, splitting strings and numbers
+        with mock.patch("weblate.utils.jsonstream.CHUNK_SIZE", 3):
+            self.test_object()
+
+    def test_empty(self):
+        self.assertEqual(self.parse({}), [])
+        self.assertEqual(self.parse({"units": []}), [])
+
+    def test_array(self):
+        parser = JSONStreamParser(BytesIO(b"[1, 2, 3]"))
+        self.assertEqual(list(parser.iterate_array()), [1, 2, 3])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.parse([])
+        with self.assertRaises(ValueError):
+            list(JSONStreamParser(BytesIO(b'{"units": [1, 2')).iterate_object())
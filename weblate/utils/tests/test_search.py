@@ -25,9 +25,10 @@ from pytz import utc
 
 from weblate.trans.models import Change, Unit
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.trans.tests.utils import create_another_user
 from weblate.trans.util import PLURAL_SEPARATOR
 from weblate.utils.db import using_postgresql
-from weblate.utils.search import Comparer, parse_query
+from weblate.utils.search import Comparer, FulltextBackend, parse_query, plan_query
 from weblate.utils.state import (
     STATE_APPROVED,
     STATE_EMPTY,
@@ -50,6 +51,60 @@ class ComparerTest(SimpleTestCase):
         self.assertEqual(Comparer().similarity("NICHOLASŸ", "NICHOLAS"), 88)
 
 
+class SearchBackendTest(TestCase):
+    def test_fulltext(self):
+        backend = FulltextBackend()
+        query = backend.plain_query("source", "hello world")
+        if using_postgresql():
+            self.assertEqual(query, Q(source__fulltext="hello:* & world:*"))
+        else:
+            self.assertEqual(query, Q(source__substring="hello world"))
+        self.assertFalse(Unit.objects.filter(query).exists())
+        self.assertEqual(
+            backend.plain_query("note", "hello"), Q(note__substring="hello")
+        )
+        self.assertEqual(
+            backend.plain_query("source", "..."), Q(source__substring="...")
+        )
+
+
+class QueryPlannerTest(TestCase):
+    def assert_plan(self, string, exists=False):
+        query, needs_distinct = plan_query(string, Unit)
+        self.assertFalse(needs_distinct)
+        self.assertEqual(Unit.objects.filter(query).exists(), exists)
+        # Compare with the non planned query
+        self.assertEqual(
+            set(Unit.objects.filter(query).values_list("pk", flat=True)),
+            set(Unit.objects.filter(parse_query(string)).values_list("pk", flat=True)),
+        )
+
+    def test_relations(self):
+        self.assert_plan("has:suggestion")
+        self.assert_plan("NOT has:suggestion")
+        self.assert_plan("has:label")
+        self.assert_plan("has:screenshot")
+        self.assert_plan("check:same AND state:>=translated")
+        self.assert_plan("changed:>=2020-01-01 AND changed_by:nijel")
+
+    def test_same_row(self):
+        # Sibling terms on the same relation are evaluated on the same row
+        query, needs_distinct = plan_query(
+            "changed:>=2020-01-01 AND changed_by:nijel", Unit
+        )
+        self.assertFalse(needs_distinct)
+        self.assertEqual(len(query.children), 1)
+        # Relation used in nested expressions keeps the join
+        query, needs_distinct = plan_query(
+            "changed:>=2020-01-01 AND (changed_by:nijel OR state:translated)", Unit
+        )
+        self.assertTrue(needs_distinct)
+
+    def test_order(self):
+        query, needs_distinct = plan_query("has:suggestion AND state:translated", Unit)
+        self.assertEqual(query.children[0], ("state__gte", STATE_TRANSLATED))
+
+
 class SearchMixin:
     def assert_query(self, string, expected, exists=False, **context):
         result = parse_query(string, **context)
@@ -443,3 +498,26 @@ class SearchTest(ViewTestCase, SearchMixin):
             True,
             project=self.project,
         )
+
+    def test_planned_same_change(self):
+        unit = self.get_unit()
+        other = create_another_user()
+        for user, year in ((other, 2021), (self.user, 2019)):
+            change = Change.objects.create(
+                unit=unit, action=Change.ACTION_CHANGE, author=user
+            )
+            Change.objects.filter(pk=change.pk).update(
+                timestamp=datetime(year, 6, 1, tzinfo=utc)
+            )
+
+        def search(query):
+            return Unit.objects.search(query).filter(pk=unit.pk).exists()
+
+        # Each condition is matched by a different change
+        self.assertTrue(search("changed:>=2020-01-01"))
+        self.assertTrue(search("changed_by:testuser"))
+        self.assertFalse(search("changed:>=2020-01-01 AND changed_by:testuser"))
+        self.assertFalse(
+            search("changed:>=2020-01-01 AND (changed_by:testuser OR changed_by:x)")
+        )
+        self.assertTrue(search("changed:>=2020-01-01 AND changed_by:jane"))
@@ -19,10 +19,12 @@
 
 
 from unittest import TestCase
+from unittest.mock import patch
 
+from django.core.paginator import EmptyPage
 from django.http import HttpRequest
 
-from weblate.utils.views import get_page_limit
+from weblate.utils.views import EstimatedPaginator, get_page_limit
 
 
 def fake_request(page, limit):
@@ -41,3 +43,28 @@ class PageLimitTest(TestCase):
 
     def test_valid(self):
         self.assertEqual((33, 66), get_page_limit(fake_request("33", "66"), 42))
+
+
+class EstimatedPaginatorTest(TestCase):
+    def get_page(self, estimate, number):
+        with patch("weblate.utils.views.estimate_count", return_value=estimate):
+            paginator = EstimatedPaginator(list(range(25)), 10)
+            return paginator.page(number)
+
+    def test_low_estimate(self):
+        page = self.get_page(5, 2)
+        self.assertEqual(list(page), list(range(10, 20)))
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.paginator.num_pages, 3)
+
+    def test_high_estimate(self):
+        page = self.get_page(1000, 3)
+        self.assertEqual(list(page), list(range(20, 25)))
+        self.assertFalse(page.has_next())
+        # The count is exact on the last page
+        self.assertEqual(page.paginator.count, 25)
+        self.assertEqual(page.paginator.num_pages, 3)
+
+    def test_empty(self):
+        with self.assertRaises(EmptyPage):
+            self.get_page(1000, 4)
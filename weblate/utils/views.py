@@ -24,9 +24,11 @@ from typing import Optional
 from zipfile import ZipFile
 
 from django.conf import settings
-from django.core.paginator import EmptyPage, Paginator
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import QuerySet
 from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django.utils.http import http_date
 from django.utils.translation import activate
 from django.utils.translation import gettext as _
@@ -37,6 +39,7 @@ from django.views.generic.edit import FormView
 from weblate.formats.models import EXPORTERS, FILE_FORMATS
 from weblate.trans.models import Component, Project, Translation
 from weblate.utils import messages
+from weblate.utils.db import estimate_count
 from weblate.utils.errors import report_error
 from weblate.vcs.git import LocalRepository
 
@@ -97,17 +100,73 @@ def sort_objects(object_list, sort_by: str):
     return sorted(object_list, key=key, reverse=reverse), sort_by
 
 
-def get_paginator(request, object_list, page_limit=None):
-    """Return paginator and current page."""
+class EstimatedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedPaginator(Paginator):
+    """Paginator using database estimate for counting big results.
+
+    The estimate is only displayed, the pages are validated by fetching one
+    more object than needed. The count is adjusted by what was fetched, so it
+    is exact on the last page.
+    """
+
+    estimated = True
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number):
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        has_next = len(objects) > self.per_page
+        if has_next:
+            count = max(self.count, bottom + len(objects))
+        else:
+            count = bottom + len(objects)
+        if count != self.count:
+            self.count = count
+            self.__dict__.pop("num_pages", None)
+        return EstimatedPage(objects[: self.per_page], number, self, has_next)
+
+
+def get_paginator(request, object_list, page_limit=None, estimate: bool = False):
+    """Return paginator and current page.
+
+    With estimate, the number of results is estimated for big querysets
+    instead of being counted.
+    """
     page, limit = get_page_limit(request, page_limit or settings.DEFAULT_PAGE_LIMIT)
     sort_by = request.GET.get("sort_by")
     if sort_by:
         object_list, sort_by = sort_objects(object_list, sort_by)
-    paginator = Paginator(object_list, limit)
+    if estimate and isinstance(object_list, QuerySet):
+        paginator = EstimatedPaginator(object_list, limit)
+    else:
+        paginator = Paginator(object_list, limit)
     paginator.sort_by = sort_by
     try:
         return paginator.page(page)
     except EmptyPage:
+        if isinstance(paginator, EstimatedPaginator):
+            # Exact count is needed to find the last page
+            paginator = Paginator(object_list, limit)
+            paginator.sort_by = sort_by
         return paginator.page(paginator.num_pages)
 
 
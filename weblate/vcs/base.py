@@ -24,7 +24,7 @@ import os
 import os.path
 import subprocess
 from datetime import datetime
-from typing import Iterator, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from dateutil import parser
 from django.core.cache import cache
@@ -287,6 +287,14 @@ class Repository:
             cls._clone(source, target, branch)
         return repo
 
+    @classmethod
+    def get_remote_heads(cls, repo: str) -> Optional[Dict[str, str]]:
+        """Return revisions of remote branches.
+
+        Returns None if this is not supported.
+        """
+        return None
+
     def update_remote(self):
         """Update remote repository."""
         raise NotImplementedError()
@@ -335,6 +343,13 @@ class Repository:
             )
         )
 
+    def get_status_revisions(self) -> Optional[Tuple[str, str]]:
+        """Return local and remote revisions without invoking VCS.
+
+        Returns None if this is not possible.
+        """
+        return None
+
     def needs_merge(self):
         """Check whether repository needs merge with upstream.
 
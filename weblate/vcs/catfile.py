@@ -0,0 +1,162 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Persistent git cat-file processes for reading repository objects.
+
+Spawning git for every file or revision read is expensive, so a long-living
+``git cat-file --batch`` process is kept for each repository and reused for
+reading objects. The processes are closed after being idle for a while.
+"""
+
+import atexit
+import os
+import subprocess
+import threading
+from time import monotonic
+from typing import Callable, Dict, Tuple
+
+from weblate.vcs.base import RepositoryException
+
+# Close processes which were not used for this time (in seconds)
+IDLE_TIMEOUT = 300
+
+# Maximal number of processes kept running
+POOL_SIZE = 32
+
+
+class CatFile:
+    """Wrapper around ``git cat-file --batch`` process."""
+
+    def __init__(self, path: str, env: Dict[str, str]):
+        self.path = path
+        self.identity = self.get_identity(path)
+        self.lock = threading.Lock()
+        self.last_used = monotonic()
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=path,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def get_identity(path: str) -> Tuple[int, int]:
+        """Identify repository directory to detect it being replaced."""
+        stat = os.stat(path)
+        return (stat.st_dev, stat.st_ino)
+
+    def is_valid(self) -> bool:
+        try:
+            return (
+                self.process.poll() is None
+                and self.get_identity(self.path) == self.identity
+            )
+        except OSError:
+            return False
+
+    def read(self, name: str) -> Tuple[str, str, bytes]:
+        """Read object by name, returns object ID, type and content."""
+        if "\n" in name:
+            raise RepositoryException(128, f"fatal: invalid object name {name!r}")
+        with self.lock:
+            self.last_used = monotonic()
+            try:
+                self.process.stdin.write(f"{name}\n".encode())
+                self.process.stdin.flush()
+                header = self.process.stdout.readline().decode()
+                if not header:
+                    raise OSError("git cat-file terminated")
+                if header.endswith((" missing\n", " ambiguous\n")):
+                    raise RepositoryException(
+                        128, f"fatal: invalid object name {name!r}"
+                    )
+                objectname, objecttype, size = header.split()
+                content = self.process.stdout.read(int(size))
+                # Skip newline terminating the object
+                self.process.stdout.read(1)
+            except (OSError, ValueError) as error:
+                self._close()
+                raise RepositoryException(0, f"Failed to read object: {error}")
+        return objectname, objecttype, content
+
+    def _close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+
+class CatFilePool:
+    """Pool of cat-file processes indexed by repository path."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processes: Dict[str, CatFile] = {}
+        self.pid = os.getpid()
+
+    def get(self, path: str, get_env: Callable[[], Dict[str, str]]) -> CatFile:
+        with self.lock:
+            if self.pid != os.getpid():
+                # The processes were inherited from the parent process
+                self.processes = {}
+                self.pid = os.getpid()
+            self.expire()
+            catfile = self.processes.get(path)
+            if catfile is not None and not catfile.is_valid():
+                self.remove(path)
+                catfile = None
+            if catfile is None:
+                if len(self.processes) >= POOL_SIZE:
+                    self.remove(
+                        min(
+                            self.processes,
+                            key=lambda key: self.processes[key].last_used,
+                        )
+                    )
+                catfile = self.processes[path] = CatFile(path, get_env())
+            return catfile
+
+    def remove(self, path: str):
+        self.processes.pop(path).close()
+
+    def expire(self):
+        """Close idle processes."""
+        threshold = monotonic() - IDLE_TIMEOUT
+        for path, catfile in list(self.processes.items()):
+            if catfile.last_used < threshold:
+                self.remove(path)
+
+    def close(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                for path in list(self.processes):
+                    self.remove(path)
+
+
+CAT_FILE_POOL = CatFilePool()
+
+atexit.register(CAT_FILE_POOL.close)
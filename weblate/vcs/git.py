@@ -24,7 +24,8 @@ import os.path
 import random
 import urllib.parse
 from configparser import NoOptionError, NoSectionError, RawConfigParser
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from json import JSONDecodeError, dumps
 from time import sleep, time
 from typing import Dict, Iterator, List, Optional, Tuple
@@ -44,7 +45,9 @@ from weblate.utils.lock import WeblateLock, WeblateLockTimeout
 from weblate.utils.render import render_template
 from weblate.utils.xml import parse_xml
 from weblate.vcs.base import Repository, RepositoryException
+from weblate.vcs.catfile import CAT_FILE_POOL
 from weblate.vcs.gpg import get_gpg_sign_key
+from weblate.vcs.mirror import GitMirror
 
 
 class GitRepository(Repository):
@@ -99,6 +102,16 @@ class GitRepository(Repository):
 
         raise RepositoryException(0, "Failed to figure out remote branch")
 
+    @classmethod
+    def get_remote_heads(cls, repo: str):
+        result = {}
+        for line in cls._popen(
+            ["ls-remote", "--heads", "--", repo], merge_err=False
+        ).splitlines():
+            revision, ref = line.split("\t", 1)
+            result[ref[len("refs/heads/") :]] = revision
+        return result
+
     @staticmethod
     def git_config_update(filename: str, *updates: Tuple[str, str, str]):
         # First, open file read-only to check current settings
@@ -265,43 +278,99 @@ class GitRepository(Repository):
             return [f"--gpg-sign={sign_key}"]
         return []
 
+    def get_object(self, name: str) -> Tuple[str, str, bytes]:
+        """Read object from the repository using persistent cat-file process."""
+        get_env = dict if self.local else self._getenv
+        try:
+            return CAT_FILE_POOL.get(self.path, get_env).read(name)
+        except RepositoryException as error:
+            if error.retcode:
+                raise
+            # The process has terminated, retry with a new one
+            return CAT_FILE_POOL.get(self.path, get_env).read(name)
+
+    @staticmethod
+    def parse_identity(result: Dict[str, str], name: str, value: str):
+        """Parse author or committer line of a commit object."""
+        identity, timestamp, offset = value.rsplit(" ", 2)
+        delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+        if offset.startswith("-"):
+            delta = -delta
+        result[name] = identity
+        result[f"{name}date"] = format_datetime(
+            datetime.fromtimestamp(int(timestamp), timezone(delta))
+        )
+        if "<" in identity:
+            parsed = identity.split("<", 1)
+            result[f"{name}_name"] = parsed[0].strip()
+            result[f"{name}_email"] = parsed[1].rstrip(">")
+
     def _get_revision_info(self, revision):
         """Return dictionary with detailed revision information."""
-        text = self.execute(
-            ["log", "-1", "--format=fuller", "--date=rfc", "--abbrev-commit", revision],
-            needs_lock=False,
-            merge_err=False,
-        )
+        objectname, _objecttype, content = self.get_object(f"{revision}^{{commit}}")
+        headers, _separator, body = content.decode(errors="replace").partition("\n\n")
 
-        result = {"revision": revision}
+        result = {"revision": revision, "shortrevision": objectname[:7]}
+        parents = []
 
-        message = []
+        for line in headers.splitlines():
+            # Skip continuation of multiline headers (signatures)
+            if line.startswith(" "):
+                continue
+            name, _separator, value = line.partition(" ")
+            if name == "parent":
+                parents.append(value[:7])
+            elif name == "author":
+                self.parse_identity(result, "author", value)
+            elif name == "committer":
+                self.parse_identity(result, "commit", value)
 
-        header = True
+        if len(parents) > 1:
+            result["merge"] = " ".join(parents)
 
-        for line in text.splitlines():
-            if header:
-                if not line:
-                    header = False
-                elif line.startswith("commit"):
-                    result["shortrevision"] = line.split()[1]
-                else:
-                    name, value = line.strip().split(":", 1)
-                    value = value.strip()
-                    name = name.lower()
-                    result[name] = value
-                    if "<" in value:
-                        parsed = value.split("<", 1)
-                        result[f"{name}_name"] = parsed[0].strip()
-                        result[f"{name}_email"] = parsed[1].rstrip(">")
-            else:
-                message.append(line.strip())
+        message = [line.strip() for line in body.splitlines()]
 
         result["message"] = "\n".join(message)
         result["summary"] = message[0] if message else ""
 
         return result
 
+    def read_ref(self, ref: str) -> Optional[str]:
+        """Resolve reference by reading the repository files."""
+        git_dir = os.path.join(self.path, ".git")
+        # Limit depth of symbolic references
+        for _depth in range(5):
+            try:
+                with open(os.path.join(git_dir, ref)) as handle:
+                    value = handle.read().strip()
+            except OSError:
+                return self.read_packed_ref(git_dir, ref)
+            if not value.startswith("ref: "):
+                return value
+            ref = value[5:]
+        return None
+
+    @staticmethod
+    def read_packed_ref(git_dir: str, ref: str) -> Optional[str]:
+        try:
+            with open(os.path.join(git_dir, "packed-refs")) as handle:
+                for line in handle:
+                    if line.startswith(("#", "^")):
+                        continue
+                    revision, name = line.split()
+                    if name == ref:
+                        return revision
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def get_status_revisions(self):
+        local = self.read_ref("HEAD")
+        remote = self.read_ref(f"refs/remotes/{self.get_remote_branch_name()}")
+        if local and remote:
+            return local, remote
+        return None
+
     def log_revisions(self, refspec):
         """Return revisin log for given refspec."""
         return self.execute(
@@ -391,6 +460,47 @@ class GitRepository(Repository):
             ),
         )
         self.branch = branch
+        if settings.VCS_SHARED_MIRRORS and pull_url:
+            self.configure_mirror(pull_url)
+
+    @property
+    def alternates_path(self):
+        return os.path.join(self.path, ".git", "objects", "info", "alternates")
+
+    def get_alternates(self) -> List[str]:
+        try:
+            with open(self.alternates_path) as handle:
+                return handle.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    def configure_mirror(self, pull_url: str):
+        """Borrow objects from a mirror shared with same upstream repositories."""
+        mirror = GitMirror.from_url(pull_url)
+        mirror.ensure(self, pull_url)
+        alternates = self.get_alternates()
+        if alternates and alternates[-1] == mirror.objects_path:
+            return
+        # Keep previous mirrors as existing objects might be borrowed from them
+        if mirror.objects_path in alternates:
+            alternates.remove(mirror.objects_path)
+        alternates.append(mirror.objects_path)
+        with open(self.alternates_path, "w") as handle:
+            handle.write("".join(f"{alternate}\n" for alternate in alternates))
+
+    def update_mirror(self):
+        mirror = GitMirror.from_alternates(self.get_alternates())
+        if mirror is None:
+            return
+        try:
+            mirror.fetch(self)
+        except WeblateLockTimeout:
+            # Mirror is being fetched by other process for too long, the
+            # repository fetch will download the objects
+            return
+        except RepositoryException:
+            # The repository fetch will download the objects
+            report_error(cause="Mirror update failed")
 
     def list_branches(self, *args):
         cmd = ["branch", "--list"]
@@ -460,11 +570,9 @@ class GitRepository(Repository):
 
     def get_file(self, path, revision):
         """Return content of file at given revision."""
-        return self.execute(
-            ["show", f"{revision}:{path}"],
-            needs_lock=False,
-            merge_err=False,
-        )
+        content = self.get_object(f"{revision}:{path}")[2].decode()
+        # Same newlines handling as in text mode of subprocess
+        return content.replace("\r\n", "\n").replace("\r", "\n")
 
     def cleanup(self):
         """Remove not tracked files from the repository."""
@@ -486,6 +594,7 @@ class GitRepository(Repository):
 
     def update_remote(self):
         """Update remote repository."""
+        self.update_mirror()
         self.execute(["remote", "prune", "origin"])
         if self.list_remote_branches():
             # Updating existing fork
@@ -676,6 +785,14 @@ class SubversionRepository(GitRepository):
             merge_err=False,
         )
 
+    @classmethod
+    def get_remote_heads(cls, repo: str):
+        return None
+
+    def get_status_revisions(self):
+        # Getting remote branch name needs invoking git
+        return None
+
     def get_remote_branch_name(self):
         """Return the remote branch name.
 
@@ -1131,6 +1248,13 @@ class LocalRepository(GitRepository):
     def get_remote_branch_name(self):
         return self.branch
 
+    def get_status_revisions(self):
+        return None
+
+    @classmethod
+    def get_remote_heads(cls, repo: str):
+        return None
+
     def update_remote(self):
         return
 
@@ -0,0 +1,158 @@
+#
+# Copyright © 2012–2023 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Shared mirrors of upstream Git repositories.
+
+Repositories with the same upstream borrow objects from a bare mirror using
+Git alternates. The mirror is fetched once for all of them and the
+repositories then fetch just the references.
+"""
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from glob import glob
+from time import time
+from typing import List, Optional
+
+from django.core.cache import cache
+
+from weblate.utils.data import data_dir
+from weblate.utils.files import remove_tree
+from weblate.utils.hash import calculate_checksum
+from weblate.utils.lock import WeblateLock
+
+# Mirror fetches started after this timestamp are considered fresh
+FETCH_SINCE: ContextVar[Optional[float]] = ContextVar("fetch_since", default=None)
+
+
+@contextmanager
+def fetch_since(timestamp: float):
+    """Reuse mirror fetches started after timestamp.
+
+    This is used when updating many repositories at once, so that each
+    mirror is fetched only once.
+    """
+    token = FETCH_SINCE.set(timestamp)
+    try:
+        yield
+    finally:
+        FETCH_SINCE.reset(token)
+
+
+class GitMirror:
+    """Bare Git repository shared by repositories with same upstream."""
+
+    def __init__(self, path: str):
+        self.path = path
+        name = os.path.basename(path)
+        self.lock = self.get_lock(120)
+        # Fetching complete history of a big repository can take long
+        self.fetch_lock = self.get_lock(900)
+        self.cache_key = f"vcs-mirror-fetch-{name}"
+
+    def get_lock(self, timeout: int):
+        name = os.path.basename(self.path)
+        return WeblateLock(
+            lock_path=os.path.dirname(self.path),
+            scope="mirror",
+            key=name,
+            slug=name,
+            file_template="{slug}.lock",
+            timeout=timeout,
+        )
+
+    @classmethod
+    def from_url(cls, url: str):
+        return cls(data_dir("vcs-mirrors", f"{calculate_checksum(url)}.git"))
+
+    @classmethod
+    def from_alternates(cls, alternates: List[str]):
+        """Return mirror used by the repository, if any."""
+        prefix = data_dir("vcs-mirrors")
+        for line in reversed(alternates):
+            if line.startswith(prefix):
+                return cls(os.path.dirname(line))
+        return None
+
+    @property
+    def objects_path(self):
+        return os.path.join(self.path, "objects")
+
+    def ensure(self, repository, url: str):
+        """Create mirror if it does not exist."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            if os.path.exists(self.path):
+                return
+            repository._popen(["init", "--bare", self.path])
+            for key, value in (
+                ("remote.origin.url", url),
+                ("remote.origin.fetch", "+refs/heads/*:refs/heads/*"),
+                ("remote.origin.tagOpt", "--no-tags"),
+                # Objects might be used by other repositories, never remove them
+                ("gc.auto", "0"),
+                ("gc.pruneExpire", "never"),
+            ):
+                repository._popen(["config", key, value], cwd=self.path)
+
+    def fetch(self, repository):
+        """Fetch upstream changes unless another fetch started meanwhile."""
+        requested = time()
+        since = FETCH_SINCE.get()
+        if since is not None:
+            requested = min(requested, since)
+        with self.fetch_lock:
+            last_fetch = cache.get(self.cache_key)
+            if last_fetch is not None and last_fetch >= requested:
+                return
+            start = time()
+            args = ["fetch", "--prune", "origin"]
+            # The mirror has to contain complete history as the repositories
+            # borrowing objects do not know about the shallow commits
+            if os.path.exists(os.path.join(self.path, "shallow")):
+                args.append("--unshallow")
+            repository._popen(args, cwd=self.path)
+            cache.set(self.cache_key, start, 86400)
+
+
+def cleanup_mirrors(repositories: List[str], cutoff: float):
+    """Remove mirrors not used by any of the repositories.
+
+    Mirrors modified after cutoff are kept as they might be just being set
+    up for a repository.
+    """
+    prefix = data_dir("vcs-mirrors")
+    used = set()
+    for path in repositories:
+        try:
+            with open(
+                os.path.join(path, ".git", "objects", "info", "alternates")
+            ) as handle:
+                alternates = handle.read().splitlines()
+        except FileNotFoundError:
+            continue
+        used.update(
+            os.path.dirname(line) for line in alternates if line.startswith(prefix)
+        )
+    for path in glob(os.path.join(prefix, "*.git")):
+        if path in used or os.path.getmtime(path) > cutoff:
+            continue
+        mirror = GitMirror(path)
+        with mirror.lock:
+            remove_tree(path)
@@ -37,6 +37,7 @@ class VCSConf(AppConf):
         "weblate.vcs.mercurial.HgRepository",
     )
     VCS_CLONE_DEPTH = 1
+    VCS_SHARED_MIRRORS = False
 
     # GitHub username for sending pull requests
     GITHUB_USERNAME = None
@@ -20,6 +20,7 @@
 import os.path
 import shutil
 import tempfile
+import time
 from typing import Dict
 from unittest import SkipTest
 from unittest.mock import patch
@@ -31,6 +32,7 @@ from django.utils import timezone
 
 from weblate.trans.models import Component, Project
 from weblate.trans.tests.utils import RepoTestMixin, TempDirMixin
+from weblate.utils.lock import WeblateLockTimeout
 from weblate.vcs.base import RepositoryException
 from weblate.vcs.git import (
     GiteaRepository,
@@ -44,6 +46,7 @@ from weblate.vcs.git import (
     SubversionRepository,
 )
 from weblate.vcs.mercurial import HgRepository
+from weblate.vcs.mirror import GitMirror, cleanup_mirrors
 
 
 class GithubFakeRepository(GithubRepository):
@@ -491,6 +494,12 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
     def test_get_file(self):
         self.assertIn("msgid", self.repo.get_file("po/cs.po", self.repo.last_revision))
 
+    def test_get_file_missing(self):
+        with self.assertRaises(RepositoryException):
+            self.repo.get_file("po/nonexisting.po", self.repo.last_revision)
+        # Reading should still work after failure
+        self.test_get_file()
+
     def test_remote_branches(self):
         # The initial setup clones just single branch
         self.assertEqual(
@@ -514,6 +523,49 @@ class VCSGitForcePushTest(VCSGitTest):
     _class = GitForcePushRepository
 
 
+@override_settings(VCS_SHARED_MIRRORS=True)
+class VCSGitMirrorTest(VCSGitTest):
+    def test_mirror(self):
+        repos = []
+        for _i in range(2):
+            tempdir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, tempdir)
+            repo = self._class(
+                tempdir, self._remote_branch, component=self.get_fake_component()
+            )
+            with repo.lock:
+                repo.configure_remote(
+                    self.get_remote_repo_url(), "", self._remote_branch
+                )
+                repo.update_remote()
+                repo.configure_branch(self._remote_branch)
+                repo.merge()
+            repos.append(repo)
+
+        # Both repositories share single mirror
+        self.assertEqual(repos[0].get_alternates(), repos[1].get_alternates())
+        self.assertEqual(len(repos[0].get_alternates()), 1)
+        self.assertEqual(repos[0].last_revision, repos[1].last_revision)
+        self.assertIn("msgid", repos[0].get_file("po/cs.po", repos[0].last_revision))
+
+        # The mirror contains complete history
+        mirror = GitMirror.from_alternates(repos[0].get_alternates())
+        self.assertFalse(os.path.exists(os.path.join(mirror.path, "shallow")))
+
+        # Repository is updated while the mirror is locked by other process
+        with patch.object(
+            GitMirror, "fetch", side_effect=WeblateLockTimeout
+        ) as fetch, repos[0].lock:
+            repos[0].update_remote()
+        fetch.assert_called_once()
+
+        # Mirror is removed once not used
+        cleanup_mirrors([repo.path for repo in repos], time.time())
+        self.assertTrue(os.path.exists(mirror.path))
+        cleanup_mirrors([], time.time())
+        self.assertFalse(os.path.exists(mirror.path))
+
+
 class VCSGitUpstreamTest(VCSGitTest):
     def add_remote_commit(self, conflict=False, rename=False):
         # Use Git to create changed upstream repo